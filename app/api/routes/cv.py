@@ -18,7 +18,7 @@ from fastapi.responses import JSONResponse
 from app.api.deps import get_settings_dep, get_async_db
 from app.config import Settings
 from app.schemas.validation import CVUploadResponse, CVProcessingStatus, ProcessingStage
-from app.workers.tasks import process_cv_task
+from app.workers.tasks import build_cv_batch_pipeline, process_cv_task
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/cv", tags=["CV Management"])
@@ -367,23 +367,25 @@ async def scan_directory(
     triggered_count = 0
     errors = []
     
-    for pdf_path in pdf_files:
+    # Queue the staged pipeline directly with the file paths; CVs are
+    # grouped so each group is parsed with a single LLM request while
+    # OCR, LLM and embedding work overlap across groups
+    # Note: The worker needs access to these paths. 
+    # If worker is in Docker, path must be mounted.
+    batch_size = max(1, settings.llm_parse_batch_size)
+
+    for start in range(0, len(pdf_files), batch_size):
+        batch = [
+            (os.path.abspath(pdf_path), os.path.basename(pdf_path))
+            for pdf_path in pdf_files[start:start + batch_size]
+        ]
         try:
-            filename = os.path.basename(pdf_path)
-            
-            # Queue task directly with the file path
-            # Note: The worker needs access to this path. 
-            # If worker is in Docker, path must be mounted.
-            
-            process_cv_task.delay(
-                file_path=os.path.abspath(pdf_path),
-                original_filename=filename,
-            )
-            triggered_count += 1
+            build_cv_batch_pipeline(batch).apply_async()
+            triggered_count += len(batch)
             
         except Exception as e:
-            logger.error(f"Failed to queue task for {pdf_path}: {e}")
-            errors.append(f"{filename}: {e}")
+            logger.error(f"Failed to queue batch starting at {batch[0][0]}: {e}")
+            errors.extend(f"{filename}: {e}" for _, filename in batch)
             
     return {
         "message": f"Batch processing started for {triggered_count} files",
@@ -35,6 +35,7 @@ class Settings(BaseSettings):
 
     # LLM Provider (groq or openai)
     llm_provider: str = "groq"
+    llm_parse_batch_size: int = 4  # CVs per parse request for directory scans
     
     # OpenAI
     openai_api_key: Optional[str] = None
@@ -54,6 +55,8 @@ class Settings(BaseSettings):
 
     # Upload settings
     upload_dir: str = "./uploads"
+    # BM25 index snapshot shared by the API and workers (empty disables)
+    bm25_index_path: str = "./uploads/bm25_index.npz"
     max_upload_size: int = 50 * 1024 * 1024  # 50MB
 
     # Search settings
@@ -65,6 +68,8 @@ class Settings(BaseSettings):
     chat_history_max_messages: int = 10  # Sliding window size
     chat_model: str = "llama-3.3-70b-versatile"  # Model for chat responses
     chat_max_candidates: int = 5  # Max candidates to include in context
+    chat_redis_max_connections: int = 32  # Bounded Redis pool for chat memory
+    chat_redis_pool_timeout: float = 2.0  # Seconds to wait for a free connection
 
     @property
     def async_database_url(self) -> str:
@@ -29,7 +29,16 @@ celery_app.conf.update(
 )
 
 # Task routes
+# The staged pipeline (cv.ocr -> cv.parse -> cv.index) puts each stage on
+# the queue of the resource it uses, so workers can be sized per resource:
+#   celery -A app.core.celery_app worker -Q cv_processing,ocr -c 2
+#   celery -A app.core.celery_app worker -Q llm -P threads -c 16
+#   celery -A app.core.celery_app worker -Q embeddings -P solo
 celery_app.conf.task_routes = {
-    "app.workers.tasks.process_cv": {"queue": "cv_processing"},
-    "app.workers.tasks.generate_embeddings": {"queue": "embeddings"},
+    "cv.process": {"queue": "cv_processing"},
+    "cv.ocr": {"queue": "ocr"},
+    "cv.parse": {"queue": "llm"},
+    "cv.parse_batch": {"queue": "llm"},
+    "cv.index": {"queue": "embeddings"},
+    "cv.generate_embeddings": {"queue": "embeddings"},
 }
@@ -1,14 +1,21 @@
 """Database connection and session management."""
 
+import logging
 from typing import AsyncGenerator
 
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from app.config import get_settings
 
 settings = get_settings()
+logger = logging.getLogger(__name__)
+
+try:
+    from pgvector.psycopg2 import register_vector
+except ImportError:
+    register_vector = None
 
 # Sync engine (for migrations and some operations)
 engine = create_engine(
@@ -18,6 +25,22 @@ engine = create_engine(
     max_overflow=20,
 )
 
+
+@event.listens_for(engine, "connect")
+def _register_vector_type(dbapi_connection, connection_record):
+    """Let psycopg2 bind and return numpy float32 arrays for vector columns."""
+    if register_vector is None:
+        return
+    try:
+        register_vector(dbapi_connection)
+    except Exception as e:
+        # The vector extension may not exist yet (e.g. before init-db.sql).
+        # The failed lookup aborts psycopg2's implicit transaction, so roll
+        # it back before the pool hands the connection out.
+        dbapi_connection.rollback()
+        logger.warning(f"pgvector type registration skipped: {e}")
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # Async engine
@@ -0,0 +1,45 @@
+"""Shared raw psycopg2 connection pool for scripts and ops tooling."""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from psycopg2.extensions import connection as PgConnection
+from psycopg2.pool import ThreadedConnectionPool
+
+from app.config import get_settings
+
+settings = get_settings()
+
+_pool: Optional[ThreadedConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(minconn: int = 1, maxconn: int = 8) -> ThreadedConnectionPool:
+    """Get or create the raw connection pool singleton (thread-safe)."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(minconn, maxconn, settings.database_url)
+    return _pool
+
+
+@contextmanager
+def raw_connection() -> Iterator[PgConnection]:
+    """
+    Borrow a pooled psycopg2 connection.
+
+    Commits on success, rolls back on error, and always returns the
+    connection to the pool instead of closing it.
+    """
+    pool = get_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        pool.putconn(conn)
@@ -10,6 +10,7 @@ This schema defines the standard JSON format for parsed CVs including:
 """
 
 from datetime import date
+from itertools import chain
 from typing import Optional, List, Dict, Any
 
 from pydantic import (
@@ -249,17 +250,41 @@ class ResumeSchema(BaseModel):
             if exp.start_date
         ]
 
-    def get_all_skills(self) -> List[str]:
-        """Get all skills from both flat list and categorized dict."""
-        all_skills = set(self.skills)
-        for skills_list in self.skills_by_category.values():
-            all_skills.update(skills_list)
-        # Also extract technologies from work experience and projects
-        for exp in self.work_experience:
-            all_skills.update(exp.technologies)
-        for proj in self.projects:
-            all_skills.update(proj.technologies)
-        return list(all_skills)
+    def get_all_skills(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Get all skills from both flat list and categorized dict.
+
+        Skills are stripped and deduplicated case-insensitively, keeping
+        the first spelling seen, in a stable order: flat skills,
+        categorized skills, then technologies from work experience and
+        projects.
+
+        Args:
+            limit: Stop after this many unique skills
+
+        Returns:
+            Unique skills, at most ``limit`` of them
+        """
+        sources = chain(
+            self.skills,
+            chain.from_iterable(self.skills_by_category.values()),
+            # Also extract technologies from work experience and projects
+            chain.from_iterable(exp.technologies for exp in self.work_experience),
+            chain.from_iterable(proj.technologies for proj in self.projects),
+        )
+
+        seen = set()
+        all_skills = []
+        for skill in sources:
+            skill = skill.strip()
+            key = skill.casefold()
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            all_skills.append(skill)
+            if len(all_skills) == limit:
+                break
+        return all_skills
 
     def to_searchable_text(self) -> str:
         """Generate searchable text representation of the resume."""
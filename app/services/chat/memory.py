@@ -5,15 +5,54 @@ Implements sliding window memory to keep the last N messages per session.
 """
 
 import json
+import time
+import calendar
 import logging
-from typing import List, Optional
-from datetime import datetime
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+from datetime import datetime, timedelta
 
 import redis.asyncio as redis
+from redis.exceptions import WatchError
 
 from app.config import get_settings
 from app.schemas.chat import ChatMessage, MessageRole, CandidateCard
 
+# Fast C JSON codec when available; stdlib fallback otherwise
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+    _json_loads = json.loads
+
+# Compact binary codec when available; JSON fallback otherwise
+try:
+    import msgpack
+
+    def _pack(data: Any) -> bytes:
+        return msgpack.packb(data, use_bin_type=True)
+
+    _unpack_errors: tuple = (msgpack.UnpackException, ValueError, TypeError)
+except ImportError:
+    msgpack = None
+    _pack = _json_dumps
+    _unpack_errors = (ValueError, TypeError)
+
+# Compact role codes for the stored form (order is part of the format)
+_ROLES = [MessageRole.SYSTEM, MessageRole.USER, MessageRole.ASSISTANT]
+_ROLE_CODES = {role: code for code, role in enumerate(_ROLES)}
+
+# Timestamps are stored as int UTC epoch seconds and read back naive UTC
+_EPOCH = datetime(1970, 1, 1)
+
+# Formatted prompt histories kept per process, keyed by window version
+_FORMAT_CACHE_SIZE = 1024
+
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
@@ -22,8 +61,20 @@ class ConversationMemory:
     """
     Redis-backed conversation memory with sliding window.
     
-    Stores chat history as a JSON list, keeping only the last N messages
-    to avoid context window overflow and reduce token costs.
+    Stores each session's window as a single MessagePack-encoded array
+    under one STRING key, keeping only the last N messages to avoid context
+    window overflow and reduce token costs. History is append-only and
+    read or deleted as a whole, so one GET/SET replaces LRANGE over a list.
+    
+    Roles are stored as small ints, timestamps as epoch seconds and
+    candidate skills as indices into a per-window skill table, so repeated
+    strings are stored once and nothing is re-parsed from ISO text.
+    
+    A Redis STREAM (XADD MAXLEN ~ N) was considered and not used: the
+    approximate trim keeps more than N entries, so reads would still need
+    XREVRANGE COUNT N. Each entry would also need its own copy of the skill
+    strings. A window of at most chat_history_max_messages entries fits
+    one small value.
     """
     
     def __init__(
@@ -31,6 +82,7 @@ class ConversationMemory:
         redis_url: Optional[str] = None,
         max_messages: Optional[int] = None,
         ttl_seconds: Optional[int] = None,
+        max_connections: Optional[int] = None,
     ):
         """
         Initialize conversation memory.
@@ -39,25 +91,161 @@ class ConversationMemory:
             redis_url: Redis connection URL
             max_messages: Maximum messages to keep (sliding window)
             ttl_seconds: Session expiry time in seconds
+            max_connections: Size of the Redis connection pool. When all
+                connections are busy, callers wait up to
+                chat_redis_pool_timeout seconds instead of opening more.
         """
         self.redis_url = redis_url or settings.redis_url
         self.max_messages = max_messages or settings.chat_history_max_messages
         self.ttl_seconds = ttl_seconds or settings.chat_memory_ttl_seconds
+        self.max_connections = max_connections or settings.chat_redis_max_connections
+        self._pool: Optional[redis.BlockingConnectionPool] = None
         self._redis: Optional[redis.Redis] = None
+        self._format_cache: "OrderedDict[tuple, str]" = OrderedDict()
         
     async def _get_redis(self) -> redis.Redis:
-        """Get or create Redis connection."""
+        """Get or create the Redis client over a bounded connection pool."""
         if self._redis is None:
-            self._redis = redis.from_url(
+            # Message payloads are binary, so responses are not decoded
+            self._pool = redis.BlockingConnectionPool.from_url(
                 self.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+                max_connections=self.max_connections,
+                timeout=settings.chat_redis_pool_timeout,
             )
+            self._redis = redis.Redis(connection_pool=self._pool)
         return self._redis
     
+    @staticmethod
+    def _serialize(messages: List[ChatMessage]) -> bytes:
+        """
+        Encode a message window for storage.
+        
+        The stored form is [skill_table, [message, ...]] where each
+        message has an int role, an int timestamp and skill indices
+        instead of strings.
+        """
+        skill_ids: Dict[str, int] = {}
+        items = []
+        for message in messages:
+            item = message.model_dump(mode="json", exclude={"timestamp"})
+            item["role"] = _ROLE_CODES[message.role]
+            item["timestamp"] = calendar.timegm(message.timestamp.utctimetuple())
+            for card in item["candidates"]:
+                card["top_skills"] = [
+                    skill_ids.setdefault(skill, len(skill_ids))
+                    for skill in card["top_skills"]
+                ]
+            items.append(item)
+        return _pack([list(skill_ids), items])
+    
+    @classmethod
+    def _deserialize(cls, raw: Optional[bytes]) -> List[ChatMessage]:
+        """Decode a stored message window."""
+        return list(cls._iter_messages(raw))
+    
+    @staticmethod
+    def _iter_messages(
+        raw: Optional[bytes],
+        limit: Optional[int] = None,
+    ) -> Iterator[ChatMessage]:
+        """
+        Decode a stored message window one message at a time.
+        
+        MessagePack windows are read incrementally: each message is
+        unpacked and validated only when the caller asks for it, and
+        messages outside the limit are skipped without being decoded.
+        Blobs written by the JSON fallback start with "[", which is never
+        a MessagePack array marker, so both encodings are read. Entries
+        that fail validation are skipped.
+        
+        Args:
+            raw: Stored window blob
+            limit: Only yield the last `limit` messages
+        """
+        if not raw:
+            return
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        try:
+            if raw[:1] == b"[" or msgpack is None:
+                skills, items = _json_loads(raw)
+                if limit:
+                    items = items[-limit:]
+                count = len(items)
+                next_item = iter(items).__next__
+            else:
+                unpacker = msgpack.Unpacker(raw=False)
+                unpacker.feed(raw)
+                if unpacker.read_array_header() != 2:
+                    raise ValueError("Unexpected window layout")
+                skills = unpacker.unpack()
+                count = unpacker.read_array_header()
+                if limit and count > limit:
+                    for _ in range(count - limit):
+                        unpacker.skip()
+                    count = limit
+                next_item = unpacker.unpack
+        except _unpack_errors as e:
+            logger.warning(f"Failed to parse history: {e}")
+            return
+        
+        for _ in range(count):
+            try:
+                item = next_item()
+            except _unpack_errors as e:
+                logger.warning(f"Failed to parse history: {e}")
+                return
+            try:
+                item["role"] = _ROLES[item["role"]]
+                if isinstance(item["timestamp"], int):
+                    item["timestamp"] = _EPOCH + timedelta(seconds=item["timestamp"])
+                for card in item["candidates"]:
+                    card["top_skills"] = [skills[i] for i in card["top_skills"]]
+                message = ChatMessage.model_validate(item)
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                logger.warning(f"Failed to parse message: {e}")
+                continue
+            yield message
+    
+    @staticmethod
+    def _count_messages(raw: Optional[bytes]) -> int:
+        """
+        Count the messages in a stored window without decoding them.
+        
+        MessagePack windows are counted from the message array header
+        after skipping the skill table; JSON fallback blobs are parsed and
+        their item list measured.
+        """
+        if not raw:
+            return 0
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+        try:
+            if raw[:1] == b"[" or msgpack is None:
+                return len(_json_loads(raw)[1])
+            unpacker = msgpack.Unpacker(raw=False)
+            unpacker.feed(raw)
+            if unpacker.read_array_header() != 2:
+                raise ValueError("Unexpected window layout")
+            unpacker.skip()
+            return unpacker.read_array_header()
+        except (*_unpack_errors, IndexError) as e:
+            logger.warning(f"Failed to parse history: {e}")
+            return 0
+    
     def _get_key(self, session_id: str) -> str:
         """Generate Redis key for a session."""
-        return f"chat:history:{session_id}"
+        return f"chat:session:{session_id}"
+    
+    def _get_version_key(self, session_id: str) -> str:
+        """
+        Generate the Redis key holding a session's window version.
+        
+        The version changes on every write. It is a nanosecond clock value
+        rather than an INCR counter so that a session which expired and
+        restarted never reuses a version still cached by some process.
+        """
+        return f"chat:session:{session_id}:ver"
     
     async def add_message(
         self,
@@ -90,17 +278,32 @@ class ConversationMemory:
             candidates=candidates or [],
         )
         
-        # Serialize message to JSON
-        message_json = message.model_dump_json()
-        
-        # Add to list (right push)
-        await r.rpush(key, message_json)
-        
-        # Trim to keep only last N messages (sliding window)
-        await r.ltrim(key, -self.max_messages, -1)
-        
-        # Set/refresh TTL
-        await r.expire(key, self.ttl_seconds)
+        # Read-modify-write under WATCH so concurrent writers to the same
+        # session retry instead of dropping each other's messages
+        async with r.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    messages = self._deserialize(await pipe.get(key))
+                    messages.append(message)
+                    
+                    # Keep only the last N messages (sliding window) and
+                    # refresh the TTL in the same SET
+                    pipe.multi()
+                    pipe.set(
+                        key,
+                        self._serialize(messages[-self.max_messages:]),
+                        ex=self.ttl_seconds,
+                    )
+                    pipe.set(
+                        self._get_version_key(session_id),
+                        time.time_ns(),
+                        ex=self.ttl_seconds,
+                    )
+                    await pipe.execute()
+                    break
+                except WatchError:
+                    continue
         
         logger.debug(f"Added message to session {session_id}: {role.value}")
         
@@ -121,26 +324,28 @@ class ConversationMemory:
         Returns:
             List of ChatMessage objects, oldest first
         """
-        r = await self._get_redis()
-        key = self._get_key(session_id)
-        
-        # Get all messages
-        messages_json = await r.lrange(key, 0, -1)
-        
-        messages = []
-        for msg_json in messages_json:
-            try:
-                msg_data = json.loads(msg_json)
-                messages.append(ChatMessage(**msg_data))
-            except (json.JSONDecodeError, ValueError) as e:
-                logger.warning(f"Failed to parse message: {e}")
-                continue
+        return [message async for message in self.iter_history(session_id, limit=limit)]
+    
+    async def iter_history(
+        self,
+        session_id: str,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[ChatMessage]:
+        """
+        Iterate over conversation history, decoding one message at a time.
         
-        # Apply limit if specified
-        if limit and len(messages) > limit:
-            messages = messages[-limit:]
+        Args:
+            session_id: Unique session identifier
+            limit: Optional limit on number of messages (the most recent)
+            
+        Yields:
+            ChatMessage objects, oldest first
+        """
+        r = await self._get_redis()
         
-        return messages
+        # The whole window is one blob, decoded lazily
+        for message in self._iter_messages(await r.get(self._get_key(session_id)), limit):
+            yield message
     
     async def clear_session(self, session_id: str) -> bool:
         """
@@ -155,7 +360,7 @@ class ConversationMemory:
         r = await self._get_redis()
         key = self._get_key(session_id)
         
-        deleted = await r.delete(key)
+        deleted = await r.delete(key, self._get_version_key(session_id))
         
         logger.info(f"Cleared session {session_id}: {'success' if deleted else 'not found'}")
         
@@ -163,18 +368,39 @@ class ConversationMemory:
     
     async def get_session_info(self, session_id: str) -> dict:
         """Get metadata about a session."""
-        r = await self._get_redis()
-        key = self._get_key(session_id)
+        return (await self.get_sessions_info([session_id]))[session_id]
+    
+    async def get_sessions_info(self, session_ids: List[str]) -> Dict[str, dict]:
+        """
+        Get metadata about many sessions in one pipelined round-trip.
         
-        message_count = await r.llen(key)
-        ttl = await r.ttl(key)
+        Args:
+            session_ids: Session identifiers to look up
+            
+        Returns:
+            Mapping of session_id to the same dict get_session_info returns
+        """
+        if not session_ids:
+            return {}
+        
+        r = await self._get_redis()
+        async with r.pipeline(transaction=False) as pipe:
+            for session_id in session_ids:
+                key = self._get_key(session_id)
+                pipe.get(key)
+                pipe.ttl(key)
+            results = await pipe.execute()
         
-        return {
-            "session_id": session_id,
-            "message_count": message_count,
-            "ttl_seconds": ttl if ttl > 0 else None,
-            "exists": message_count > 0,
-        }
+        infos = {}
+        for session_id, raw, ttl in zip(session_ids, results[::2], results[1::2]):
+            message_count = self._count_messages(raw)
+            infos[session_id] = {
+                "session_id": session_id,
+                "message_count": message_count,
+                "ttl_seconds": ttl if ttl > 0 else None,
+                "exists": message_count > 0,
+            }
+        return infos
     
     async def format_history_for_prompt(
         self,
@@ -184,6 +410,10 @@ class ConversationMemory:
         """
         Format conversation history as a string for LLM prompts.
         
+        The result is cached per window version, so repeated calls between
+        writes cost one small GET instead of reading and decoding the
+        window.
+        
         Args:
             session_id: Unique session identifier
             max_messages: Optional limit
@@ -191,23 +421,36 @@ class ConversationMemory:
         Returns:
             Formatted conversation history string
         """
-        messages = await self.get_history(session_id, limit=max_messages)
+        r = await self._get_redis()
+        version = await r.get(self._get_version_key(session_id))
+        cache_key = (session_id, version, max_messages)
         
-        if not messages:
-            return ""
+        if version is not None and cache_key in self._format_cache:
+            self._format_cache.move_to_end(cache_key)
+            return self._format_cache[cache_key]
         
         formatted_lines = []
-        for msg in messages:
+        async for msg in self.iter_history(session_id, limit=max_messages):
             role_label = "User" if msg.role == MessageRole.USER else "Assistant"
             formatted_lines.append(f"{role_label}: {msg.content}")
+        formatted = "\n".join(formatted_lines)
+        
+        # Unversioned windows (written before versioning) are not cached
+        if version is not None:
+            self._format_cache[cache_key] = formatted
+            if len(self._format_cache) > _FORMAT_CACHE_SIZE:
+                self._format_cache.popitem(last=False)
         
-        return "\n".join(formatted_lines)
+        return formatted
     
     async def close(self):
-        """Close Redis connection."""
+        """Close Redis connection and its pool."""
         if self._redis:
             await self._redis.close()
             self._redis = None
+        if self._pool:
+            await self._pool.disconnect()
+            self._pool = None
 
 
 # Singleton instance
@@ -7,15 +7,78 @@ Analyzes user messages to extract:
 3. Intent - search, summarize, compare, or general chat
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional, List
+import re
+import threading
+import weakref
+from collections import OrderedDict
+from functools import partial
+from typing import Dict, Optional, List, Set, Tuple
 
-from groq import Groq
+import httpx
+from groq import AsyncGroq, Groq
 
 from app.config import get_settings
 from app.schemas.chat import TransformedQuery, ChatMessage
 
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch
+# the same exception with either parser
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# Outermost JSON object in an LLM response (drops code fences and prose)
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
+# Groq clients are shared by every transformer using the same API key, so
+# chat turns reuse pooled keep-alive connections instead of opening a new
+# TLS session each time
+_HTTP_LIMITS = httpx.Limits(
+    max_connections=100, max_keepalive_connections=100, keepalive_expiry=30.0
+)
+_HTTP_TIMEOUT = httpx.Timeout(15.0, connect=5.0)
+
+_clients: Dict[Optional[str], Groq] = {}
+_clients_lock = threading.Lock()
+# Async connections belong to the event loop that opened them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Optional[str], AsyncGroq]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _shared_client(api_key: Optional[str]) -> Groq:
+    """Get or create the pooled Groq client for an API key (thread-safe)."""
+    client = _clients.get(api_key)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(api_key)
+            if client is None:
+                client = _clients[api_key] = Groq(
+                    api_key=api_key,
+                    http_client=httpx.Client(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+                )
+    return client
+
+
+def _shared_async_client(api_key: Optional[str]) -> AsyncGroq:
+    """Get or create the pooled async Groq client for an API key on this loop."""
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(api_key)
+    if client is None:
+        client = clients[api_key] = AsyncGroq(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+        )
+    return client
+
+# Parsed transformations kept per (message, recent history)
+_TRANSFORM_CACHE_SIZE = 1024
+
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
@@ -75,6 +138,88 @@ IMPORTANT: If user asks to "list", "show", "browse", "xem", "liệt kê" candida
 """
 
 
+class _BatchScheduler:
+    """
+    Coalesces concurrent transform requests into short dispatch windows.
+    
+    Requests are queued and drained every window (or once max_batch are
+    waiting). Identical requests in a window share one LLM call. Each
+    unique request is dispatched as its own task under the transformer's
+    semaphore, so a slow call never holds back the rest of its batch and
+    requests arriving meanwhile go out with the next window.
+    """
+    
+    def __init__(
+        self,
+        transformer: "QueryTransformer",
+        window_ms: float = 20,
+        max_batch: int = 16,
+    ):
+        self._transformer = transformer
+        self._window = window_ms / 1000
+        self._max_batch = max_batch
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # Strong references to in-flight calls until they finish
+        self._tasks: Set[asyncio.Task] = set()
+    
+    async def submit(self, message: str, history_key: Tuple[str, ...]) -> TransformedQuery:
+        """Queue a request and wait for its result."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            # The worker exits once the queue is empty, so a new one (and
+            # queue) is bound to whichever event loop is running now
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        self._queue.put_nowait((message, history_key, future))
+        return await future
+    
+    async def _run(self) -> None:
+        """Drain the queue window by window until it is empty."""
+        loop = asyncio.get_running_loop()
+        while not self._queue.empty():
+            batch = [self._queue.get_nowait()]
+            deadline = loop.time() + self._window
+            while len(batch) < self._max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self._dispatch(batch)
+    
+    def _dispatch(self, batch: List[tuple]) -> None:
+        """Start one LLM call per unique request in the batch."""
+        waiters: Dict[tuple, List[asyncio.Future]] = {}
+        for message, history_key, future in batch:
+            waiters.setdefault((message, history_key), []).append(future)
+        
+        for (message, history_key), futures in waiters.items():
+            task = asyncio.create_task(
+                self._transformer._transform_remote(message, history_key)
+            )
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            task.add_done_callback(partial(self._resolve, futures))
+    
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], task: asyncio.Task) -> None:
+        """Hand a finished call's outcome to every request waiting on it."""
+        for future in futures:
+            if future.done():
+                continue
+            if task.cancelled():
+                future.cancel()
+            elif task.exception() is not None:
+                future.set_exception(task.exception())
+            else:
+                future.set_result(task.result())
+
+
 class QueryTransformer:
     """
     Transforms user messages into structured search queries and filters.
@@ -89,6 +234,10 @@ class QueryTransformer:
         self,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
+        max_concurrency: int = 8,
+        batching: bool = False,
+        batch_window_ms: float = 20,
+        max_batch: int = 16,
     ):
         """
         Initialize query transformer.
@@ -96,18 +245,81 @@ class QueryTransformer:
         Args:
             api_key: Groq API key
             model: Model to use for transformation (smaller is better for speed)
+            max_concurrency: Maximum concurrent async LLM calls
+            batching: Coalesce concurrent async requests in short windows,
+                sharing one LLM call between identical requests
+            batch_window_ms: How long a window collects requests
+            max_batch: Dispatch a window early once this many are waiting
         """
         self.api_key = api_key or settings.groq_api_key
         # Use a smaller, faster model for query transformation
         self.model = model or "llama-3.1-8b-instant"
         self._client: Optional[Groq] = None
+        # Bounds in-flight async LLM calls to stay under the Groq rate limit
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # LRU of parsed results, so repeated queries skip the LLM and parsing
+        self._cache: "OrderedDict[tuple, TransformedQuery]" = OrderedDict()
+        self._scheduler = (
+            _BatchScheduler(self, batch_window_ms, max_batch) if batching else None
+        )
     
     def _get_client(self) -> Groq:
-        """Get or create Groq client."""
+        """Get the shared Groq client for this API key."""
         if self._client is None:
-            self._client = Groq(api_key=self.api_key)
+            self._client = _shared_client(self.api_key)
         return self._client
     
+    def _get_async_client(self) -> AsyncGroq:
+        """Get the shared async Groq client for this API key and event loop."""
+        return _shared_async_client(self.api_key)
+    
+    @staticmethod
+    def _history_key(history: Optional[List[ChatMessage]]) -> Tuple[str, ...]:
+        """The history lines that go into the prompt (also the cache key)."""
+        if not history:
+            return ()
+        return tuple(
+            f"{'User' if msg.role.value == 'user' else 'Assistant'}: {msg.content[:200]}"
+            for msg in history[-5:]  # Last 5 messages for context
+        )
+    
+    def _cache_get(self, key: tuple) -> Optional[TransformedQuery]:
+        """Look up a parsed result and mark it as recently used."""
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+    
+    def _cache_put(self, key: tuple, result: TransformedQuery) -> None:
+        """Store a parsed result, evicting the least recently used one."""
+        self._cache[key] = result
+        if len(self._cache) > _TRANSFORM_CACHE_SIZE:
+            self._cache.popitem(last=False)
+    
+    def clear_cache(self) -> None:
+        """Drop all cached transformations."""
+        self._cache.clear()
+    
+    def _completion_kwargs(self, message: str, history_key: Tuple[str, ...]) -> dict:
+        """Request parameters for a transformation call."""
+        history_str = "\n".join(history_key)
+        
+        prompt = QUERY_TRANSFORM_PROMPT.replace(
+            "{history}", history_str or "(Không có lịch sử)"
+        ).replace(
+            "{message}", message
+        )
+        
+        return dict(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": "You are a JSON-only response bot."},
+                {"role": "user", "content": prompt},
+            ],
+            temperature=0.1,
+            max_tokens=600,
+        )
+    
     def transform(
         self,
         message: str,
@@ -116,6 +328,10 @@ class QueryTransformer:
         """
         Transform a user message into a structured query.
         
+        Results are cached per message and recent history; the fallback
+        returned on errors is not cached. Cached results are shared, so
+        callers must not modify them.
+        
         Args:
             message: Current user message
             history: Previous conversation messages
@@ -123,120 +339,168 @@ class QueryTransformer:
         Returns:
             TransformedQuery with search_query, filters, and intent
         """
+        history_key = self._history_key(history)
+        key = (message, history_key)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
         try:
-            # Format history for prompt
-            history_str = ""
-            if history:
-                history_lines = []
-                for msg in history[-5:]:  # Last 5 messages for context
-                    role = "User" if msg.role.value == "user" else "Assistant"
-                    history_lines.append(f"{role}: {msg.content[:200]}")
-                history_str = "\n".join(history_lines)
-            
-            prompt = QUERY_TRANSFORM_PROMPT.replace(
-                "{history}", history_str or "(Không có lịch sử)"
-            ).replace(
-                "{message}", message
-            )
-            
             client = self._get_client()
-            
             response = client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "You are a JSON-only response bot."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.1,
-                max_tokens=600,
+                **self._completion_kwargs(message, history_key)
             )
-            
-            result_text = response.choices[0].message.content.strip()
-            logger.info(f"Raw Query Transform Response: {result_text}")
-            
-            # Extract JSON object using regex (most robust way)
-            import re
-            json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-            if json_match:
-                result_text = json_match.group(0)
-            
-            result = json.loads(result_text)
-            
-            # Map new JSON structure to internal schema
-            filters = result.get("filters", {})
-            semantic_query = result.get("semantic_query", message)
-            keyword_string = result.get("keyword_string", message)
-            
-            # Flatten filters for internal use
-            flattened_filters = {}
-            if filters.get("location") and filters["location"].get("value"):
-                flattened_filters["location"] = filters["location"]["value"]
-            
-            if filters.get("min_experience") and filters["min_experience"].get("value"):
-                # Handle possible string/int types
-                try:
-                    flattened_filters["min_experience_years"] = float(filters["min_experience"]["value"])
-                except (ValueError, TypeError):
-                    pass
-            
-            if filters.get("skills"):
-                skills_data = filters["skills"]
-                # Handle list of strings or list of objects (case where LLM changes structure)
-                flattened_skills = []
-                for skill in skills_data:
-                    if isinstance(skill, str):
-                        flattened_skills.append(skill)
-                    elif isinstance(skill, dict) and "name" in skill:
-                        flattened_skills.append(skill["name"])
-                
-                if flattened_skills:
-                    flattened_filters["required_skills"] = flattened_skills
-
-            return TransformedQuery(
-                search_query=semantic_query, # Legacy mapping
-                semantic_query=semantic_query,
-                keyword_string=keyword_string,
-                filters=flattened_filters,
-                is_search_needed=result.get("is_search_needed", True),
-                intent=result.get("intent", "search"),
-                explanation=result.get("explanation"),
-            )
-            
+            result = self._parse_response(message, response.choices[0].message.content)
         except json.JSONDecodeError as e:
             logger.warning(f"Failed to parse query transform response: {e}")
-            # Fallback: use original message
-            return TransformedQuery(
-                search_query=message,
-                semantic_query=message,
-                keyword_string=message,
-                filters={},
-                is_search_needed=True,
-                intent="search",
-            )
+            return self._fallback(message)
         except Exception as e:
             logger.exception(f"Query transformation failed: {e}")
-            # Fallback
-            return TransformedQuery(
-                search_query=message,
-                semantic_query=message,
-                keyword_string=message,
-                filters={},
-                is_search_needed=True,
-                intent="search",
-            )
+            return self._fallback(message)
+        
+        self._cache_put(key, result)
+        return result
     
     async def transform_async(
         self,
         message: str,
         history: Optional[List[ChatMessage]] = None,
     ) -> TransformedQuery:
-        """Async wrapper for transform (runs sync in executor)."""
-        import asyncio
+        """
+        Async version of transform.
+        
+        Awaits the async Groq client instead of blocking a worker thread,
+        so concurrent chat requests only wait on the network. Shares the
+        result cache with transform. With batching enabled, cache misses
+        go through the batch scheduler.
+        
+        Args:
+            message: Current user message
+            history: Previous conversation messages
+            
+        Returns:
+            TransformedQuery with search_query, filters, and intent
+        """
+        history_key = self._history_key(history)
+        key = (message, history_key)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+        
+        if self._scheduler is not None:
+            return await self._scheduler.submit(message, history_key)
+        return await self._transform_remote(message, history_key)
+    
+    async def _transform_remote(
+        self,
+        message: str,
+        history_key: Tuple[str, ...],
+    ) -> TransformedQuery:
+        """Call the async LLM, parse and cache the result (never raises)."""
+        try:
+            client = self._get_async_client()
+            async with self._semaphore:
+                response = await client.chat.completions.create(
+                    **self._completion_kwargs(message, history_key)
+                )
+            result = self._parse_response(message, response.choices[0].message.content)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse query transform response: {e}")
+            return self._fallback(message)
+        except Exception as e:
+            logger.exception(f"Query transformation failed: {e}")
+            return self._fallback(message)
+        
+        self._cache_put((message, history_key), result)
+        return result
+    
+    async def transform_batch(
+        self,
+        messages: List[str],
+        histories: Optional[List[Optional[List[ChatMessage]]]] = None,
+    ) -> List[TransformedQuery]:
+        """
+        Transform several messages concurrently.
         
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(
-            None,
-            lambda: self.transform(message, history)
+        In-flight requests are capped by max_concurrency; a message whose
+        transformation fails gets the fallback query.
+        
+        Args:
+            messages: User messages
+            histories: Conversation history per message (optional)
+            
+        Returns:
+            One TransformedQuery per message, in input order
+        """
+        histories = histories or [None] * len(messages)
+        return list(await asyncio.gather(
+            *(self.transform_async(m, h) for m, h in zip(messages, histories))
+        ))
+    
+    def _parse_response(self, message: str, content: str) -> TransformedQuery:
+        """
+        Parse the LLM response into a TransformedQuery.
+        
+        Raises:
+            json.JSONDecodeError: If the response holds no valid JSON
+        """
+        result_text = content.strip()
+        logger.info(f"Raw Query Transform Response: {result_text}")
+        
+        # Extract JSON object using regex (most robust way)
+        json_match = _JSON_OBJECT_RE.search(result_text)
+        result = _json_loads(json_match.group(0) if json_match else result_text)
+        
+        # Map new JSON structure to internal schema
+        filters = result.get("filters", {})
+        semantic_query = result.get("semantic_query", message)
+        keyword_string = result.get("keyword_string", message)
+        
+        # Flatten filters for internal use
+        flattened_filters = {}
+        if filters.get("location") and filters["location"].get("value"):
+            flattened_filters["location"] = filters["location"]["value"]
+        
+        if filters.get("min_experience") and filters["min_experience"].get("value"):
+            # Handle possible string/int types
+            try:
+                flattened_filters["min_experience_years"] = float(filters["min_experience"]["value"])
+            except (ValueError, TypeError):
+                pass
+        
+        if filters.get("skills"):
+            skills_data = filters["skills"]
+            # Handle list of strings or list of objects (case where LLM changes structure)
+            flattened_skills = []
+            for skill in skills_data:
+                if isinstance(skill, str):
+                    flattened_skills.append(skill)
+                elif isinstance(skill, dict) and "name" in skill:
+                    flattened_skills.append(skill["name"])
+            
+            if flattened_skills:
+                flattened_filters["required_skills"] = flattened_skills
+
+        return TransformedQuery(
+            search_query=semantic_query, # Legacy mapping
+            semantic_query=semantic_query,
+            keyword_string=keyword_string,
+            filters=flattened_filters,
+            is_search_needed=result.get("is_search_needed", True),
+            intent=result.get("intent", "search"),
+            explanation=result.get("explanation"),
+        )
+    
+    @staticmethod
+    def _fallback(message: str) -> TransformedQuery:
+        """Fallback: use the original message as the search query."""
+        return TransformedQuery(
+            search_query=message,
+            semantic_query=message,
+            keyword_string=message,
+            filters={},
+            is_search_needed=True,
+            intent="search",
         )
 
 
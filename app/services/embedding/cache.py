@@ -0,0 +1,129 @@
+"""
+Content-addressed embedding cache.
+
+CV chunks repeat a lot across candidates (section headers, standard skill
+lists, template sentences). Vectors are cached in Redis under a hash of
+(model, text), so identical text is embedded once per model and only
+cache misses reach the embedding model.
+"""
+
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import redis
+
+from app.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Redis-backed cache of embedding vectors keyed by content hash."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str] = None,
+        ttl_seconds: int = 30 * 86400,
+    ):
+        """
+        Initialize the embedding cache.
+
+        Args:
+            redis_url: Redis connection URL (defaults to settings)
+            ttl_seconds: Lifetime of cached vectors (30 days by default)
+        """
+        self.redis_url = redis_url or settings.redis_url
+        self.ttl_seconds = ttl_seconds
+        self._redis: Optional[redis.Redis] = None
+
+    def _get_redis(self) -> redis.Redis:
+        if self._redis is None:
+            self._redis = redis.Redis.from_url(self.redis_url)
+        return self._redis
+
+    @staticmethod
+    def _key(text: str, model_id: str) -> str:
+        """Content address of a text under a given model."""
+        digest = hashlib.blake2b(
+            f"{model_id}\0{text}".encode(), digest_size=32
+        ).hexdigest()
+        return f"emb:{digest}"
+
+    def get_or_compute_many(
+        self,
+        texts: List[str],
+        model_id: str,
+        compute_batch: Callable[[List[str]], Sequence[np.ndarray]],
+    ) -> List[np.ndarray]:
+        """
+        Return embeddings for texts, computing only the cache misses.
+
+        Duplicate texts within the call are embedded once. If Redis is
+        unavailable every text is computed and nothing is cached. Cached
+        vectors are read back as float32 views over the stored bytes.
+
+        Args:
+            texts: Texts to embed
+            model_id: Embedding model name (part of the cache key)
+            compute_batch: Embeds a list of texts in one call
+
+        Returns:
+            One float32 embedding array per text, in input order
+        """
+        if not texts:
+            return []
+
+        keys = [self._key(t, model_id) for t in texts]
+        unique_keys = list(dict.fromkeys(keys))
+
+        vectors: Dict[str, np.ndarray] = {}
+        try:
+            r = self._get_redis()
+            for key, raw in zip(unique_keys, r.mget(unique_keys)):
+                if raw is not None:
+                    vectors[key] = np.frombuffer(raw, dtype=np.float32)
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {e}")
+
+        # Embed each missing text once
+        missing = {k: t for k, t in zip(keys, texts) if k not in vectors}
+        if missing:
+            computed = compute_batch(list(missing.values()))
+            new_vectors = {
+                key: np.ascontiguousarray(vector, dtype=np.float32)
+                for key, vector in zip(missing, computed)
+            }
+            vectors.update(new_vectors)
+
+            try:
+                pipe = self._get_redis().pipeline(transaction=False)
+                for key, vector in new_vectors.items():
+                    pipe.set(key, vector.tobytes(), ex=self.ttl_seconds)
+                pipe.execute()
+            except Exception as e:
+                logger.warning(f"Embedding cache store failed: {e}")
+
+        logger.info(
+            f"Embedding cache: {len(unique_keys) - len(missing)} hits, "
+            f"{len(missing)} computed"
+        )
+        return [vectors[k] for k in keys]
+
+
+# Singleton instance
+_embedding_cache: Optional[EmbeddingCache] = None
+_embedding_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the embedding cache singleton (thread-safe)."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache()
+    return _embedding_cache
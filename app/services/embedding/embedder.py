@@ -12,6 +12,7 @@ The service handles:
 """
 
 import logging
+import threading
 from typing import List, Optional, Union
 import numpy as np
 
@@ -52,6 +53,7 @@ class EmbeddingService:
         self.preprocess_vietnamese = preprocess_vietnamese
 
         self._model = None
+        self._init_lock = threading.Lock()
         self._initialized = False
         self._preprocessor = get_preprocessor() if preprocess_vietnamese else None
 
@@ -60,43 +62,48 @@ class EmbeddingService:
         if self._initialized:
             return
 
-        try:
-            from sentence_transformers import SentenceTransformer
-            import torch
+        # Threads may race here; load the model only once
+        with self._init_lock:
+            if self._initialized:
+                return
 
-            logger.info(f"Loading embedding model: {self.model_name}")
+            try:
+                from sentence_transformers import SentenceTransformer
+                import torch
+
+                logger.info(f"Loading embedding model: {self.model_name}")
             
-            # Smart device selection
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            logger.info(f"Attempting to use device: {device}")
+                # Smart device selection
+                device = "cuda" if torch.cuda.is_available() else "cpu"
+                logger.info(f"Attempting to use device: {device}")
             
-            try:
-                self._model = SentenceTransformer(
-                    self.model_name,
-                    cache_folder=self.cache_dir,
-                    device=device
-                )
-            except RuntimeError as e:
-                if "out of memory" in str(e).lower():
-                    logger.warning("CUDA Out of Memory! Falling back to CPU for embeddings.")
-                    torch.cuda.empty_cache()
-                    device = "cpu"
+                try:
                     self._model = SentenceTransformer(
                         self.model_name,
                         cache_folder=self.cache_dir,
-                        device="cpu"
+                        device=device
                     )
-                else:
-                    raise e
+                except RuntimeError as e:
+                    if "out of memory" in str(e).lower():
+                        logger.warning("CUDA Out of Memory! Falling back to CPU for embeddings.")
+                        torch.cuda.empty_cache()
+                        device = "cpu"
+                        self._model = SentenceTransformer(
+                            self.model_name,
+                            cache_folder=self.cache_dir,
+                            device="cpu"
+                        )
+                    else:
+                        raise e
                     
-            self._initialized = True
-            logger.info(
-                f"Model loaded on {device}. Dimension: {self._model.get_sentence_embedding_dimension()}"
-            )
-        except ImportError:
-            raise ImportError(
-                "sentence-transformers not installed. Run: pip install sentence-transformers"
-            )
+                self._initialized = True
+                logger.info(
+                    f"Model loaded on {device}. Dimension: {self._model.get_sentence_embedding_dimension()}"
+                )
+            except ImportError:
+                raise ImportError(
+                    "sentence-transformers not installed. Run: pip install sentence-transformers"
+                )
 
     @property
     def dimension(self) -> int:
@@ -263,14 +270,57 @@ class EmbeddingService:
         # but it's optional, so we just use regular embedding
         return self.embed(document)
 
+    def embed_documents(
+        self,
+        documents: List[str],
+        batch_size: int = 32,
+    ) -> np.ndarray:
+        """
+        Embed several documents in one batched model call.
+        
+        Same vectors as calling embed_document on each, but the model
+        processes them as padded batches instead of one forward pass each.
+        Rows stay a contiguous float32 matrix rather than nested Python
+        float lists, so they can be cached and bound to pgvector without
+        per-element boxing.
+        
+        Args:
+            documents: Document texts
+            batch_size: Number of texts per forward pass
+            
+        Returns:
+            (len(documents), dimension) float32 array, in input order
+        """
+        self._lazy_init()
+
+        if not documents:
+            return np.empty((0, self.dimension), dtype=np.float32)
+
+        if self.preprocess_vietnamese and self._preprocessor:
+            documents = [
+                self._preprocessor.preprocess_for_embedding(d) for d in documents
+            ]
+
+        embeddings = self._model.encode(
+            documents,
+            batch_size=batch_size,
+            show_progress_bar=False,
+            convert_to_numpy=True,
+        )
+
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
 
 # Singleton instance
 _embedding_service: Optional[EmbeddingService] = None
+_embedding_service_lock = threading.Lock()
 
 
 def get_embedding_service() -> EmbeddingService:
-    """Get or create the embedding service singleton."""
+    """Get or create the embedding service singleton (thread-safe)."""
     global _embedding_service
     if _embedding_service is None:
-        _embedding_service = EmbeddingService()
+        with _embedding_service_lock:
+            if _embedding_service is None:
+                _embedding_service = EmbeddingService()
     return _embedding_service
@@ -1,7 +1,7 @@
 """Ingestion services initialization."""
 
-from app.services.ingestion.ocr import OCRService
+from app.services.ingestion.ocr import OCRService, get_ocr_service
 from app.services.ingestion.layout import LayoutProcessor
 from app.services.ingestion.preprocessor import VietnamesePreprocessor
 
-__all__ = ["OCRService", "LayoutProcessor", "VietnamesePreprocessor"]
+__all__ = ["OCRService", "get_ocr_service", "LayoutProcessor", "VietnamesePreprocessor"]
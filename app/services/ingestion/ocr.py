@@ -10,6 +10,7 @@ Handles:
 
 import os
 import logging
+import threading
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
@@ -55,6 +56,7 @@ class OCRService:
 
     def __init__(self):
         self._ocr = None
+        self._init_lock = threading.Lock()
         self._initialized = False
 
     def _lazy_init(self):
@@ -62,28 +64,33 @@ class OCRService:
         if self._initialized:
             return
 
-        try:
-            from paddleocr import PaddleOCR
-
-            self._ocr = PaddleOCR(
-                use_angle_cls=True,
-                lang=settings.ocr_lang,
-                use_gpu=settings.ocr_use_gpu,
-                show_log=False,
-                # Optimization settings
-                det_db_thresh=0.3,
-                det_db_box_thresh=0.5,
-                det_db_unclip_ratio=1.6,
-                rec_batch_num=16,
-            )
-            self._initialized = True
-            logger.info(
-                f"PaddleOCR initialized with lang={settings.ocr_lang}, "
-                f"gpu={settings.ocr_use_gpu}"
-            )
-        except ImportError:
-            logger.error("PaddleOCR not installed. Please install paddleocr package.")
-            raise
+        # Threads may race here; load the model only once
+        with self._init_lock:
+            if self._initialized:
+                return
+
+            try:
+                from paddleocr import PaddleOCR
+
+                self._ocr = PaddleOCR(
+                    use_angle_cls=True,
+                    lang=settings.ocr_lang,
+                    use_gpu=settings.ocr_use_gpu,
+                    show_log=False,
+                    # Optimization settings
+                    det_db_thresh=0.3,
+                    det_db_box_thresh=0.5,
+                    det_db_unclip_ratio=1.6,
+                    rec_batch_num=16,
+                )
+                self._initialized = True
+                logger.info(
+                    f"PaddleOCR initialized with lang={settings.ocr_lang}, "
+                    f"gpu={settings.ocr_use_gpu}"
+                )
+            except ImportError:
+                logger.error("PaddleOCR not installed. Please install paddleocr package.")
+                raise
 
     def extract_from_image(self, image_path: str) -> List[OCRBlock]:
         """
@@ -269,3 +276,18 @@ class OCRService:
             logger.error(f"Error extracting native text: {e}")
             # Fallback to OCR
             return self.extract_text_only(pdf_path)
+
+
+# Singleton instance
+_ocr_service: Optional[OCRService] = None
+_ocr_service_lock = threading.Lock()
+
+
+def get_ocr_service() -> OCRService:
+    """Get or create the OCR service singleton (thread-safe; keeps PaddleOCR loaded)."""
+    global _ocr_service
+    if _ocr_service is None:
+        with _ocr_service_lock:
+            if _ocr_service is None:
+                _ocr_service = OCRService()
+    return _ocr_service
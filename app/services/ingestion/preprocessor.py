@@ -9,12 +9,34 @@ Key functionality:
 """
 
 import logging
+import threading
 import re
 from typing import Optional, List
 from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+# Vietnamese-specific characters
+_VIETNAMESE_CHARS = frozenset(
+    "àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệ"
+    "ìíỉĩịòóỏõọôồốổỗộơờớởỡợ"
+    "ùúủũụưừứửữựỳýỷỹỵđ"
+    "ÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆ"
+    "ÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢ"
+    "ÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ"
+)
+
+# Precompiled patterns for the whitespace / cleaning passes
+_SPACES_RE = re.compile(r"[^\S\n]+")
+_NEWLINES_RE = re.compile(r"\n{3,}")
+_CONTROL_CHARS_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]")
+_DISALLOWED_CHARS_RE = re.compile(
+    r"[^\w\s\-_.,;:!?@#$%&*()\[\]{}\"\'àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệ"
+    r"ìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ"
+    r"ÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢ"
+    r"ÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ]+"
+)
+
 
 class VietnamesePreprocessor:
     """
@@ -42,13 +64,14 @@ class VietnamesePreprocessor:
         try:
             import underthesea
             self._underthesea = underthesea
-            self._initialized = True
             logger.info("Underthesea Vietnamese NLP initialized")
         except ImportError:
             logger.warning(
                 "Underthesea not installed. Vietnamese word segmentation disabled. "
                 "Install with: pip install underthesea"
             )
+        # Don't retry the failed import (a full sys.path scan) on every call
+        self._initialized = True
 
     def segment_words(self, text: str, join_char: str = "_") -> str:
         """
@@ -134,16 +157,8 @@ class VietnamesePreprocessor:
         Returns:
             "vi" for Vietnamese, "en" for English, "mixed" for mixed content
         """
-        # Vietnamese-specific characters
-        vietnamese_chars = set("àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệ"
-                               "ìíỉĩịòóỏõọôồốổỗộơờớởỡợ"
-                               "ùúủũụưừứửữựỳýỷỹỵđ"
-                               "ÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆ"
-                               "ÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢ"
-                               "ÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ")
-
-        text_chars = set(text)
-        vn_char_count = len(text_chars.intersection(vietnamese_chars))
+        # Distinct Vietnamese-specific characters present in the text
+        vn_char_count = len(_VIETNAMESE_CHARS.intersection(text))
 
         if vn_char_count > 5:
             return "vi"
@@ -189,37 +204,33 @@ class VietnamesePreprocessor:
     def _normalize_whitespace(self, text: str) -> str:
         """Normalize whitespace while preserving newlines."""
         # Replace multiple spaces with single space
-        text = re.sub(r"[^\S\n]+", " ", text)
+        text = _SPACES_RE.sub(" ", text)
         # Replace multiple newlines with double newline
-        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = _NEWLINES_RE.sub("\n\n", text)
         return text.strip()
 
     def _clean_text(self, text: str) -> str:
         """Clean text while preserving Vietnamese characters and meaningful punctuation."""
         # Remove control characters except newlines and tabs
-        text = re.sub(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f-\x9f]", "", text)
+        text = _CONTROL_CHARS_RE.sub("", text)
 
         # Keep Vietnamese chars, alphanumeric, common punctuation, and whitespace
         # This regex allows Vietnamese diacritics
-        text = re.sub(
-            r"[^\w\s\-_.,;:!?@#$%&*()\[\]{}\"\'àáảãạăằắẳẵặâầấẩẫậèéẻẽẹêềếểễệ"
-            r"ìíỉĩịòóỏõọôồốổỗộơờớởỡợùúủũụưừứửữựỳýỷỹỵđ"
-            r"ÀÁẢÃẠĂẰẮẲẴẶÂẦẤẨẪẬÈÉẺẼẸÊỀẾỂỄỆÌÍỈĨỊÒÓỎÕỌÔỒỐỔỖỘƠỜỚỞỠỢ"
-            r"ÙÚỦŨỤƯỪỨỬỮỰỲÝỶỸỴĐ]+",
-            " ",
-            text,
-        )
+        text = _DISALLOWED_CHARS_RE.sub(" ", text)
 
         return text
 
 
 # Singleton instance
 _preprocessor: Optional[VietnamesePreprocessor] = None
+_preprocessor_lock = threading.Lock()
 
 
 def get_preprocessor() -> VietnamesePreprocessor:
-    """Get or create the Vietnamese preprocessor singleton."""
+    """Get or create the Vietnamese preprocessor singleton (thread-safe)."""
     global _preprocessor
     if _preprocessor is None:
-        _preprocessor = VietnamesePreprocessor()
+        with _preprocessor_lock:
+            if _preprocessor is None:
+                _preprocessor = VietnamesePreprocessor()
     return _preprocessor
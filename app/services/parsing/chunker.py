@@ -12,14 +12,50 @@ This approach:
 """
 
 import re
-import uuid
 import logging
-from typing import List, Dict, Optional, Any
+import secrets
+import threading
+import unicodedata
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
 logger = logging.getLogger(__name__)
 
+# Item-splitting patterns, compiled once for all chunker instances
+_BLANK_LINES_RE = re.compile(r"\n{2,}")
+_JOB_TITLE_SPLIT_RE = re.compile(r"\s*[-|]\s*|\s+at\s+")
+_JOB_DATES_RE = re.compile(
+    r"(\d{1,2}[\/\-]\d{2,4}|\d{4})\s*[-–]\s*(\d{1,2}[\/\-]\d{2,4}|\d{4}|present|current|nay|hiện\s*tại)",
+    re.IGNORECASE,
+)
+_BULLET_PREFIX_RE = re.compile(r"^[•\-\*]\s*")
+
+# Keywords identifying degree and school lines in education entries
+_DEGREE_KEYWORDS = (
+    "bachelor", "master", "ph.d", "mba", "b.s", "m.s",
+    "cử nhân", "thạc sĩ", "tiến sĩ", "kỹ sư",
+)
+_SCHOOL_KEYWORDS = (
+    "university", "college", "institute",
+    "đại học", "học viện", "cao đẳng",
+)
+
+
+def _compile_header_patterns(section_patterns: Dict["SectionType", List[str]]) -> "re.Pattern":
+    """
+    Combine per-section header patterns into one alternation.
+    
+    Each section becomes a named group (the SectionType name), tried in
+    dict order, so a single match() gives the same answer as testing the
+    patterns one by one.
+    """
+    groups = []
+    for section_type, patterns in section_patterns.items():
+        alternatives = "|".join(p.removeprefix("(?i)^") for p in patterns)
+        groups.append(f"(?P<{section_type.name}>{alternatives})")
+    return re.compile("|".join(groups), re.IGNORECASE)
+
 
 class SectionType(str, Enum):
     """Types of CV sections."""
@@ -37,7 +73,7 @@ class SectionType(str, Enum):
     OTHER = "other"
 
 
-@dataclass
+@dataclass(slots=True)
 class Chunk:
     """
     Represents a chunk of CV content.
@@ -54,7 +90,9 @@ class Chunk:
 
     content: str
     section: SectionType
-    id: str = field(default_factory=lambda: str(uuid.uuid4()))
+    # 128 random bits as 32 hex chars (fits the VARCHAR(36) key) without
+    # building a UUID object per chunk
+    id: str = field(default_factory=lambda: secrets.token_hex(16))
     subsection: Optional[str] = None
     parent_id: Optional[str] = None
     metadata: Dict[str, Any] = field(default_factory=dict)
@@ -161,6 +199,20 @@ class SectionAwareChunker:
         ],
     }
 
+    # All header patterns as one compiled alternation
+    _SECTION_HEADER_RE = _compile_header_patterns(SECTION_PATTERNS)
+
+    # Same alternation anchored at every line start, for one pass per document.
+    # Matching stays on str: a bytes pattern over UTF-8 only case-folds ASCII,
+    # so uppercase Vietnamese headers ("HỌC VẤN") would stop matching, and
+    # Vietnamese text is stored 2 bytes per character internally anyway.
+    # Whitespace in the header patterns is narrowed to exclude newlines so a
+    # match cannot run into the next line, as per-line matching never could.
+    _SECTION_LINE_RE = re.compile(
+        r"^[^\S\n]*(?:" + _SECTION_HEADER_RE.pattern.replace(r"\s", r"[^\S\n]") + ")",
+        re.IGNORECASE | re.MULTILINE,
+    )
+
     # Patterns for detecting individual items within sections
     ITEM_PATTERNS = {
         SectionType.EXPERIENCE: [
@@ -203,14 +255,13 @@ class SectionAwareChunker:
         if not text or len(text.strip()) < self.min_chunk_size:
             return []
 
-        # Step 1: Split by major sections
-        sections = self._detect_sections(text)
-
-        # Step 2: Create parent and child chunks for each section
+        # Sections are produced lazily while the header scan advances, and
+        # each one is chunked as soon as it is sliced out
         all_chunks = []
         order_index = 0
+        child_count = 0
 
-        for section_type, section_content in sections:
+        for section_type, section_content in self._iter_sections(text):
             # Create parent chunk for the section
             parent_chunk = Chunk(
                 content=section_content,
@@ -230,7 +281,8 @@ class SectionAwareChunker:
                 for child in children:
                     child.order_index = order_index
                     order_index += 1
-                    all_chunks.append(child)
+                all_chunks.extend(children)
+                child_count += len(children)
             else:
                 # No children, just add parent if it has enough content
                 if len(section_content.strip()) >= self.min_chunk_size:
@@ -238,8 +290,7 @@ class SectionAwareChunker:
 
         logger.info(
             f"Created {len(all_chunks)} chunks from document "
-            f"({sum(1 for c in all_chunks if c.is_parent)} parents, "
-            f"{sum(1 for c in all_chunks if not c.is_parent)} children)"
+            f"({len(all_chunks) - child_count} parents, {child_count} children)"
         )
 
         return all_chunks
@@ -250,36 +301,48 @@ class SectionAwareChunker:
         
         Returns list of (SectionType, content) tuples.
         """
-        sections = []
-        lines = text.split("\n")
+        return list(self._iter_sections(text))
+
+    def _iter_sections(self, text: str) -> Iterator[Tuple[SectionType, str]]:
+        """
+        Yield (SectionType, content) for each section, in document order.
+        
+        Header lines are found in one scan of the whole document and the
+        sections are sliced out between them. Text is NFC-normalized first
+        so Vietnamese headers with decomposed diacritics still match.
+        """
+        text = unicodedata.normalize("NFC", text)
 
         current_section = SectionType.OTHER
-        current_content = []
-
-        for line in lines:
-            # Check if this line is a section header
-            detected_section = self._detect_section_header(line)
-
-            if detected_section and detected_section != current_section:
-                # Save previous section
-                if current_content:
-                    content = "\n".join(current_content).strip()
-                    if content:
-                        sections.append((current_section, content))
-
-                # Start new section
-                current_section = detected_section
-                current_content = [line]
-            else:
-                current_content.append(line)
+        section_start = 0
+
+        for match in self._SECTION_LINE_RE.finditer(text):
+            line_start = match.start()
+            line_end = text.find("\n", line_start)
+            if line_end == -1:
+                line_end = len(text)
 
-        # Save last section
-        if current_content:
-            content = "\n".join(current_content).strip()
+            # Headers are usually short
+            if len(text[line_start:line_end].strip()) > 100:
+                continue
+
+            detected_section = SectionType[match.lastgroup]
+            if detected_section is current_section:
+                continue
+
+            # Emit previous section
+            content = text[section_start:line_start].strip()
             if content:
-                sections.append((current_section, content))
+                yield current_section, content
+
+            # Start new section at the header line
+            current_section = detected_section
+            section_start = line_start
 
-        return sections
+        # Emit last section
+        content = text[section_start:].strip()
+        if content:
+            yield current_section, content
 
     def _detect_section_header(self, line: str) -> Optional[SectionType]:
         """Check if a line is a section header and return its type."""
@@ -288,12 +351,11 @@ class SectionAwareChunker:
         if not line or len(line) > 100:  # Headers are usually short
             return None
 
-        for section_type, patterns in self.SECTION_PATTERNS.items():
-            for pattern in patterns:
-                if re.match(pattern, line):
-                    return section_type
+        # Patterns are NFC; decomposed diacritics would not match
+        line = unicodedata.normalize("NFC", line)
 
-        return None
+        match = self._SECTION_HEADER_RE.match(line)
+        return SectionType[match.lastgroup] if match else None
 
     def _create_child_chunks(
         self,
@@ -308,15 +370,12 @@ class SectionAwareChunker:
         For Education: each degree/school
         For Projects: each project
         """
-        if section_type not in [
-            SectionType.EXPERIENCE,
-            SectionType.EDUCATION,
-            SectionType.PROJECTS,
-        ]:
+        splitter = self._ITEM_SPLITTERS.get(section_type)
+        if splitter is None:
             return []
 
         children = []
-        items = self._split_section_into_items(section_content, section_type)
+        items = splitter(self, section_content)
 
         for item_content, item_metadata in items:
             if len(item_content.strip()) >= self.min_chunk_size:
@@ -339,27 +398,15 @@ class SectionAwareChunker:
         
         Returns list of (content, metadata) tuples.
         """
-        if section_type == SectionType.EXPERIENCE:
-            return self._split_experience_section(content)
-        elif section_type == SectionType.EDUCATION:
-            return self._split_education_section(content)
-        elif section_type == SectionType.PROJECTS:
-            return self._split_projects_section(content)
-        return []
+        splitter = self._ITEM_SPLITTERS.get(section_type)
+        return splitter(self, content) if splitter else []
 
     def _split_experience_section(self, content: str) -> List[tuple]:
         """Split work experience section into individual job entries."""
         items = []
 
-        # Pattern for job entries (company names often start with capital letters)
-        # or job titles followed by company
-        job_pattern = r"(?:^|\n\n)([A-Z][^\n]*(?:\n(?![A-Z])[^\n]+)*)"
-
-        # Try to find job entries by looking for date patterns
-        date_pattern = r"(\d{1,2}[\/\-]\d{2,4}|\d{4})\s*[-–]\s*(\d{1,2}[\/\-]\d{2,4}|\d{4}|present|current|nay|hiện\s*tại)"
-
         # Split by blank lines and check each block
-        blocks = re.split(r"\n{2,}", content)
+        blocks = _BLANK_LINES_RE.split(content)
 
         for block in blocks:
             block = block.strip()
@@ -374,14 +421,14 @@ class SectionAwareChunker:
                 first_line = lines[0].strip()
                 # Try to extract position and company
                 if " - " in first_line or " | " in first_line or " at " in first_line.lower():
-                    parts = re.split(r"\s*[-|]\s*|\s+at\s+", first_line, 1)
+                    parts = _JOB_TITLE_SPLIT_RE.split(first_line, 1)
                     if len(parts) >= 2:
                         metadata["position"] = parts[0].strip()
                         metadata["company"] = parts[1].strip()
                         metadata["title"] = f"{parts[0].strip()} at {parts[1].strip()}"
 
                 # Try to extract dates
-                date_match = re.search(date_pattern, block, re.IGNORECASE)
+                date_match = _JOB_DATES_RE.search(block)
                 if date_match:
                     metadata["start_date"] = date_match.group(1)
                     metadata["end_date"] = date_match.group(2)
@@ -394,7 +441,7 @@ class SectionAwareChunker:
     def _split_education_section(self, content: str) -> List[tuple]:
         """Split education section into individual degree/school entries."""
         items = []
-        blocks = re.split(r"\n{2,}", content)
+        blocks = _BLANK_LINES_RE.split(content)
 
         for block in blocks:
             block = block.strip()
@@ -406,28 +453,15 @@ class SectionAwareChunker:
 
             if lines:
                 first_line = lines[0].strip()
-
-                # Try to detect degree and school
-                degree_keywords = [
-                    "bachelor", "master", "ph.d", "mba", "b.s", "m.s",
-                    "cử nhân", "thạc sĩ", "tiến sĩ", "kỹ sư"
-                ]
-                school_keywords = [
-                    "university", "college", "institute",
-                    "đại học", "học viện", "cao đẳng"
-                ]
+                first_line_lower = first_line.lower()
 
                 # Check for degree
-                for keyword in degree_keywords:
-                    if keyword.lower() in first_line.lower():
-                        metadata["degree"] = first_line
-                        break
+                if any(keyword in first_line_lower for keyword in _DEGREE_KEYWORDS):
+                    metadata["degree"] = first_line
 
                 # Check for school
-                for keyword in school_keywords:
-                    if keyword.lower() in first_line.lower():
-                        metadata["school"] = first_line
-                        break
+                if any(keyword in first_line_lower for keyword in _SCHOOL_KEYWORDS):
+                    metadata["school"] = first_line
 
                 metadata["title"] = first_line
 
@@ -441,7 +475,7 @@ class SectionAwareChunker:
 
         # Projects are often separated by blank lines or bullet points
         # First try splitting by blank lines
-        blocks = re.split(r"\n{2,}", content)
+        blocks = _BLANK_LINES_RE.split(content)
 
         for block in blocks:
             block = block.strip()
@@ -454,7 +488,7 @@ class SectionAwareChunker:
             if lines:
                 first_line = lines[0].strip()
                 # Remove bullet points
-                first_line = re.sub(r"^[•\-\*]\s*", "", first_line)
+                first_line = _BULLET_PREFIX_RE.sub("", first_line)
                 metadata["name"] = first_line
                 metadata["title"] = first_line
 
@@ -462,6 +496,13 @@ class SectionAwareChunker:
 
         return items
 
+    # Sections that get child chunks, mapped to their item splitter
+    _ITEM_SPLITTERS = {
+        SectionType.EXPERIENCE: _split_experience_section,
+        SectionType.EDUCATION: _split_education_section,
+        SectionType.PROJECTS: _split_projects_section,
+    }
+
     def get_section_summary(self, chunks: List[Chunk]) -> Dict[str, int]:
         """Get summary of chunks by section type."""
         summary = {}
@@ -469,3 +510,18 @@ class SectionAwareChunker:
             section = chunk.section.value
             summary[section] = summary.get(section, 0) + 1
         return summary
+
+
+# Singleton instance (the chunker holds no per-document state)
+_chunker: Optional[SectionAwareChunker] = None
+_chunker_lock = threading.Lock()
+
+
+def get_chunker() -> SectionAwareChunker:
+    """Get or create the section-aware chunker singleton (thread-safe)."""
+    global _chunker
+    if _chunker is None:
+        with _chunker_lock:
+            if _chunker is None:
+                _chunker = SectionAwareChunker()
+    return _chunker
@@ -9,6 +9,7 @@ Ensures CV data quality by:
 
 import json
 import logging
+import threading
 from typing import Optional, Tuple
 from dataclasses import dataclass
 
@@ -239,11 +240,14 @@ class CVDataEvaluator:
 
 # Singleton instance
 _evaluator: Optional[CVDataEvaluator] = None
+_evaluator_lock = threading.Lock()
 
 
 def get_cv_evaluator() -> CVDataEvaluator:
-    """Get or create the CV evaluator singleton."""
+    """Get or create the CV evaluator singleton (thread-safe)."""
     global _evaluator
     if _evaluator is None:
-        _evaluator = CVDataEvaluator()
+        with _evaluator_lock:
+            if _evaluator is None:
+                _evaluator = CVDataEvaluator()
     return _evaluator
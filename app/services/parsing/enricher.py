@@ -17,6 +17,7 @@ This enrichment helps the embedding model understand:
 """
 
 import logging
+import threading
 from typing import Optional, List, Dict, Any
 
 from app.services.parsing.chunker import Chunk, SectionType
@@ -288,7 +289,7 @@ class ContextualEnricher:
             parts.append(f"{recent.position} at {recent.company}")
 
         # Add top skills
-        skills = resume.get_all_skills()[:5]
+        skills = resume.get_all_skills(limit=5)
         if skills:
             parts.append(f"Skills: {', '.join(skills)}")
 
@@ -302,11 +303,14 @@ class ContextualEnricher:
 
 # Singleton instance
 _enricher: Optional[ContextualEnricher] = None
+_enricher_lock = threading.Lock()
 
 
 def get_enricher() -> ContextualEnricher:
-    """Get or create the contextual enricher singleton."""
+    """Get or create the contextual enricher singleton (thread-safe)."""
     global _enricher
     if _enricher is None:
-        _enricher = ContextualEnricher()
+        with _enricher_lock:
+            if _enricher is None:
+                _enricher = ContextualEnricher()
     return _enricher
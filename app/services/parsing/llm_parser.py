@@ -11,15 +11,23 @@ This module handles:
 
 import json
 import logging
-from typing import Optional, Dict, Any
+import threading
+from typing import Optional, Dict, Any, List, Union
 from datetime import datetime
 
+from pydantic import ValidationError
+
 from app.config import get_settings
 from app.schemas.resume import ResumeSchema
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Completion budget for one parsed CV; batch requests scale it per CV up to
+# the provider's output limit so K resumes are not truncated mid-JSON
+PARSE_MAX_TOKENS = 8192
+PARSE_MAX_TOKENS_LIMIT = 32768
+
 
 # System prompt for CV parsing
 SYSTEM_PROMPT = """You are an expert CV/Resume parser. Your task is to extract structured information from CV text.
@@ -150,6 +158,104 @@ class LLMParser:
         """
         return self.parse_resume(text, source_filename)
 
+    def parse_resume_batch(
+        self,
+        texts: List[str],
+        source_filenames: Optional[List[Optional[str]]] = None,
+    ) -> List[Union[ResumeSchema, Exception]]:
+        """
+        Parse several CVs with a single LLM request.
+        
+        The CVs are packed into one prompt between numbered sentinels and the
+        model returns one object per CV tagged with its index, so the schema
+        and instructions are sent (and rate-limited) once per batch instead of
+        once per CV. CVs the model drops or returns invalid are re-parsed
+        individually; a CV whose re-parse also fails yields its exception in
+        place of a resume so the rest of the batch is kept.
+        
+        Args:
+            texts: Raw CV texts to parse
+            source_filenames: Original filenames, aligned with texts
+            
+        Returns:
+            One ResumeSchema (or the exception that failed it) per text, in
+            input order
+        """
+        self._lazy_init()
+
+        filenames = source_filenames or [None] * len(texts)
+        # Too-short texts fail on their own in the per-CV pass below
+        batch = [i for i, text in enumerate(texts) if text and len(text.strip()) >= 50]
+
+        parsed: Dict[int, ResumeSchema] = {}
+        if len(batch) > 1:
+            try:
+                json_str = self._create_json_completion(
+                    self._build_batch_prompt([texts[i] for i in batch]),
+                    max_tokens=min(PARSE_MAX_TOKENS * len(batch), PARSE_MAX_TOKENS_LIMIT),
+                )
+                items = json.loads(json_str).get("resumes", [])
+
+                for item in items:
+                    if not isinstance(item, dict):
+                        continue
+                    pos = item.pop("idx", None)
+                    if not isinstance(pos, int) or not 0 <= pos < len(batch):
+                        continue
+                    idx = batch[pos]
+                    if idx in parsed:
+                        continue
+                    try:
+                        resume = ResumeSchema.model_validate(item)
+                    except ValidationError as e:
+                        logger.warning(f"Batch parse: CV {idx} failed validation: {e}")
+                        continue
+                    parsed[idx] = self._finalize_resume(resume, texts[idx], filenames[idx])
+
+            except Exception as e:
+                logger.warning(f"Batch parse of {len(batch)} CVs failed, parsing individually: {e}")
+
+            logger.info(f"Batch parse: {len(parsed)}/{len(texts)} CVs parsed in one request")
+
+        return [
+            parsed[i] if i in parsed else self._parse_resume_or_error(text, filenames[i])
+            for i, text in enumerate(texts)
+        ]
+
+    def _parse_resume_or_error(
+        self,
+        text: str,
+        source_filename: Optional[str],
+    ) -> Union[ResumeSchema, Exception]:
+        """Parse one CV of a batch, returning the error instead of raising."""
+        try:
+            return self.parse_resume(text, source_filename)
+        except Exception as e:
+            logger.error(f"Batch parse: {source_filename or 'CV'} failed: {e}")
+            return e
+
+    def _build_batch_prompt(self, texts: List[str]) -> str:
+        """Pack several CV texts into one parse prompt."""
+        schema = ResumeSchema.model_json_schema()
+
+        cv_blocks = "\n\n".join(
+            f"--- CV {i} ---\n{text[:15000]}\n--- END {i} ---"
+            for i, text in enumerate(texts)
+        )
+
+        return f"""Parse each of the following {len(texts)} CVs/Resumes independently.
+
+Return a JSON object of the form {{"resumes": [...]}} with exactly one entry per CV.
+Each entry must match the JSON Schema below and also include an integer "idx"
+field set to the CV number from its "--- CV n ---" marker.
+
+JSON Schema:
+{json.dumps(schema, indent=2)}
+
+{cv_blocks}
+
+Return ONLY valid JSON, no other text."""
+
     def _parse_with_json_mode(
         self,
         text: str,
@@ -157,10 +263,7 @@ class LLMParser:
     ) -> ResumeSchema:
         """
         Parse CV using JSON mode for structured output.
-        Includes retry logic for rate limit errors.
         """
-        import time
-        
         self._lazy_init()
 
         # Create a JSON schema from Pydantic model
@@ -177,6 +280,29 @@ JSON Schema:
 
 Return ONLY valid JSON matching the schema above, no other text."""
 
+        try:
+            json_str = self._create_json_completion(user_prompt)
+            data = json.loads(json_str)
+
+            # Validate with Pydantic
+            resume = ResumeSchema.model_validate(data)
+            return self._finalize_resume(resume, text, source_filename)
+
+        except Exception as e:
+            logger.error(f"Failed to parse CV with LLM: {e}")
+            raise
+
+    def _create_json_completion(
+        self,
+        user_prompt: str,
+        max_tokens: int = PARSE_MAX_TOKENS,
+    ) -> str:
+        """
+        Run a JSON-mode completion with the parsing system prompt.
+        Includes retry logic for rate limit errors.
+        """
+        import time
+
         max_retries = 3
         base_delay = 10  # seconds
         
@@ -190,7 +316,7 @@ Return ONLY valid JSON matching the schema above, no other text."""
                             {"role": "user", "content": user_prompt},
                         ],
                         temperature=0.1,
-                        max_tokens=8192,
+                        max_tokens=max_tokens,
                         response_format={"type": "json_object"},
                     )
                 else:
@@ -203,26 +329,7 @@ Return ONLY valid JSON matching the schema above, no other text."""
                         response_format={"type": "json_object"},
                     )
 
-                # Parse JSON response
-                json_str = response.choices[0].message.content
-                data = json.loads(json_str)
-
-                # Validate with Pydantic
-                resume = ResumeSchema.model_validate(data)
-                resume.source_file = source_filename
-                resume.parsed_at = datetime.utcnow().isoformat()
-                resume.raw_text = text
-
-                resume = self._validate_and_flag(resume)
-
-                logger.info(
-                    f"Successfully parsed CV: {resume.full_name}, "
-                    f"{len(resume.work_experience)} jobs, "
-                    f"{len(resume.skills)} skills, "
-                    f"{len(resume.validation_warnings)} warnings"
-                )
-
-                return resume
+                return response.choices[0].message.content
 
             except Exception as e:
                 error_str = str(e)
@@ -237,10 +344,30 @@ Return ONLY valid JSON matching the schema above, no other text."""
                         )
                         time.sleep(delay)
                         continue
-                
-                logger.error(f"Failed to parse CV with LLM: {e}")
                 raise
 
+    def _finalize_resume(
+        self,
+        resume: ResumeSchema,
+        text: str,
+        source_filename: Optional[str],
+    ) -> ResumeSchema:
+        """Attach source metadata and validation flags to a parsed resume."""
+        resume.source_file = source_filename
+        resume.parsed_at = datetime.utcnow().isoformat()
+        resume.raw_text = text
+
+        resume = self._validate_and_flag(resume)
+
+        logger.info(
+            f"Successfully parsed CV: {resume.full_name}, "
+            f"{len(resume.work_experience)} jobs, "
+            f"{len(resume.skills)} skills, "
+            f"{len(resume.validation_warnings)} warnings"
+        )
+
+        return resume
+
     def _validate_and_flag(self, resume: ResumeSchema) -> ResumeSchema:
         """
         Add validation warnings for missing or suspicious data.
@@ -327,11 +454,14 @@ Return ONLY the extracted value, nothing else. If not found, return "NOT_FOUND".
 
 # Singleton instance
 _parser: Optional[LLMParser] = None
+_parser_lock = threading.Lock()
 
 
 def get_parser() -> LLMParser:
-    """Get or create the LLM parser singleton."""
+    """Get or create the LLM parser singleton (thread-safe)."""
     global _parser
     if _parser is None:
-        _parser = LLMParser()
+        with _parser_lock:
+            if _parser is None:
+                _parser = LLMParser()
     return _parser
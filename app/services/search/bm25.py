@@ -14,14 +14,49 @@ Works alongside vector search for hybrid retrieval.
 """
 
 import logging
-from typing import List, Tuple, Optional, Dict, Any
+import mmap
+import os
+import re
+import struct
+import zipfile
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import List, Tuple, Optional, Dict, Any, Deque, Iterable, Iterator
 from dataclasses import dataclass, field
 import numpy as np
 
 from sqlalchemy.orm import Session
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 logger = logging.getLogger(__name__)
 
+# Score single queries with the JIT-compiled kernel (_score_postings) when
+# numba is installed; the NumPy path gives identical scores without it
+USE_NUMBA = njit is not None
+
+# Word runs of at least two characters. Underscores from Vietnamese word
+# segmentation are part of \w, so compound words stay single tokens. The
+# possessive quantifier (Python 3.11+) stops the engine from backtracking
+# into a run it has already consumed. findall does the whole scan in C and
+# builds only the token strings; DFA engines with Python bindings
+# (hyperscan) report matches through a Python callback per match end,
+# which costs more than this for word-sized tokens.
+_TOKEN_RE = re.compile(r"\w{2,}+")
+
+# Posting term frequencies are stored as int16 (chunks are far shorter than
+# 32k tokens); scoring arrays are float32 throughout
+_FREQ_DTYPE = np.int16
+_MAX_FREQ = np.iinfo(_FREQ_DTYPE).max
+
+# (doc_ids, candidate_ids, [(tokens, indices into the batch), ...])
+_TokenizedBatch = Tuple[List[str], List[str], List[Tuple[List[str], List[int]]]]
+
 
 @dataclass
 class BM25Document:
@@ -30,7 +65,6 @@ class BM25Document:
     id: str
     candidate_id: str
     content: str
-    tokens: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
@@ -50,6 +84,8 @@ class BM25Search:
         k1: float = 1.5,
         b: float = 0.75,
         epsilon: float = 0.25,
+        cache_size: int = 512,
+        store_content: bool = True,
     ):
         """
         Initialize BM25 search.
@@ -58,18 +94,52 @@ class BM25Search:
             k1: Term frequency saturation parameter
             b: Document length normalization parameter
             epsilon: Small constant for IDF smoothing
+            cache_size: Number of ranked result lists kept per index version
+            store_content: Keep document content and metadata for
+                get_document_by_id. Scoring only needs the postings, so
+                callers that never look documents up can skip the copy.
         """
         self.k1 = k1
         self.b = b
         self.epsilon = epsilon
 
-        self.documents: List[BM25Document] = []
+        # Documents are kept as parallel id arrays, not BM25Document objects
+        self.doc_ids: np.ndarray = np.empty(0, dtype=object)
+        self.candidate_ids: np.ndarray = np.empty(0, dtype=object)
+        self.content_store: Optional[Dict[str, Tuple[str, Dict[str, Any]]]] = (
+            {} if store_content else None
+        )
         self.doc_lengths: List[int] = []
         self.avgdl: float = 0.0
-        self.idf: Dict[str, float] = {}
-        self.doc_freqs: Dict[str, int] = {}
+        self.len_norm: np.ndarray = np.zeros(0, dtype=np.float32)
+        self.k1_len_norm: np.ndarray = np.zeros(0, dtype=np.float32)
+        # Terms are interned to int32 ids; idf and doc_freqs are indexed by id
+        self.vocab: Dict[str, int] = {}
+        self.idf: np.ndarray = np.zeros(0, dtype=np.float32)
+        # idf * (k1 + 1): the per-term numerator factor of the BM25 formula
+        self._term_weights: np.ndarray = np.zeros(0, dtype=np.float32)
+        self.doc_freqs: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._id_index: Dict[str, int] = {}
+        # Inverted index as flat CSR arrays: the postings of term t are
+        # _rows[_offsets[t]:_offsets[t + 1]] (int32 document rows) with
+        # term frequencies at the same positions in _freqs (int16)
+        self._offsets: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._rows: np.ndarray = np.zeros(0, dtype=np.int32)
+        self._freqs: np.ndarray = np.zeros(0, dtype=_FREQ_DTYPE)
+        # Per-posting BM25 contributions (float32, aligned with the
+        # posting rows), scored eagerly the first time a term is queried
+        # and valid until the index statistics change
+        self._term_scores: Dict[int, np.ndarray] = {}
+        self._total_length = 0
         self.indexed = False
 
+        # Ranked results keyed by (index version, sorted term id tuples,
+        # top_k). Queries differing only in case, punctuation, spacing,
+        # term order or unknown terms share an entry; the version
+        # invalidates stale entries.
+        self._version = 0
+        self._rank_cached = lru_cache(maxsize=cache_size)(self._rank_queries)
+
     def _tokenize(self, text: str) -> List[str]:
         """
         Simple tokenization for keyword search.
@@ -77,20 +147,12 @@ class BM25Search:
         For Vietnamese, words with underscores (from segmentation)
         are kept as single tokens.
         """
-        # Convert to lowercase
-        text = text.lower()
-
-        # Replace punctuation with spaces (except underscores)
-        import re
-        text = re.sub(r"[^\w\s]", " ", text)
-
-        # Split on whitespace
-        tokens = text.split()
+        return _TOKEN_RE.findall(text.lower())
 
-        # Filter very short tokens
-        tokens = [t for t in tokens if len(t) >= 2]
-
-        return tokens
+    def _term_ids(self, tokens: List[str]) -> List[int]:
+        """Map query tokens to term ids, dropping terms not in the index."""
+        vocab = self.vocab
+        return [i for i in (vocab.get(t, -1) for t in tokens) if i >= 0]
 
     def index_documents(self, documents: List[BM25Document]) -> None:
         """
@@ -99,40 +161,206 @@ class BM25Search:
         Args:
             documents: List of documents to index
         """
-        self.documents = documents
+        self._reset()
+        self._ingest(documents)
+        self._finalize_index()
+
+        logger.info(
+            f"BM25 indexed {len(self.doc_ids)} documents, "
+            f"{len(self.doc_freqs)} unique terms, "
+            f"avgdl={self.avgdl:.1f}"
+        )
+
+    def _reset(self) -> None:
+        """Drop all indexed documents and term statistics."""
+        self.doc_ids = np.empty(0, dtype=object)
+        self.candidate_ids = np.empty(0, dtype=object)
+        if self.content_store is not None:
+            self.content_store = {}
+        self.doc_lengths = []
+        self.vocab = {}
+        self.doc_freqs = np.zeros(0, dtype=np.int32)
+        self._id_index = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._rows = np.zeros(0, dtype=np.int32)
+        self._freqs = np.zeros(0, dtype=_FREQ_DTYPE)
+        self._total_length = 0
+
+    def add_documents_incremental(self, documents: List[BM25Document]) -> None:
+        """
+        Add documents to an existing index without re-indexing the corpus.
+        
+        Only the new documents are tokenized. IDF is a pure function of
+        (N, df), so it is refreshed from the updated document frequencies
+        in O(vocabulary) instead of O(corpus tokens).
+        
+        Args:
+            documents: New documents to append to the index
+        """
+        if not documents:
+            return
 
-        # Tokenize all documents
-        for doc in self.documents:
-            doc.tokens = self._tokenize(doc.content)
+        self._ingest(documents)
+        self._finalize_index()
 
-        # Calculate document lengths
-        self.doc_lengths = [len(doc.tokens) for doc in self.documents]
-        self.avgdl = (
-            sum(self.doc_lengths) / len(self.doc_lengths)
-            if self.doc_lengths
-            else 0
+        logger.info(
+            f"BM25 added {len(documents)} documents "
+            f"(total {len(self.doc_ids)}, {len(self.doc_freqs)} unique terms)"
+        )
+
+    def _ingest(self, documents: List[BM25Document]) -> None:
+        """Tokenize documents and append their statistics to the index."""
+        if self.content_store is not None:
+            for doc in documents:
+                self.content_store[doc.id] = (doc.content, doc.metadata)
+        self._ingest_batches([(
+            [d.id for d in documents],
+            [d.candidate_id for d in documents],
+            _tokenize_batch([d.content for d in documents]),
+        )])
+
+    def _ingest_batches(self, batches: Iterable[_TokenizedBatch]) -> None:
+        """
+        Append pre-tokenized batches to the index.
+        
+        Each batch is (doc_ids, candidate_ids, groups) where groups come
+        from _tokenize_batch. Postings are collected across all batches and
+        merged into the CSR arrays once at the end.
+        """
+        offset = len(self.doc_ids)
+        doc_ids: List[str] = []
+        candidate_ids: List[str] = []
+        vocab = self.vocab
+        new_postings: Dict[int, Tuple[List[int], List[int]]] = {}
+
+        for batch_ids, batch_candidates, groups in batches:
+            base = offset + len(doc_ids)
+            doc_ids.extend(batch_ids)
+            candidate_ids.extend(batch_candidates)
+            self.doc_lengths.extend([0] * len(batch_ids))
+
+            for tokens, local_indices in groups:
+                indices = [base + i for i in local_indices]
+                token_ids = [vocab.setdefault(t, len(vocab)) for t in tokens]
+                for i in indices:
+                    self.doc_lengths[i] = len(tokens)
+                self._total_length += len(tokens) * len(indices)
+
+                # Every duplicate gets its own posting
+                weight = len(indices)
+                for term_id, freq in Counter(token_ids).items():
+                    rows, freqs = new_postings.setdefault(term_id, ([], []))
+                    rows.extend(indices)
+                    freqs.extend([freq] * weight)
+
+        for i, doc_id in enumerate(doc_ids, offset):
+            self._id_index[doc_id] = i
+        self.doc_ids = np.concatenate((self.doc_ids, np.array(doc_ids, dtype=object)))
+        self.candidate_ids = np.concatenate(
+            (self.candidate_ids, np.array(candidate_ids, dtype=object))
+        )
+
+        self._merge_postings(len(vocab), new_postings)
+
+    def _merge_postings(
+        self,
+        n_terms: int,
+        new_postings: Dict[int, Tuple[List[int], List[int]]],
+    ) -> None:
+        """
+        Append new postings to the CSR arrays.
+        
+        New documents have higher rows than every indexed one, so each
+        term's new postings go right after its existing ones and rows stay
+        sorted within a term. Both parts are moved with vectorized scatters.
+        """
+        old_terms = len(self._offsets) - 1
+        old_counts = np.zeros(n_terms, dtype=np.int64)
+        old_counts[:old_terms] = np.diff(self._offsets)
+
+        new_terms = np.fromiter(new_postings, dtype=np.int64, count=len(new_postings))
+        new_lengths = np.fromiter(
+            (len(rows) for rows, _ in new_postings.values()),
+            dtype=np.int64, count=len(new_postings),
         )
+        counts = old_counts.copy()
+        counts[new_terms] += new_lengths
+
+        offsets = np.zeros(n_terms + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        rows = np.empty(offsets[-1], dtype=np.int32)
+        freqs = np.empty(offsets[-1], dtype=_FREQ_DTYPE)
+
+        # Existing postings shift by how much earlier terms grew
+        shift = offsets[:old_terms] - self._offsets[:-1]
+        old_dest = np.arange(len(self._rows)) + np.repeat(shift, old_counts[:old_terms])
+        rows[old_dest] = self._rows
+        freqs[old_dest] = self._freqs
+
+        # New postings follow the existing ones of the same term
+        if len(new_terms):
+            new_starts = np.zeros(len(new_terms), dtype=np.int64)
+            np.cumsum(new_lengths[:-1], out=new_starts[1:])
+            new_dest = np.arange(new_lengths.sum()) + np.repeat(
+                offsets[new_terms] + old_counts[new_terms] - new_starts, new_lengths
+            )
+            rows[new_dest] = np.fromiter(
+                (r for term_rows, _ in new_postings.values() for r in term_rows),
+                dtype=np.int32, count=len(new_dest),
+            )
+            freqs[new_dest] = np.minimum(
+                np.fromiter(
+                    (f for _, term_freqs in new_postings.values() for f in term_freqs),
+                    dtype=np.int64, count=len(new_dest),
+                ),
+                _MAX_FREQ,
+            )
 
-        # Calculate document frequencies
-        self.doc_freqs = {}
-        for doc in self.documents:
-            unique_tokens = set(doc.tokens)
-            for token in unique_tokens:
-                self.doc_freqs[token] = self.doc_freqs.get(token, 0) + 1
-
-        # Calculate IDF for all terms
-        n_docs = len(self.documents)
-        self.idf = {}
-        for token, df in self.doc_freqs.items():
-            # IDF with smoothing
-            idf = np.log((n_docs - df + 0.5) / (df + 0.5) + 1)
-            self.idf[token] = max(idf, self.epsilon)
+        self._offsets = offsets
+        self._rows = rows
+        self._freqs = freqs
+        # One posting per (term, document), so df is the posting length
+        self.doc_freqs = counts.astype(np.int32)
+
+    def _posting(self, term_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Document rows and term frequencies of a term (views, no copy)."""
+        start, end = self._offsets[term_id], self._offsets[term_id + 1]
+        return self._rows[start:end], self._freqs[start:end]
+
+    def _finalize_index(self) -> None:
+        """Recompute corpus-level statistics after documents were ingested."""
+        n_docs = len(self.doc_ids)
+        self.avgdl = self._total_length / n_docs if n_docs else 0
+
+        # Length normalization depends only on index state, so compute it
+        # once here instead of per (document, query term) at search time
+        self._compute_length_norms()
+
+        # Calculate IDF for all terms (with smoothing)
+        df = self.doc_freqs.astype(np.float32)
+        idf = np.log((n_docs - df + np.float32(0.5)) / (df + np.float32(0.5)) + np.float32(1))
+        self.idf = np.ascontiguousarray(
+            np.maximum(idf, np.float32(self.epsilon)), dtype=np.float32
+        )
+        # Fold the constant (k1 + 1) into one weight per term, so scoring a
+        # posting is weight * tf / (tf + k1_len_norm[doc])
+        self._term_weights = self.idf * np.float32(self.k1 + 1)
 
         self.indexed = True
-        logger.info(
-            f"BM25 indexed {n_docs} documents, "
-            f"{len(self.doc_freqs)} unique terms, "
-            f"avgdl={self.avgdl:.1f}"
+        self._version += 1
+        self._term_scores = {}
+        self._rank_cached.cache_clear()
+
+    def _compute_length_norms(self) -> None:
+        """Precompute per-document length normalization factors."""
+        doc_lengths = np.asarray(self.doc_lengths, dtype=np.float32)
+        if self.avgdl > 0:
+            len_norm = 1 - self.b + self.b * (doc_lengths / self.avgdl)
+        else:
+            len_norm = np.ones(len(doc_lengths), dtype=np.float32)
+        self.len_norm = np.ascontiguousarray(len_norm, dtype=np.float32)
+        self.k1_len_norm = np.ascontiguousarray(
+            self.k1 * self.len_norm, dtype=np.float32
         )
 
     def add_documents(
@@ -192,50 +420,120 @@ class BM25Search:
         if not query_tokens:
             return []
 
-        scores = []
-        for i, doc in enumerate(self.documents):
-            score = self._score_document(doc, query_tokens, i)
-            scores.append((doc.id, doc.candidate_id, score))
-
-        # Sort by score descending
-        scores.sort(key=lambda x: x[2], reverse=True)
-
-        return scores[:top_k]
-
-    def _score_document(
-        self,
-        doc: BM25Document,
-        query_tokens: List[str],
-        doc_idx: int,
-    ) -> float:
-        """Calculate BM25 score for a document against query tokens."""
-        score = 0.0
-        doc_len = self.doc_lengths[doc_idx]
-
-        # Count term frequencies in document
-        tf = {}
-        for token in doc.tokens:
-            tf[token] = tf.get(token, 0) + 1
-
-        for token in query_tokens:
-            if token not in self.idf:
-                continue
-
-            # Term frequency in this document
-            freq = tf.get(token, 0)
-            if freq == 0:
-                continue
+        # Scores are a sum over query terms, so term order does not matter.
+        # Unknown terms contribute nothing and short-circuit here.
+        term_ids = self._term_ids(query_tokens)
+        if not term_ids:
+            return []
+        key = (tuple(sorted(term_ids)),)
+        return list(self._rank_cached(self._version, key, top_k))
 
-            # BM25 score formula
-            idf = self.idf[token]
-            numerator = freq * (self.k1 + 1)
-            denominator = freq + self.k1 * (
-                1 - self.b + self.b * (doc_len / self.avgdl)
+    def batch_score(self, queries: List[List[int]]) -> np.ndarray:
+        """
+        Score several queries against every document at once.
+        
+        Each unique term is scored once per batch by walking its posting
+        list, and the result is added to every query containing it. Query
+        variations from expansion share most of their terms, so this does
+        far less work than scoring them one by one.
+        
+        Args:
+            queries: Queries as lists of term ids (see _term_ids)
+            
+        Returns:
+            Array of shape (len(queries), n_documents) with BM25 scores
+        """
+        scores = np.zeros((len(queries), len(self.doc_ids)), dtype=np.float32)
+
+        # How often each query contains each term (repeated terms count
+        # repeatedly, as in the per-document formula)
+        term_queries: Dict[int, Counter] = {}
+        for q, term_ids in enumerate(queries):
+            for term_id in term_ids:
+                term_queries.setdefault(term_id, Counter())[q] += 1
+
+        for term_id, query_counts in term_queries.items():
+            rows = self._posting(term_id)[0]
+            term_scores = self._get_term_scores(term_id)
+            # One (queries x postings) update instead of one per query
+            query_rows = np.fromiter(query_counts.keys(), dtype=np.intp)
+            counts = np.fromiter(query_counts.values(), dtype=np.float32)
+            scores[np.ix_(query_rows, rows)] += counts[:, None] * term_scores
+
+        return scores
+
+    def _score_query(self, term_ids: List[int]) -> np.ndarray:
+        """
+        Score one query against every document.
+        
+        Repeated query terms are counted once up front, so each unique term
+        walks its posting list once. With numba the postings are scored and
+        accumulated in one compiled loop without temporaries; otherwise the
+        cached contributions are added straight into the score vector (rows
+        are unique within a posting list, so a fancy-indexed add is safe).
+        
+        Args:
+            term_ids: Query as a list of term ids (see _term_ids)
+            
+        Returns:
+            Array of shape (n_documents,), equal to batch_score([term_ids])[0]
+        """
+        scores = np.zeros(len(self.doc_ids), dtype=np.float32)
+        term_counts = Counter(term_ids)
+        if USE_NUMBA:
+            _score_postings(
+                self._offsets, self._rows, self._freqs,
+                self._term_weights, self.k1_len_norm,
+                np.fromiter(term_counts.keys(), dtype=np.int64, count=len(term_counts)),
+                np.fromiter(term_counts.values(), dtype=np.float32, count=len(term_counts)),
+                scores,
             )
+            return scores
 
-            score += idf * (numerator / denominator)
+        for term_id, count in term_counts.items():
+            term_scores = self._get_term_scores(term_id)
+            if count > 1:
+                term_scores = np.float32(count) * term_scores
+            scores[self._posting(term_id)[0]] += term_scores
+        return scores
 
-        return score
+    def _get_term_scores(self, term_id: int) -> np.ndarray:
+        """
+        BM25 contribution of a term to each document in its posting list.
+        
+        The saturation formula depends only on index statistics, so it is
+        evaluated once per term and index version; queries then only
+        gather and add the stored scores.
+        """
+        term_scores = self._term_scores.get(term_id)
+        if term_scores is None:
+            rows, freqs = self._posting(term_id)
+            term_scores = (
+                self._term_weights[term_id] * freqs
+                / (freqs + self.k1_len_norm[rows])
+            ).astype(np.float32, copy=False)
+            self._term_scores[term_id] = term_scores
+        return term_scores
+
+    def _rank(
+        self,
+        scores: np.ndarray,
+        top_k: int,
+    ) -> List[Tuple[str, str, float]]:
+        """Turn a score vector into sorted (doc_id, candidate_id, score) tuples."""
+        # Partial selection is O(N); only the top_k survivors get sorted
+        if top_k <= 0:
+            return []
+        if top_k < len(scores):
+            order = np.argpartition(-scores, top_k - 1)[:top_k]
+            order = order[np.argsort(-scores[order], kind="stable")]
+        else:
+            order = np.argsort(-scores, kind="stable")
+        return list(zip(
+            self.doc_ids[order].tolist(),
+            self.candidate_ids[order].tolist(),
+            scores[order].tolist(),
+        ))
 
     def search_with_expansion(
         self,
@@ -254,73 +552,330 @@ class BM25Search:
         Returns:
             Combined results sorted by best score
         """
-        combined_scores: Dict[str, Tuple[str, float]] = {}
-
-        for query in queries:
-            results = self.search(query, top_k=top_k * 2)
+        if not self.indexed:
+            logger.warning("BM25 index not built. Call index_documents first.")
+            return []
 
-            for doc_id, cand_id, score in results:
-                if doc_id not in combined_scores:
-                    combined_scores[doc_id] = (cand_id, score)
-                else:
-                    # Keep max score
-                    if score > combined_scores[doc_id][1]:
-                        combined_scores[doc_id] = (cand_id, score)
+        # Max over variations does not depend on their order either
+        key = tuple(sorted({
+            tuple(sorted(term_ids))
+            for term_ids in (self._term_ids(self._tokenize(q)) for q in queries)
+            if term_ids
+        }))
+        if not key:
+            return []
 
-        # Convert to list and sort
-        results = [
-            (doc_id, cand_id, score)
-            for doc_id, (cand_id, score) in combined_scores.items()
-        ]
-        results.sort(key=lambda x: x[2], reverse=True)
+        return list(self._rank_cached(self._version, key, top_k))
 
-        return results[:top_k]
+    def _rank_queries(
+        self,
+        version: int,
+        queries: Tuple[Tuple[int, ...], ...],
+        top_k: int,
+    ) -> Tuple[Tuple[str, str, float], ...]:
+        """Rank documents by the best score over term id queries (cached)."""
+        if len(queries) == 1:
+            return tuple(self._rank(self._score_query(list(queries[0])), top_k))
+
+        scores = self.batch_score([list(tokens) for tokens in queries])
+        # Max over variations is one reduction over the (Q, N) score matrix
+        return tuple(self._rank(scores.max(axis=0), top_k))
+
+    def get_document_index(self, doc_id: str) -> Optional[int]:
+        """Get the row index of a document in the index by its ID."""
+        return self._id_index.get(doc_id)
 
     def get_document_by_id(self, doc_id: str) -> Optional[BM25Document]:
-        """Get a document by its ID."""
-        for doc in self.documents:
-            if doc.id == doc_id:
-                return doc
-        return None
+        """
+        Get a document by its ID.
+        
+        Returns None for unknown IDs, when the index was built with
+        store_content=False, or for documents loaded from a snapshot.
+        """
+        idx = self._id_index.get(doc_id)
+        if idx is None or self.content_store is None or doc_id not in self.content_store:
+            return None
+        content, metadata = self.content_store[doc_id]
+        return BM25Document(
+            id=doc_id,
+            candidate_id=self.candidate_ids[idx],
+            content=content,
+            metadata=metadata,
+        )
 
     def get_term_stats(self, term: str) -> Dict[str, Any]:
         """Get statistics for a term in the index."""
         term = term.lower()
+        term_id = self.vocab.get(term)
         return {
             "term": term,
-            "document_frequency": self.doc_freqs.get(term, 0),
-            "idf": self.idf.get(term, 0),
-            "total_documents": len(self.documents),
+            "document_frequency": int(self.doc_freqs[term_id]) if term_id is not None else 0,
+            "idf": float(self.idf[term_id]) if term_id is not None else 0,
+            "total_documents": len(self.doc_ids),
         }
 
-    def load_from_database(self, session: Session) -> int:
+    def save(self, path: str) -> None:
+        """
+        Write the index to an .npz snapshot.
+        
+        Only raw statistics are stored (ids, terms, document lengths and
+        the CSR postings); IDF and length norms are recomputed on load.
+        The file is written next to `path` and renamed into place, so
+        readers never see a partial snapshot.
+        
+        Args:
+            path: Snapshot file path
+        """
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                doc_ids=_pack_strings(self.doc_ids.tolist()),
+                candidate_ids=_pack_strings(self.candidate_ids.tolist()),
+                # vocab ids are assigned in insertion order
+                terms=_pack_strings(list(self.vocab)),
+                doc_lengths=np.asarray(self.doc_lengths, dtype=np.int32),
+                offsets=self._offsets,
+                rows=self._rows,
+                freqs=self._freqs,
+            )
+        os.replace(tmp_path, path)
+
+        logger.info(f"BM25 index saved to {path} ({len(self.doc_ids)} documents)")
+
+    def load(self, path: str) -> bool:
+        """
+        Replace the index with a snapshot written by save().
+        
+        The posting arrays are memory-mapped from the snapshot rather than
+        copied, so workers loading the same file share its pages through
+        the OS page cache and only the postings a query touches are read
+        from disk. Document content is not part of the snapshot, so with
+        store_content=True get_document_by_id returns None for loaded
+        documents until they are re-added.
+        
+        Args:
+            path: Snapshot file path
+            
+        Returns:
+            False if no snapshot exists at path
+        """
+        if not os.path.exists(path):
+            return False
+
+        data = _map_npz(path)
+        doc_ids = _unpack_strings(data["doc_ids"])
+        candidate_ids = _unpack_strings(data["candidate_ids"])
+        terms = _unpack_strings(data["terms"])
+        doc_lengths = data["doc_lengths"]
+        offsets = data["offsets"]
+        rows = data["rows"]
+        freqs = data["freqs"]
+
+        self._reset()
+        self.doc_ids = np.array(doc_ids, dtype=object)
+        self.candidate_ids = np.array(candidate_ids, dtype=object)
+        self._id_index = {doc_id: i for i, doc_id in enumerate(doc_ids)}
+        self.vocab = {term: i for i, term in enumerate(terms)}
+        self.doc_lengths = doc_lengths.tolist()
+        self._total_length = int(doc_lengths.sum(dtype=np.int64))
+        # One posting per (term, document), so df is the posting length
+        self.doc_freqs = np.diff(offsets).astype(np.int32)
+        self._offsets = offsets
+        self._rows = rows
+        self._freqs = freqs
+        self._finalize_index()
+
+        logger.info(
+            f"BM25 index loaded from {path}: {len(self.doc_ids)} documents, "
+            f"{len(self.doc_freqs)} unique terms"
+        )
+        return True
+
+    def load_from_database(
+        self,
+        session: Session,
+        batch_size: int = 1000,
+        workers: Optional[int] = None,
+    ) -> int:
         """
         Load all chunks from database and build BM25 index.
         
+        Chunks are streamed from the database in batches rather than
+        materialized all at once, and batches are tokenized in worker
+        processes while the next ones are being fetched.
+        
         Args:
             session: SQLAlchemy database session
+            batch_size: Number of chunks fetched and tokenized per batch
+            workers: Tokenizer processes (defaults to CPU count; 1 tokenizes
+                in-process)
             
         Returns:
             Number of documents indexed
         """
         from app.models.candidate import Chunk
-        
-        # Query all chunks with enriched content
-        chunks = session.query(Chunk).all()
-        
-        if not chunks:
+
+        # Only the columns needed for indexing, fetched with a server-side
+        # cursor where the driver supports it
+        rows = iter(session.query(
+            Chunk.id,
+            Chunk.candidate_id,
+            Chunk.enriched_content,
+            Chunk.content,
+        ).yield_per(batch_size))
+
+        def fetch_batches() -> Iterator[Tuple[List[str], List[str], List[str]]]:
+            while True:
+                batch = list(islice(rows, batch_size))
+                if not batch:
+                    return
+                ids = [row.id for row in batch]
+                candidate_ids = [row.candidate_id for row in batch]
+                contents = [row.enriched_content or row.content for row in batch]
+                if self.content_store is not None:
+                    for doc_id, content in zip(ids, contents):
+                        self.content_store[doc_id] = (content, {})
+                yield ids, candidate_ids, contents
+
+        self._reset()
+        workers = workers or os.cpu_count() or 1
+        if workers > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                self._ingest_batches(
+                    _tokenize_in_pool(executor, fetch_batches(), window=2 * workers)
+                )
+        else:
+            self._ingest_batches(
+                (ids, candidate_ids, _tokenize_batch(contents))
+                for ids, candidate_ids, contents in fetch_batches()
+            )
+
+        n_docs = len(self.doc_ids)
+        if not n_docs:
             logger.info("No chunks found in database for BM25 indexing")
+            self.indexed = False
             return 0
+
+        self._finalize_index()
+        logger.info(
+            f"BM25 index loaded with {n_docs} chunks from database, "
+            f"{len(self.doc_freqs)} unique terms"
+        )
+        return n_docs
+
+
+def _pack_strings(items: List[str]) -> np.ndarray:
+    """Encode strings as one newline-separated UTF-8 byte array."""
+    return np.frombuffer("\n".join(items).encode("utf-8"), dtype=np.uint8)
+
+
+def _unpack_strings(packed: np.ndarray) -> List[str]:
+    """Inverse of _pack_strings (ids and tokens never contain newlines)."""
+    text = packed.tobytes().decode("utf-8")
+    return text.split("\n") if text else []
+
+
+if njit is not None:
+    @njit(cache=True, nogil=True)
+    def _score_postings(offsets, rows, freqs, term_weights, k1_len_norm,
+                        term_ids, counts, scores):
+        """
+        Add the BM25 scores of query terms into scores (numba kernel).
         
-        documents = [
-            BM25Document(
-                id=chunk.id,
-                candidate_id=chunk.candidate_id,
-                content=chunk.enriched_content or chunk.content,
-            )
-            for chunk in chunks
-        ]
-        
-        self.index_documents(documents)
-        logger.info(f"BM25 index loaded with {len(documents)} chunks from database")
-        return len(documents)
+        Same float32 operations in the same order as _get_term_scores and
+        the NumPy path of _score_query, so results are bit-identical. Runs
+        serially: terms share document rows, so parallel terms would race
+        on scores.
+        """
+        for i in range(len(term_ids)):
+            term_id = term_ids[i]
+            weight = term_weights[term_id]
+            count = counts[i]
+            for j in range(offsets[term_id], offsets[term_id + 1]):
+                freq = np.float32(freqs[j])
+                row = rows[j]
+                score = weight * freq / (freq + k1_len_norm[row])
+                scores[row] += score if count == 1 else count * score
+
+
+def _map_npz(path: str) -> Dict[str, np.ndarray]:
+    """
+    Read the arrays of an uncompressed .npz as read-only memory maps.
+    
+    np.load ignores mmap_mode for .npz archives. np.savez stores members
+    uncompressed, so each array's data sits contiguously in the file and
+    can be viewed in place. Compressed or object members fall back to a
+    regular read.
+    """
+    arrays: Dict[str, np.ndarray] = {}
+    with open(path, "rb") as f, zipfile.ZipFile(f) as archive:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        for info in archive.infolist():
+            name = info.filename[:-4] if info.filename.endswith(".npy") else info.filename
+            if info.compress_type != zipfile.ZIP_STORED:
+                with archive.open(info) as member:
+                    arrays[name] = np.lib.format.read_array(member, allow_pickle=False)
+                continue
+
+            # Member data follows the local file header and its variable
+            # length name and extra fields
+            f.seek(info.header_offset + 26)
+            name_len, extra_len = struct.unpack("<HH", f.read(4))
+            f.seek(info.header_offset + 30 + name_len + extra_len)
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+
+            if dtype.hasobject:
+                raise ValueError(f"Object array {name!r} in BM25 snapshot {path}")
+            count = int(np.prod(shape, dtype=np.int64))
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=f.tell())
+            arrays[name] = array.reshape(shape, order="F" if fortran_order else "C")
+    return arrays
+
+
+def _tokenize_batch(contents: List[str]) -> List[Tuple[List[str], List[int]]]:
+    """
+    Tokenize a batch of contents, grouping identical contents.
+    
+    Boilerplate chunks repeated across many CVs (section headers, template
+    sentences) are tokenized once. Module-level so worker processes can
+    run it.
+    
+    Returns:
+        List of (tokens, indices into contents) pairs
+    """
+    by_content: Dict[str, List[int]] = {}
+    for i, content in enumerate(contents):
+        by_content.setdefault(content, []).append(i)
+    return [
+        (_TOKEN_RE.findall(content.lower()), indices)
+        for content, indices in by_content.items()
+    ]
+
+
+def _tokenize_in_pool(
+    executor: ProcessPoolExecutor,
+    batches: Iterator[Tuple[List[str], List[str], List[str]]],
+    window: int,
+) -> Iterator[_TokenizedBatch]:
+    """
+    Tokenize batches in worker processes, yielding results in order.
+    
+    At most `window` batches are in flight, so memory stays bounded no
+    matter how many rows the source produces.
+    """
+    pending: Deque[Tuple[List[str], List[str], Future]] = deque()
+    for ids, candidate_ids, contents in batches:
+        pending.append((ids, candidate_ids, executor.submit(_tokenize_batch, contents)))
+        if len(pending) >= window:
+            ids, candidate_ids, future = pending.popleft()
+            yield ids, candidate_ids, future.result()
+    while pending:
+        ids, candidate_ids, future = pending.popleft()
+        yield ids, candidate_ids, future.result()
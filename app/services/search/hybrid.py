@@ -9,18 +9,25 @@ It orchestrates:
 4. RRF fusion
 """
 
+import asyncio
+import fcntl
+import hashlib
 import logging
+import threading
+import os
 import time
-from typing import List, Optional, Dict, Any
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Tuple
 from dataclasses import dataclass, field
 
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
-from app.services.search.bm25 import BM25Search
+from app.services.search.bm25 import BM25Search, BM25Document
 from app.services.search.vector import VectorSearch, VectorSearchResult
 from app.services.search.query_expansion import QueryExpander, get_query_expander
-from app.services.search.rrf import RRFMerger, RRFResult, get_rrf_merger
+from app.services.search.rrf import RRFMerger, RRFResult, RRFResultBatch, get_rrf_merger
 from app.schemas.search import SearchRequest, SearchResponse, SearchResult, ChunkMatch, SearchType
 from app.config import get_settings
 from app.services.utils.cache import get_cache
@@ -75,7 +82,13 @@ class HybridSearchEngine:
         All dependencies can be injected for testing.
         """
         self.config = config or HybridSearchConfig()
-        self.bm25 = bm25_search or BM25Search()
+        # Results are rebuilt from chunk rows, so the BM25 index does not
+        # need its own copy of the chunk text
+        self.bm25 = bm25_search or BM25Search(store_content=False)
+        # Modification time of the BM25 snapshot this index last synced with
+        self._bm25_snapshot_mtime: Optional[int] = None
+        # Serializes snapshot reloads between concurrent searches
+        self._bm25_reload_lock = threading.Lock()
         self.vector = vector_search or VectorSearch()
         self.expander = query_expander or get_query_expander()
         self.rrf = rrf_merger or get_rrf_merger(self.config.rrf_k)
@@ -98,18 +111,23 @@ class HybridSearchEngine:
         start_time = time.time()
 
         # Step 0: Check Cache
+        # Hash the canonical JSON form once so the cache gets a short,
+        # stable string key instead of re-serializing the request dict
         cache = get_cache()
-        cache_key = request.model_dump()
-        cached_results = await cache.get("search", cache_key)
+        cache_key = hashlib.blake2b(
+            request.model_dump_json().encode(), digest_size=16
+        ).hexdigest()
+        cached = await cache.get("search", cache_key)
         
-        if cached_results:
+        if cached:
             logger.info(f"Returning cached search results for query: {request.query}")
+            cached_results = cached["results"]
             return SearchResponse(
                 results=[SearchResult(**r) for r in cached_results],
                 total_results=len(cached_results),
                 search_time_ms=(time.time() - start_time) * 1000,
                 query=request.query,
-                expanded_queries=[], # Cached results don't store expanded queries directly
+                expanded_queries=cached["expanded_queries"],
                 search_type=request.search_type,
             )
 
@@ -119,7 +137,7 @@ class HybridSearchEngine:
         # Expand Semantic Query (for filtering/vector)
         expanded_semantic_queries = [request.query]
         if request.expand_query:
-             expanded_semantic_queries = self.expander.expand_query(
+             expanded_semantic_queries = await self.expander.aexpand_query(
                 request.query,
                 max_expansions=self.config.max_query_expansions,
             )
@@ -170,7 +188,10 @@ class HybridSearchEngine:
         await cache.set(
             "search", 
             cache_key, 
-            [r.model_dump() for r in filtered_results[:request.top_k]], # Cache only the top_k results
+            {
+                "results": [r.model_dump() for r in filtered_results[:request.top_k]], # Cache only the top_k results
+                "expanded_queries": expanded_semantic_queries,
+            },
             expire_seconds=300 # 5 minutes cache
         )
 
@@ -195,14 +216,18 @@ class HybridSearchEngine:
         """Execute hybrid BM25 + Vector search with RRF."""
         filters = filters or {}
         
-        # Get BM25 results (BM25 doesn't support pre-filtering, will filter post-merge)
-        bm25_results = self.bm25.search_with_expansion(
-            bm25_queries, top_k=self.config.bm25_fetch_k
-        )
-
-        # Get vector results WITH PRE-FILTERING
-        vector_raw_results = await self.vector.search_with_expanded_queries(
-            vector_queries, session, top_k=self.config.vector_fetch_k, filters=filters
+        # BM25 (CPU-bound, no pre-filtering - filtered post-merge) runs in a
+        # worker thread while the vector search (DB-bound, WITH PRE-FILTERING)
+        # awaits the database, so latency is max(bm25, vector), not the sum
+        bm25_results, vector_raw_results = await asyncio.gather(
+            asyncio.to_thread(
+                self._search_bm25,
+                bm25_queries,
+                self.config.bm25_fetch_k,
+            ),
+            self.vector.search_with_expanded_queries(
+                vector_queries, session, top_k=self.config.vector_fetch_k, filters=filters
+            ),
         )
 
         # Convert vector results to tuple format
@@ -228,7 +253,7 @@ class HybridSearchEngine:
     ) -> List[SearchResult]:
         """Execute BM25-only search."""
         # Note: BM25 index doesn't support pre-filtering, filters applied post-search
-        bm25_results = self.bm25.search_with_expansion(queries, top_k=top_k)
+        bm25_results = self._search_bm25(queries, top_k)
 
         # Build results with only keyword ranking
         results = []
@@ -285,7 +310,7 @@ class HybridSearchEngine:
 
     async def _build_search_results(
         self,
-        rrf_results: List[RRFResult],
+        rrf_results: RRFResultBatch,
         vector_raw: List[VectorSearchResult],
         session: AsyncSession,
     ) -> List[SearchResult]:
@@ -294,11 +319,19 @@ class HybridSearchEngine:
         # Create lookup for vector results
         vector_lookup = {vr.chunk_id: vr for vr in vector_raw}
 
+        # First non-empty full_name and top_skills seen per candidate
+        cand_info: Dict[str, Tuple[str, List[str]]] = {}
+        for vr in vector_raw:
+            full_name, top_skills = cand_info.get(vr.candidate_id, ("Unknown", []))
+            if full_name == "Unknown" and vr.full_name:
+                full_name = vr.full_name
+            if not top_skills and vr.top_skills:
+                top_skills = vr.top_skills
+            cand_info[vr.candidate_id] = (full_name, top_skills)
+
         # Group results by candidate
-        by_candidate: Dict[str, List[RRFResult]] = {}
+        by_candidate: Dict[str, List[RRFResult]] = defaultdict(list)
         for rrf in rrf_results:
-            if rrf.candidate_id not in by_candidate:
-                by_candidate[rrf.candidate_id] = []
             by_candidate[rrf.candidate_id].append(rrf)
 
         # Build results for each candidate
@@ -335,20 +368,10 @@ class HybridSearchEngine:
                     )
                 )
 
-            # Find full_name and top_skills from vector results if available
-            candidate_full_name = "Unknown"
-            candidate_top_skills = []
-            
-            for rrf in chunks:
-                vr = vector_lookup.get(rrf.doc_id)
-                if vr:
-                    if vr.full_name and candidate_full_name == "Unknown":
-                        candidate_full_name = vr.full_name
-                    if vr.top_skills and not candidate_top_skills:
-                        candidate_top_skills = vr.top_skills
-                
-                if candidate_full_name != "Unknown" and candidate_top_skills:
-                    break
+            # full_name and top_skills from vector results if available
+            candidate_full_name, candidate_top_skills = cand_info.get(
+                cand_id, ("Unknown", [])
+            )
 
             results.append(
                 SearchResult(
@@ -405,17 +428,71 @@ class HybridSearchEngine:
         self.bm25.add_documents(doc_ids, candidate_ids, contents)
         logger.info(f"Updated BM25 index with {len(doc_ids)} documents")
 
+    def _search_bm25(self, queries: List[str], top_k: int) -> List[Tuple[str, str, float]]:
+        """BM25 search over the latest snapshot written by any process."""
+        self._sync_bm25_snapshot()
+        return self.bm25.search_with_expansion(queries, top_k)
+
+    def _sync_bm25_snapshot(self) -> None:
+        """
+        Reload the BM25 index if another process rewrote the snapshot.
+        
+        Workers append new CVs to the shared snapshot; one stat() per
+        search notices their writes so the API serves them without a
+        restart.
+        """
+        path = settings.bm25_index_path
+        if not path or self._bm25_snapshot_mtime is None:
+            return
+        try:
+            if os.stat(path).st_mtime_ns == self._bm25_snapshot_mtime:
+                return
+        except FileNotFoundError:
+            return
+
+        with self._bm25_reload_lock, _snapshot_lock(path):
+            mtime = os.stat(path).st_mtime_ns
+            if mtime != self._bm25_snapshot_mtime:
+                self.bm25.load(path)
+                self._bm25_snapshot_mtime = mtime
+                logger.info("BM25 index reloaded from updated snapshot")
+
     def refresh_bm25_index_sync(self, session) -> int:
         """
         Refresh BM25 index from database (synchronous version for startup).
         
+        When a snapshot exists and holds exactly the chunk ids in the
+        database (compared by fingerprint) it is loaded directly;
+        otherwise the index is rebuilt from the database and the snapshot
+        rewritten.
+        
         Args:
             session: SQLAlchemy session (sync)
             
         Returns:
             Number of documents indexed
         """
-        return self.bm25.load_from_database(session)
+        path = settings.bm25_index_path
+        if not path:
+            return self.bm25.load_from_database(session)
+
+        from app.models.candidate import Chunk
+
+        chunk_ids = [row.id for row in session.query(Chunk.id).yield_per(10000)]
+        n_chunks = len(chunk_ids)
+
+        with _snapshot_lock(path):
+            if self.bm25.load(path) and (
+                _ids_fingerprint(self.bm25.doc_ids) == _ids_fingerprint(chunk_ids)
+            ):
+                self._bm25_snapshot_mtime = os.stat(path).st_mtime_ns
+                return n_chunks
+
+            logger.info(f"BM25 snapshot missing or stale, rebuilding from {n_chunks} chunks")
+            num_indexed = self.bm25.load_from_database(session)
+            self.bm25.save(path)
+            self._bm25_snapshot_mtime = os.stat(path).st_mtime_ns
+            return num_indexed
 
     def add_candidate_chunks(
         self,
@@ -426,40 +503,71 @@ class HybridSearchEngine:
         """
         Add chunks for a new candidate to BM25 index incrementally.
         
-        Note: BM25 requires re-indexing for proper IDF calculation,
-        so this adds to existing documents and re-indexes all.
+        Only the new chunks are tokenized; IDF and length normalization
+        are refreshed from the updated corpus statistics.
         
         Args:
             chunk_ids: List of chunk IDs
             candidate_id: The candidate ID these chunks belong to
             contents: List of enriched content for each chunk
         """
-        from app.services.search.bm25 import BM25Document
-        
-        # Get existing documents
-        current_docs = list(self.bm25.documents)
-        
-        # Add new documents
-        for chunk_id, content in zip(chunk_ids, contents):
-            current_docs.append(BM25Document(
+        new_docs = [
+            BM25Document(
                 id=chunk_id,
                 candidate_id=candidate_id,
                 content=content,
-            ))
-        
-        # Re-index all documents
-        self.bm25.index_documents(current_docs)
+            )
+            for chunk_id, content in zip(chunk_ids, contents)
+        ]
+
+        path = settings.bm25_index_path
+        if not path:
+            self.bm25.add_documents_incremental(new_docs)
+        else:
+            # Other processes append to the same snapshot; pick up their
+            # documents before adding ours, then write it back
+            with _snapshot_lock(path):
+                if os.path.exists(path) and os.stat(path).st_mtime_ns != self._bm25_snapshot_mtime:
+                    self.bm25.load(path)
+                self.bm25.add_documents_incremental(new_docs)
+                self.bm25.save(path)
+                self._bm25_snapshot_mtime = os.stat(path).st_mtime_ns
+
         logger.info(f"Added {len(chunk_ids)} chunks for candidate {candidate_id} to BM25 index")
 
 
+def _ids_fingerprint(ids) -> str:
+    """Order-independent digest of a set of chunk ids."""
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk_id in sorted(str(i) for i in ids):
+        digest.update(chunk_id.encode())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@contextmanager
+def _snapshot_lock(path: str):
+    """Hold an exclusive cross-process lock on the BM25 snapshot."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(f"{path}.lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 # Singleton instance
 _engine: Optional[HybridSearchEngine] = None
+_engine_lock = threading.Lock()
 
 
 def get_search_engine() -> HybridSearchEngine:
-    """Get or create the hybrid search engine singleton."""
+    """Get or create the hybrid search engine singleton (thread-safe)."""
     global _engine
     if _engine is None:
-        _engine = HybridSearchEngine()
+        with _engine_lock:
+            if _engine is None:
+                _engine = HybridSearchEngine()
     return _engine
 
@@ -12,17 +12,24 @@ This improves recall by matching candidates who may use different
 terminology for similar roles/skills.
 """
 
+import asyncio
 import json
 import logging
-from typing import List, Optional
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
 
 from app.config import get_settings
+from app.services.utils.cache import get_cache
 
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
-# Prompt for query expansion
+# System prompt for query expansion (the query goes in the user message)
 EXPANSION_PROMPT = """You are a recruitment search expert. Your task is to expand a search query into related terms, synonyms, and translations that would match relevant candidates.
 
 RULES:
@@ -30,19 +37,122 @@ RULES:
 2. Include both English and Vietnamese variations if applicable
 3. Include common synonyms and related job titles/skills
 4. Keep variations relevant and not too broad
-5. Return as a JSON array of strings
+5. Return a JSON object of the form {"expansions": [...]}
 
 EXAMPLES:
 Query: "AI Engineer"
-Output: ["Machine Learning Engineer", "NLP Scientist", "Deep Learning Engineer", "Kỹ sư trí tuệ nhân tạo", "Data Scientist AI"]
+Output: {"expansions": ["Machine Learning Engineer", "NLP Scientist", "Deep Learning Engineer", "Kỹ sư trí tuệ nhân tạo", "Data Scientist AI"]}
 
 Query: "Python developer"
-Output: ["Python programmer", "Backend Python developer", "Lập trình viên Python", "Python software engineer"]
+Output: {"expansions": ["Python programmer", "Backend Python developer", "Lập trình viên Python", "Python software engineer"]}
 
 Query: "Project management"
-Output: ["Project manager", "PM", "Quản lý dự án", "Program manager", "Scrum master"]
-
-Now expand the following query:"""
+Output: {"expansions": ["Project manager", "PM", "Quản lý dự án", "Program manager", "Scrum master"]}
+
+Expand the query given in the user message."""
+
+
+# Fallback expansions for common job titles
+_TITLE_MAPPINGS = {
+    "developer": ["engineer", "programmer", "lập trình viên"],
+    "engineer": ["developer", "specialist", "kỹ sư"],
+    "manager": ["lead", "director", "quản lý"],
+    "senior": ["sr.", "experienced"],
+    "junior": ["jr.", "entry-level", "fresher"],
+}
+
+# Fallback Vietnamese translation patterns
+_VN_MAPPINGS = {
+    "software": "phần mềm",
+    "developer": "lập trình viên",
+    "engineer": "kỹ sư",
+    "manager": "quản lý",
+    "data": "dữ liệu",
+    "web": "web",
+    "mobile": "di động",
+}
+
+_TITLE_RE = re.compile("|".join(map(re.escape, _TITLE_MAPPINGS)))
+_VN_RE = re.compile("|".join(map(re.escape, _VN_MAPPINGS)))
+
+# Common skill groupings
+_SKILL_GROUPS = {
+    "python": ["python3", "django", "flask", "fastapi"],
+    "javascript": ["js", "node.js", "react", "vue", "angular"],
+    "java": ["spring", "spring boot", "hibernate"],
+    "sql": ["mysql", "postgresql", "oracle", "sql server"],
+    "aws": ["amazon web services", "ec2", "s3", "lambda"],
+    "docker": ["container", "kubernetes", "k8s"],
+    "machine learning": ["ml", "deep learning", "ai", "học máy"],
+}
+
+
+def _build_skill_expansions() -> Dict[str, Tuple[str, ...]]:
+    """Map every skill in a group (key or member) to its related skills."""
+    expansions: Dict[str, Tuple[str, ...]] = {}
+    for key, related in _SKILL_GROUPS.items():
+        for skill in (key, *related):
+            # The first group containing a skill wins
+            expansions.setdefault(skill, tuple(s for s in related if s != skill))
+    return expansions
+
+
+_SKILL_EXPANSIONS = _build_skill_expansions()
+
+_TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+# Quoted strings in unparseable LLM output; bounded so a stray quote cannot
+# make a match span the whole response
+_JSON_STR_RE = re.compile(r'"([^"]{1,200})"')
+
+
+def _repair_json(content: str) -> str:
+    """
+    Best-effort repair of almost-JSON LLM output.
+    
+    Strips markdown fences and leading prose, turns single-quoted strings
+    into double-quoted ones, drops trailing commas and closes brackets left
+    open by a truncated response. Runs in a single pass over the text.
+    """
+    if content.startswith("```"):
+        content = content.strip("`")
+        if content.startswith("json"):
+            content = content[4:]
+
+    starts = [i for i in (content.find("{"), content.find("[")) if i >= 0]
+    if not starts:
+        return content
+    content = content[min(starts):]
+
+    out: List[str] = []
+    stack: List[str] = []
+    quote: Optional[str] = None
+    escaped = False
+    for ch in content:
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = None
+                ch = '"'
+            elif ch == '"':
+                # Double quote inside a single-quoted string
+                ch = '\\"'
+        elif ch in "\"'":
+            quote = ch
+            ch = '"'
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]" and stack:
+            stack.pop()
+        out.append(ch)
+
+    if quote:
+        out.append('"')
+    repaired = "".join(out) + "".join(reversed(stack))
+    return _TRAILING_COMMA_RE.sub(r"\1", repaired)
 
 
 class QueryExpander:
@@ -53,16 +163,36 @@ class QueryExpander:
     Falls back to simple variations if LLM is unavailable.
     """
 
-    def __init__(self, api_key: Optional[str] = None):
+    # LLM expansions are cached for a day, exactly and by query similarity
+    CACHE_PREFIX = "qexp"
+    CACHE_TTL_SECONDS = 86400
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: int = 8,
+        semantic_threshold: float = 0.92,
+        embedding_service=None,
+    ):
         """
         Initialize query expander.
         
         Args:
             api_key: OpenAI API key (defaults to settings)
+            max_concurrency: Maximum concurrent async LLM calls
+            semantic_threshold: Minimum cosine similarity for reusing the
+                expansion of a previously seen query
+            embedding_service: Embedding service for the semantic cache
+                (defaults to singleton)
         """
         self._client = None
+        self._aclient = None
         self._api_key = api_key or settings.openai_api_key
         self._initialized = False
+        # Bounds in-flight async LLM calls to stay under rate limits
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._semantic_threshold = semantic_threshold
+        self._embedding_service = embedding_service
 
     def _lazy_init(self):
         """Lazy initialization of OpenAI client."""
@@ -77,8 +207,9 @@ class QueryExpander:
             return
 
         try:
-            from openai import OpenAI
+            from openai import AsyncOpenAI, OpenAI
             self._client = OpenAI(api_key=self._api_key)
+            self._aclient = AsyncOpenAI(api_key=self._api_key)
             self._initialized = True
         except ImportError:
             logger.warning("OpenAI not installed. Using fallback expansion.")
@@ -97,108 +228,267 @@ class QueryExpander:
         """
         self._lazy_init()
 
-        # Always include original query
-        result = [query]
-
         if self._client:
             try:
-                expansions = self._expand_with_llm(query)
-                result.extend(expansions[:max_expansions])
+                expansions = self._expand_with_llm(query)[:max_expansions]
             except Exception as e:
                 logger.warning(f"LLM expansion failed: {e}")
-                result.extend(self._fallback_expansion(query))
+                expansions = self._fallback_expansion(query)
         else:
-            result.extend(self._fallback_expansion(query))
+            expansions = self._fallback_expansion(query)
 
-        # Remove duplicates while preserving order
-        seen = set()
-        unique = []
-        for q in result:
-            q_lower = q.lower().strip()
-            if q_lower not in seen:
-                seen.add(q_lower)
-                unique.append(q.strip())
+        return self._combine(query, expansions, max_expansions)
+
+    async def aexpand_query(self, query: str, max_expansions: int = 5) -> List[str]:
+        """
+        Async version of expand_query.
+        
+        Uses the async OpenAI client, or runs the sync client in a worker
+        thread when no async client is available, so the event loop is not
+        blocked while waiting for the LLM.
+        
+        Args:
+            query: Original search query
+            max_expansions: Maximum number of expansions
+            
+        Returns:
+            List of query variations (including original)
+        """
+        return await self._aexpand(query, max_expansions)
+
+    async def _aexpand(
+        self,
+        query: str,
+        max_expansions: int,
+        check_exact: bool = True,
+        pending: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        """
+        Expand one query, optionally skipping the exact cache lookup.
+        
+        See _aexpand_cached for `pending`.
+        """
+        self._lazy_init()
 
-        return unique[:max_expansions + 1]
+        if self._aclient or self._client:
+            try:
+                expansions = await self._aexpand_cached(query, check_exact, pending)
+                expansions = expansions[:max_expansions]
+            except Exception as e:
+                logger.warning(f"LLM expansion failed: {e}")
+                expansions = self._fallback_expansion(query)
+        else:
+            expansions = self._fallback_expansion(query)
 
-    def _expand_with_llm(self, query: str) -> List[str]:
-        """Expand query using LLM."""
-        prompt = f"{EXPANSION_PROMPT}\nQuery: \"{query}\""
+        return self._combine(query, expansions, max_expansions)
 
-        response = self._client.chat.completions.create(
+    async def _aexpand_cached(
+        self,
+        query: str,
+        check_exact: bool = True,
+        pending: Optional[Dict[str, List[str]]] = None,
+    ) -> List[str]:
+        """
+        Expand query with the LLM behind an exact and a semantic cache.
+        
+        Paraphrases such as "Python developer" / "python dev" reuse the
+        expansion of the earlier query instead of paying for another call.
+        When `pending` is given, a fresh expansion is collected there under
+        its cache key instead of being written, so a batch can store all of
+        them with one mset.
+        """
+        cache = get_cache()
+        key = query.lower().strip()
+
+        if check_exact:
+            cached = await cache.get(self.CACHE_PREFIX, key)
+            if cached is not None:
+                return cached
+
+        embedding = None
+        try:
+            embedding = await asyncio.to_thread(self._embed, key)
+            similar = await self._find_similar(embedding)
+            if similar is not None:
+                cached = await cache.get(self.CACHE_PREFIX, similar)
+                if cached is not None:
+                    logger.info(f"Semantic cache hit for '{query}' via '{similar}'")
+                    return cached
+        except Exception as e:
+            logger.warning(f"Semantic expansion cache lookup failed: {e}")
+
+        if self._aclient:
+            expansions = await self._aexpand_with_llm(query)
+        else:
+            # Only a sync client: keep the event loop free while it waits
+            expansions = await asyncio.to_thread(self._expand_with_llm, query)
+
+        if pending is not None:
+            pending[key] = expansions
+        else:
+            await cache.set(
+                self.CACHE_PREFIX, key, expansions,
+                expire_seconds=self.CACHE_TTL_SECONDS,
+            )
+        if embedding is not None:
+            await cache.add_embedding(
+                self.CACHE_PREFIX, key, embedding,
+                expire_seconds=self.CACHE_TTL_SECONDS,
+            )
+        return expansions
+
+    def _embed(self, text: str) -> np.ndarray:
+        """Embed a query for the semantic cache."""
+        if self._embedding_service is None:
+            from app.services.embedding.embedder import get_embedding_service
+            self._embedding_service = get_embedding_service()
+        return np.asarray(self._embedding_service.embed_query(text), dtype=np.float32)
+
+    async def _find_similar(self, embedding: np.ndarray) -> Optional[str]:
+        """Return the most similar cached query above the threshold, if any."""
+        members, matrix = await get_cache().get_embeddings(self.CACHE_PREFIX)
+        if not members or matrix.shape[1] != embedding.shape[0]:
+            return None
+
+        vec = embedding / (np.linalg.norm(embedding) or 1.0)
+        sims = matrix @ vec
+        best = int(np.argmax(sims))
+        return members[best] if sims[best] > self._semantic_threshold else None
+
+    async def aexpand_batch(
+        self,
+        queries: List[str],
+        max_expansions: int = 5,
+    ) -> List[List[str]]:
+        """
+        Expand several queries concurrently.
+        
+        Exact-cache lookups for the whole batch share one MGET and the new
+        expansions are written back with one pipelined MSET. A query whose
+        expansion fails is returned unexpanded.
+        
+        Args:
+            queries: Queries to expand
+            max_expansions: Maximum number of expansions per query
+            
+        Returns:
+            One list of variations per query, in input order
+        """
+        self._lazy_init()
+
+        # One round-trip for the exact-cache lookups of the whole batch;
+        # only misses go on to the semantic cache and the LLM
+        cache = get_cache()
+        cached: List[Optional[List[str]]] = [None] * len(queries)
+        if self._aclient or self._client:
+            cached = await cache.mget(
+                self.CACHE_PREFIX, [q.lower().strip() for q in queries]
+            )
+
+        # Fresh expansions of the misses, stored together after the gather
+        pending: Dict[str, List[str]] = {}
+
+        async def expand(query: str, hit: Optional[List[str]]) -> List[str]:
+            if hit is not None:
+                return self._combine(query, hit[:max_expansions], max_expansions)
+            return await self._aexpand(
+                query, max_expansions, check_exact=False, pending=pending
+            )
+
+        results = await asyncio.gather(
+            *(expand(q, hit) for q, hit in zip(queries, cached)),
+            return_exceptions=True,
+        )
+        if pending:
+            await cache.mset(
+                self.CACHE_PREFIX, list(pending.items()),
+                expire_seconds=self.CACHE_TTL_SECONDS,
+            )
+        return [
+            [q] if isinstance(r, BaseException) else r
+            for q, r in zip(queries, results)
+        ]
+
+    def _combine(
+        self,
+        query: str,
+        expansions: List[str],
+        max_expansions: int,
+    ) -> List[str]:
+        """Prepend the original query and drop duplicate variations."""
+        # Always include original query
+        result = [query] + expansions
+
+        # Remove duplicates while preserving order; casefold handles mixed
+        # case Vietnamese diacritics more reliably than lower()
+        unique: Dict[str, str] = {}
+        for q in result:
+            q = q.strip()
+            unique.setdefault(q.casefold(), q)
+            if len(unique) > max_expansions:
+                break
+
+        return list(unique.values())
+
+    def _completion_kwargs(self, query: str) -> dict:
+        """Request parameters for an expansion call."""
+        # The system prompt is identical on every call, so the provider can
+        # serve it from its prompt cache; deterministic sampling keeps
+        # expansions stable across repeated queries
+        return dict(
             model="gpt-4o-mini",
-            messages=[{"role": "user", "content": prompt}],
+            messages=[
+                {"role": "system", "content": EXPANSION_PROMPT},
+                {"role": "user", "content": f"Query: \"{query}\""},
+            ],
             max_tokens=200,
-            temperature=0.7,
+            temperature=0,
+            seed=42,
+            response_format={"type": "json_object"},
         )
 
-        content = response.choices[0].message.content.strip()
-
-        # Parse JSON response
-        try:
-            # Handle case where response might have markdown code block
-            if content.startswith("```"):
-                content = content.split("```")[1]
-                if content.startswith("json"):
-                    content = content[4:]
+    def _expand_with_llm(self, query: str) -> List[str]:
+        """Expand query using LLM."""
+        response = self._client.chat.completions.create(
+            **self._completion_kwargs(query)
+        )
+        return self._parse_expansions(response.choices[0].message.content)
 
-            expansions = json.loads(content)
+    async def _aexpand_with_llm(self, query: str) -> List[str]:
+        """Expand query using the async LLM client."""
+        async with self._semaphore:
+            response = await self._aclient.chat.completions.create(
+                **self._completion_kwargs(query)
+            )
+        return self._parse_expansions(response.choices[0].message.content)
 
-            if isinstance(expansions, list):
-                return [str(e) for e in expansions if e]
-        except json.JSONDecodeError:
-            # Try to extract strings from response
-            import re
-            strings = re.findall(r'"([^"]+)"', content)
-            if strings:
-                return strings
+    def _parse_expansions(self, content: str) -> List[str]:
+        """Parse the LLM response into a list of expansions."""
+        content = content.strip()
 
-        return []
+        for candidate in (content, _repair_json(content)):
+            try:
+                parsed = json.loads(candidate)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(parsed, dict):
+                parsed = parsed.get("expansions", [])
+            if isinstance(parsed, list):
+                return [str(e) for e in parsed if e]
+            return []
+
+        # Try to extract strings from response
+        strings = _JSON_STR_RE.findall(content)
+        return [s for s in strings if s != "expansions"]
 
     def _fallback_expansion(self, query: str) -> List[str]:
         """
         Simple fallback expansion without LLM.
         
-        Uses basic rules for common job titles and skills.
-        """
-        expansions = []
-        query_lower = query.lower()
-
-        # Common expansions for job titles
-        title_mappings = {
-            "developer": ["engineer", "programmer", "lập trình viên"],
-            "engineer": ["developer", "specialist", "kỹ sư"],
-            "manager": ["lead", "director", "quản lý"],
-            "senior": ["sr.", "experienced"],
-            "junior": ["jr.", "entry-level", "fresher"],
-        }
-
-        # Check for matching patterns
-        for key, expansions_list in title_mappings.items():
-            if key in query_lower:
-                for exp in expansions_list:
-                    new_query = query_lower.replace(key, exp)
-                    expansions.append(new_query.title())
-
-        # Add Vietnamese translation patterns
-        vn_mappings = {
-            "software": "phần mềm",
-            "developer": "lập trình viên",
-            "engineer": "kỹ sư",
-            "manager": "quản lý",
-            "data": "dữ liệu",
-            "web": "web",
-            "mobile": "di động",
-        }
-
-        # Try to create Vietnamese version
-        vn_query = query
-        for en, vn in vn_mappings.items():
-            vn_query = vn_query.lower().replace(en, vn)
-        if vn_query.lower() != query.lower():
-            expansions.append(vn_query.title())
-
-        return expansions
+        Uses basic rules for common job titles and skills. The rules only
+        see the lowercased query, so results are memoized on it.
+        """
+        return list(_fallback_expansions(query.lower()))
 
     def expand_for_skills(self, skill: str) -> List[str]:
         """
@@ -212,33 +502,41 @@ class QueryExpander:
         Returns:
             Related skills
         """
-        # Common skill groupings
-        skill_groups = {
-            "python": ["python3", "django", "flask", "fastapi"],
-            "javascript": ["js", "node.js", "react", "vue", "angular"],
-            "java": ["spring", "spring boot", "hibernate"],
-            "sql": ["mysql", "postgresql", "oracle", "sql server"],
-            "aws": ["amazon web services", "ec2", "s3", "lambda"],
-            "docker": ["container", "kubernetes", "k8s"],
-            "machine learning": ["ml", "deep learning", "ai", "học máy"],
-        }
+        # One lookup in the table built at import time
+        return [skill, *_SKILL_EXPANSIONS.get(skill.strip().lower(), ())]
+
+
+@lru_cache(maxsize=4096)
+def _fallback_expansions(query_lower: str) -> Tuple[str, ...]:
+    """Rule-based expansions of a lowercased query (cached, immutable)."""
+    expansions = []
 
-        skill_lower = skill.lower()
+    # One scan finds every title key present in the query
+    present = set(_TITLE_RE.findall(query_lower))
+    for key, expansions_list in _TITLE_MAPPINGS.items():
+        if key in present:
+            for exp in expansions_list:
+                new_query = query_lower.replace(key, exp)
+                expansions.append(new_query.title())
 
-        for key, related in skill_groups.items():
-            if skill_lower == key or skill_lower in related:
-                return [skill] + [s for s in related if s != skill_lower]
+    # Try to create Vietnamese version in a single substitution pass
+    vn_query = _VN_RE.sub(lambda m: _VN_MAPPINGS[m.group(0)], query_lower)
+    if vn_query != query_lower:
+        expansions.append(vn_query.title())
 
-        return [skill]
+    return tuple(expansions)
 
 
 # Singleton instance
 _expander: Optional[QueryExpander] = None
+_expander_lock = threading.Lock()
 
 
 def get_query_expander() -> QueryExpander:
-    """Get or create the query expander singleton."""
+    """Get or create the query expander singleton (thread-safe)."""
     global _expander
     if _expander is None:
-        _expander = QueryExpander()
+        with _expander_lock:
+            if _expander is None:
+                _expander = QueryExpander()
     return _expander
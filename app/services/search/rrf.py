@@ -17,13 +17,37 @@ Key benefits:
 """
 
 import logging
-from typing import List, Tuple, Dict, Any, Optional
-from dataclasses import dataclass, field
-from collections import defaultdict
+import threading
+from itertools import chain
+from typing import List, Tuple, Dict, Any, Optional, Iterator, Union
+from dataclasses import dataclass
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
 
+def _top_order(scores: np.ndarray, top_k: Optional[int] = None) -> np.ndarray:
+    """
+    Indices of the best scores, descending, ties in their current order.
+    
+    With top_k, the best top_k are selected in O(n) and only they are
+    sorted; the result equals the full ordering truncated to top_k.
+    """
+    if top_k is None or top_k >= len(scores):
+        return np.argsort(-scores, kind="stable")
+    if top_k <= 0:
+        return np.zeros(0, dtype=np.intp)
+
+    # Everything above the k-th best score, plus the earliest ties at
+    # that score, in original order so the stable sort keeps tie order
+    kth = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+    above = np.flatnonzero(scores > kth)
+    ties = np.flatnonzero(scores == kth)[:top_k - len(above)]
+    selected = np.sort(np.concatenate((above, ties)))
+    return selected[np.argsort(-scores[selected], kind="stable")]
+
+
 @dataclass
 class RRFResult:
     """Result from RRF fusion."""
@@ -36,7 +60,75 @@ class RRFResult:
     keyword_score: Optional[float] = None
     semantic_score: Optional[float] = None
     content: Optional[str] = None
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class RRFResultBatch:
+    """
+    RRF fusion results stored column-wise.
+    
+    Indexing or iterating yields RRFResult objects, built on demand, so
+    callers that only need the top few results never allocate the rest.
+    Ranks of 0 and NaN scores mean the document was absent from that list.
+    """
+
+    doc_ids: np.ndarray
+    candidate_ids: np.ndarray
+    combined_scores: np.ndarray
+    keyword_ranks: np.ndarray
+    semantic_ranks: np.ndarray
+    keyword_scores: np.ndarray
+    semantic_scores: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def __getitem__(self, key: Union[int, slice, np.ndarray]) -> Any:
+        if isinstance(key, (int, np.integer)):
+            return self._result(int(key))
+        return RRFResultBatch(
+            doc_ids=self.doc_ids[key],
+            candidate_ids=self.candidate_ids[key],
+            combined_scores=self.combined_scores[key],
+            keyword_ranks=self.keyword_ranks[key],
+            semantic_ranks=self.semantic_ranks[key],
+            keyword_scores=self.keyword_scores[key],
+            semantic_scores=self.semantic_scores[key],
+        )
+
+    def __iter__(self) -> Iterator[RRFResult]:
+        for i in range(len(self)):
+            yield self._result(i)
+
+    def top(self, n: int) -> "RRFResultBatch":
+        """First n results."""
+        return self[:n]
+
+    def sorted(self, top_k: Optional[int] = None) -> "RRFResultBatch":
+        """
+        Results sorted by combined score (ties keep their current order).
+        
+        Args:
+            top_k: Keep only the best top_k. They are selected in O(n) and
+                only they are sorted; the result equals sorted()[:top_k].
+        """
+        return self[_top_order(self.combined_scores, top_k)]
+
+    def _result(self, i: int) -> RRFResult:
+        keyword_rank = int(self.keyword_ranks[i])
+        semantic_rank = int(self.semantic_ranks[i])
+        keyword_score = float(self.keyword_scores[i])
+        semantic_score = float(self.semantic_scores[i])
+        return RRFResult(
+            doc_id=self.doc_ids[i],
+            candidate_id=self.candidate_ids[i],
+            combined_score=float(self.combined_scores[i]),
+            keyword_rank=keyword_rank or None,
+            semantic_rank=semantic_rank or None,
+            keyword_score=None if keyword_score != keyword_score else keyword_score,
+            semantic_score=None if semantic_score != semantic_score else semantic_score,
+        )
 
 
 class RRFMerger:
@@ -61,59 +153,57 @@ class RRFMerger:
         self,
         bm25_results: List[Tuple[str, str, float]],  # (doc_id, cand_id, score)
         vector_results: List[Tuple[str, str, float]],
-    ) -> List[RRFResult]:
+        top_k: Optional[int] = None,
+    ) -> RRFResultBatch:
         """
         Merge BM25 and vector search results using RRF.
         
         Args:
             bm25_results: Results from BM25 search (doc_id, candidate_id, score)
             vector_results: Results from vector search (doc_id, candidate_id, score)
+            top_k: Only return the best top_k documents (partial selection
+                instead of sorting every document)
             
         Returns:
             Merged results sorted by RRF score
         """
-        # Track scores and metadata for each document
-        doc_data: Dict[str, Dict[str, Any]] = {}
-
-        # Process BM25 results
-        for rank, (doc_id, cand_id, score) in enumerate(bm25_results, 1):
-            if doc_id not in doc_data:
-                doc_data[doc_id] = {
-                    "candidate_id": cand_id,
-                    "rrf_score": 0.0,
-                }
-            doc_data[doc_id]["keyword_rank"] = rank
-            doc_data[doc_id]["keyword_score"] = score
-            doc_data[doc_id]["rrf_score"] += 1.0 / (self.k + rank)
-
-        # Process vector results
-        for rank, (doc_id, cand_id, score) in enumerate(vector_results, 1):
-            if doc_id not in doc_data:
-                doc_data[doc_id] = {
-                    "candidate_id": cand_id,
-                    "rrf_score": 0.0,
-                }
-            doc_data[doc_id]["semantic_rank"] = rank
-            doc_data[doc_id]["semantic_score"] = score
-            doc_data[doc_id]["rrf_score"] += 1.0 / (self.k + rank)
-
-        # Build result list
-        results = []
-        for doc_id, data in doc_data.items():
-            results.append(
-                RRFResult(
-                    doc_id=doc_id,
-                    candidate_id=data["candidate_id"],
-                    combined_score=data["rrf_score"],
-                    keyword_rank=data.get("keyword_rank"),
-                    semantic_rank=data.get("semantic_rank"),
-                    keyword_score=data.get("keyword_score"),
-                    semantic_score=data.get("semantic_score"),
-                )
-            )
-
-        # Sort by combined RRF score
-        results.sort(key=lambda x: x.combined_score, reverse=True)
+        doc_index: Dict[str, int] = {}
+        candidate_ids: List[str] = []
+        bm25_idx = self._index_results(bm25_results, doc_index, candidate_ids)
+        vector_idx = self._index_results(vector_results, doc_index, candidate_ids)
+        n_docs = len(doc_index)
+
+        # Scatter-add 1/(k + rank) from each list into one score array
+        # (bincount sums duplicates like np.add.at, without its per-element
+        # overhead)
+        bm25_ranks = np.arange(1, len(bm25_idx) + 1, dtype=np.int32)
+        vector_ranks = np.arange(1, len(vector_idx) + 1, dtype=np.int32)
+        scores = np.bincount(
+            bm25_idx, weights=1.0 / (self.k + bm25_ranks), minlength=n_docs
+        ) + np.bincount(
+            vector_idx, weights=1.0 / (self.k + vector_ranks), minlength=n_docs
+        )
+
+        # Per-list rank and score (0 / NaN where a document is absent)
+        keyword_ranks = np.zeros(n_docs, dtype=np.int32)
+        keyword_ranks[bm25_idx] = bm25_ranks
+        semantic_ranks = np.zeros(n_docs, dtype=np.int32)
+        semantic_ranks[vector_idx] = vector_ranks
+        keyword_scores = np.full(n_docs, np.nan)
+        keyword_scores[bm25_idx] = [score for _, _, score in bm25_results]
+        semantic_scores = np.full(n_docs, np.nan)
+        semantic_scores[vector_idx] = [score for _, _, score in vector_results]
+
+        # Sort by combined RRF score (ties keep first-seen order)
+        results = RRFResultBatch(
+            doc_ids=np.array(list(doc_index), dtype=object),
+            candidate_ids=np.array(candidate_ids, dtype=object),
+            combined_scores=scores,
+            keyword_ranks=keyword_ranks,
+            semantic_ranks=semantic_ranks,
+            keyword_scores=keyword_scores,
+            semantic_scores=semantic_scores,
+        ).sorted(top_k)
 
         logger.info(
             f"RRF merged {len(bm25_results)} BM25 + {len(vector_results)} vector "
@@ -125,7 +215,7 @@ class RRFMerger:
     def merge_with_weights(
         self,
         result_lists: List[Tuple[List[Tuple[str, str, float]], float]],
-    ) -> List[RRFResult]:
+    ) -> RRFResultBatch:
         """
         Merge multiple result lists with custom weights.
         
@@ -136,34 +226,58 @@ class RRFMerger:
         Returns:
             Merged results sorted by weighted RRF score
         """
-        doc_data: Dict[str, Dict[str, Any]] = {}
-
-        for results, weight in result_lists:
-            for rank, (doc_id, cand_id, score) in enumerate(results, 1):
-                if doc_id not in doc_data:
-                    doc_data[doc_id] = {
-                        "candidate_id": cand_id,
-                        "rrf_score": 0.0,
-                    }
-                # Apply weight to RRF score
-                doc_data[doc_id]["rrf_score"] += weight / (self.k + rank)
-
-        results = [
-            RRFResult(
-                doc_id=doc_id,
-                candidate_id=data["candidate_id"],
-                combined_score=data["rrf_score"],
-            )
-            for doc_id, data in doc_data.items()
+        doc_index: Dict[str, int] = {}
+        candidate_ids: List[str] = []
+        indexed = [
+            (self._index_results(results, doc_index, candidate_ids), weight)
+            for results, weight in result_lists
         ]
 
-        results.sort(key=lambda x: x.combined_score, reverse=True)
-        return results
+        # Apply weight to RRF score
+        scores = np.zeros(len(doc_index), dtype=np.float64)
+        for idx, weight in indexed:
+            np.add.at(scores, idx, weight / (self.k + np.arange(1, len(idx) + 1)))
+
+        n_docs = len(doc_index)
+        return RRFResultBatch(
+            doc_ids=np.array(list(doc_index), dtype=object),
+            candidate_ids=np.array(candidate_ids, dtype=object),
+            combined_scores=scores,
+            keyword_ranks=np.zeros(n_docs, dtype=np.int64),
+            semantic_ranks=np.zeros(n_docs, dtype=np.int64),
+            keyword_scores=np.full(n_docs, np.nan),
+            semantic_scores=np.full(n_docs, np.nan),
+        ).sorted()
+
+    @staticmethod
+    def _index_results(
+        results: List[Tuple[str, str, float]],
+        doc_index: Dict[str, int],
+        candidate_ids: List[str],
+    ) -> np.ndarray:
+        """
+        Map each result to a shared integer document index.
+        
+        New documents are appended to doc_index, keeping the candidate ID
+        of their first appearance.
+        
+        Returns:
+            Document index for each result, in rank order
+        """
+        idx = np.empty(len(results), dtype=np.intp)
+        for pos, (doc_id, cand_id, _) in enumerate(results):
+            i = doc_index.get(doc_id)
+            if i is None:
+                i = doc_index[doc_id] = len(candidate_ids)
+                candidate_ids.append(cand_id)
+            idx[pos] = i
+        return idx
 
     def merge_candidate_level(
         self,
         bm25_results: List[Tuple[str, str, float]],
         vector_results: List[Tuple[str, str, float]],
+        top_n: Optional[int] = None,
     ) -> List[Tuple[str, float]]:
         """
         Merge results at candidate level (aggregate by candidate_id).
@@ -173,27 +287,37 @@ class RRFMerger:
         Args:
             bm25_results: BM25 results (doc_id, candidate_id, score)
             vector_results: Vector results (doc_id, candidate_id, score)
+            top_n: Only return the best top_n candidates (partial selection
+                instead of sorting every candidate)
             
         Returns:
             List of (candidate_id, total_score) sorted by score
         """
-        # First do document-level RRF
-        doc_results = self.merge(bm25_results, vector_results)
-
-        # Aggregate by candidate
-        candidate_scores: Dict[str, float] = defaultdict(float)
-
-        for result in doc_results:
-            candidate_scores[result.candidate_id] += result.combined_score
-
-        # Sort by total score
-        sorted_candidates = sorted(
-            candidate_scores.items(),
-            key=lambda x: x[1],
-            reverse=True,
+        # Intern candidate IDs in order of first appearance; document-level
+        # ranks are not needed here
+        candidate_index: Dict[str, int] = {}
+        n_results = len(bm25_results) + len(vector_results)
+        idx = np.fromiter(
+            (
+                candidate_index.setdefault(cand_id, len(candidate_index))
+                for _, cand_id, _ in chain(bm25_results, vector_results)
+            ),
+            dtype=np.intp,
+            count=n_results,
         )
 
-        return sorted_candidates
+        # Group-sum the RRF contributions per candidate in one pass
+        contributions = np.concatenate((
+            1.0 / (self.k + np.arange(1, len(bm25_results) + 1)),
+            1.0 / (self.k + np.arange(1, len(vector_results) + 1)),
+        ))
+        scores = np.bincount(idx, weights=contributions, minlength=len(candidate_index))
+
+        candidate_ids = list(candidate_index)
+        return [
+            (candidate_ids[i], float(scores[i]))
+            for i in _top_order(scores, top_n).tolist()
+        ]
 
     @staticmethod
     def explain_ranking(result: RRFResult) -> str:
@@ -225,11 +349,16 @@ class RRFMerger:
 
 # Module-level instance
 _merger: Optional[RRFMerger] = None
+_merger_lock = threading.Lock()
 
 
 def get_rrf_merger(k: int = 60) -> RRFMerger:
-    """Get or create an RRF merger instance."""
+    """Get or create an RRF merger instance (thread-safe)."""
     global _merger
-    if _merger is None or _merger.k != k:
-        _merger = RRFMerger(k=k)
-    return _merger
+    merger = _merger
+    if merger is None or merger.k != k:
+        with _merger_lock:
+            merger = _merger
+            if merger is None or merger.k != k:
+                merger = _merger = RRFMerger(k=k)
+    return merger
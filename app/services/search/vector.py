@@ -94,6 +94,8 @@ class VectorSearch:
         embedding_str = '[' + ','.join(str(x) for x in query_embedding) + ']'
 
         # Build SQL query with pre-filtering via JOIN to candidates table
+        # Chunk embeddings are stored as halfvec; casting the query to the
+        # same type keeps the distance operator on the halfvec index
         # Note: embedding_str is safe to embed directly as it's generated by our model, not user input
         sql = f"""
             SELECT 
@@ -103,7 +105,7 @@ class VectorSearch:
                 c.enriched_content,
                 c.section,
                 c.chunk_metadata as metadata,
-                1 - (c.embedding <=> '{embedding_str}'::vector) as similarity,
+                1 - (c.embedding <=> '{embedding_str}'::halfvec) as similarity,
                 cand.full_name,
                 cand.address,
                 cand.total_experience_years,
@@ -143,7 +145,7 @@ class VectorSearch:
                 if skill_conditions:
                     sql += f" AND ({' OR '.join(skill_conditions)})"
 
-        sql += f" ORDER BY c.embedding <=> '{embedding_str}'::vector LIMIT :limit"
+        sql += f" ORDER BY c.embedding <=> '{embedding_str}'::halfvec LIMIT :limit"
 
         result = await session.execute(text(sql), params)
         rows = result.fetchall()
@@ -243,7 +245,7 @@ class VectorSearch:
                 c.enriched_content,
                 c.section,
                 c.metadata,
-                1 - (c.embedding <=> '{embedding_str}'::vector) as similarity,
+                1 - (c.embedding <=> '{embedding_str}'::halfvec) as similarity,
                 cand.full_name,
                 cand.top_skills
             FROM chunks c
@@ -257,7 +259,7 @@ class VectorSearch:
             sql += " AND c.section = :section"
             params["section"] = section_filter
 
-        sql += f" ORDER BY c.embedding <=> '{embedding_str}'::vector LIMIT :limit"
+        sql += f" ORDER BY c.embedding <=> '{embedding_str}'::halfvec LIMIT :limit"
 
         result = session.execute(text(sql), params)
 
@@ -1,5 +1,13 @@
 """Utility services initialization."""
 
-from app.services.utils.experience import calculate_total_experience, merge_intervals
+from app.services.utils.experience import (
+    calculate_total_experience,
+    calculate_total_experience_batch,
+    merge_intervals,
+)
 
-__all__ = ["calculate_total_experience", "merge_intervals"]
+__all__ = [
+    "calculate_total_experience",
+    "calculate_total_experience_batch",
+    "merge_intervals",
+]
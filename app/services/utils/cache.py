@@ -1,21 +1,65 @@
 import json
 import logging
 import hashlib
-from typing import Any, Optional, Union
+import threading
+import uuid
+from typing import Any, Dict, List, Optional, Tuple, Union
 from datetime import timedelta
 
+import numpy as np
 import redis.asyncio as redis
 from app.config import get_settings
 
+# Fast C serializer and hash when available; stdlib fallbacks otherwise
+try:
+    import orjson
+
+    def _dumps(data: Any, sort_keys: bool = False) -> bytes:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS if sort_keys else 0)
+
+    _loads = orjson.loads
+except ImportError:
+    def _dumps(data: Any, sort_keys: bool = False) -> bytes:
+        return json.dumps(data, sort_keys=sort_keys).encode()
+
+    _loads = json.loads
+
+try:
+    import xxhash
+
+    def _digest(content: bytes) -> str:
+        return xxhash.xxh3_128_hexdigest(content)
+except ImportError:
+    def _digest(content: bytes) -> str:
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
 settings = get_settings()
 logger = logging.getLogger(__name__)
 
+# Adds one vector to a semantic index, dropping the index first once it is
+# full, and stamps a fresh version token so readers know to reload it.
+# KEYS: index hash, version key; ARGV: member, vector, max entries, TTL, token
+_ADD_EMBEDDING_LUA = """
+if redis.call('HLEN', KEYS[1]) >= tonumber(ARGV[3]) then
+    redis.call('DEL', KEYS[1])
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+redis.call('SET', KEYS[2], ARGV[5], 'EX', ARGV[4])
+return 1
+"""
+
 class RedisCache:
     """Redis-based caching service."""
     
     def __init__(self, redis_url: Optional[str] = None):
         self.redis_url = redis_url or settings.redis_url
         self._redis: Optional[redis.Redis] = None
+        self._raw_redis: Optional[redis.Redis] = None
+        self._add_embedding_script = None
+        # Per-prefix (version token, members, matrix) of the semantic
+        # indexes, reused until another writer changes the version
+        self._embedding_indexes: Dict[str, Tuple[Optional[bytes], List[str], np.ndarray]] = {}
         
     async def _get_redis(self) -> redis.Redis:
         if self._redis is None:
@@ -25,15 +69,21 @@ class RedisCache:
                 decode_responses=True,
             )
         return self._redis
+
+    async def _get_raw_redis(self) -> redis.Redis:
+        """Client without response decoding, for binary values."""
+        if self._raw_redis is None:
+            self._raw_redis = redis.from_url(self.redis_url)
+        return self._raw_redis
         
     def _generate_key(self, prefix: str, data: Any) -> str:
         """Generate a unique key based on data content."""
         if isinstance(data, str):
-            content = data
+            content = data.encode()
         else:
-            content = json.dumps(data, sort_keys=True)
+            content = _dumps(data, sort_keys=True)
             
-        hash_val = hashlib.md5(content.encode()).hexdigest()
+        hash_val = _digest(content)
         return f"cache:{prefix}:{hash_val}"
         
     async def get(self, prefix: str, key_data: Any) -> Optional[Any]:
@@ -43,7 +93,7 @@ class RedisCache:
             key = self._generate_key(prefix, key_data)
             data = await r.get(key)
             if data:
-                return json.loads(data)
+                return _loads(data)
         except Exception as e:
             logger.warning(f"Cache get failed: {e}")
         return None
@@ -61,7 +111,7 @@ class RedisCache:
             key = self._generate_key(prefix, key_data)
             await r.set(
                 key, 
-                json.dumps(value), 
+                _dumps(value), 
                 ex=expire_seconds
             )
             return True
@@ -69,12 +119,124 @@ class RedisCache:
             logger.warning(f"Cache set failed: {e}")
         return False
 
+    async def mget(self, prefix: str, key_datas: List[Any]) -> List[Optional[Any]]:
+        """Retrieve several entries in one round-trip (None for misses)."""
+        try:
+            r = await self._get_redis()
+            keys = [self._generate_key(prefix, k) for k in key_datas]
+            values = await r.mget(keys)
+            return [_loads(v) if v else None for v in values]
+        except Exception as e:
+            logger.warning(f"Cache mget failed: {e}")
+        return [None] * len(key_datas)
+
+    async def mset(
+        self,
+        prefix: str,
+        items: List[Tuple[Any, Any]],
+        expire_seconds: int = 300,
+    ) -> bool:
+        """Store several (key_data, value) entries in one pipelined round-trip."""
+        try:
+            r = await self._get_redis()
+            async with r.pipeline(transaction=False) as pipe:
+                for key_data, value in items:
+                    pipe.set(
+                        self._generate_key(prefix, key_data),
+                        _dumps(value),
+                        ex=expire_seconds,
+                    )
+                await pipe.execute()
+            return True
+        except Exception as e:
+            logger.warning(f"Cache mset failed: {e}")
+        return False
+
+    async def add_embedding(
+        self,
+        prefix: str,
+        member: str,
+        embedding: np.ndarray,
+        expire_seconds: int = 86400,
+        max_entries: int = 10000,
+    ) -> bool:
+        """
+        Store an embedding in the per-prefix vector index.
+        
+        Vectors are L2-normalized and stored as float16 bytes in a single
+        hash. The index is dropped once it grows past max_entries. The
+        size check, reset and write run as one script so concurrent
+        writers cannot interleave, and each write bumps the index version
+        that get_embeddings checks.
+        """
+        try:
+            r = await self._get_raw_redis()
+            if self._add_embedding_script is None:
+                self._add_embedding_script = r.register_script(_ADD_EMBEDDING_LUA)
+            vec = np.asarray(embedding, dtype=np.float32)
+            vec = vec / (np.linalg.norm(vec) or 1.0)
+            await self._add_embedding_script(
+                keys=[f"cache:{prefix}:emb", f"cache:{prefix}:emb:ver"],
+                args=[
+                    member,
+                    vec.astype(np.float16).tobytes(),
+                    max_entries,
+                    expire_seconds,
+                    uuid.uuid4().hex,
+                ],
+            )
+            return True
+        except Exception as e:
+            logger.warning(f"Cache add_embedding failed: {e}")
+        return False
+
+    async def get_embeddings(self, prefix: str) -> Tuple[List[str], np.ndarray]:
+        """
+        Load the per-prefix vector index.
+        
+        The matrix is kept in process and only re-read from Redis when the
+        index version changes, so a lookup is normally one GET plus a
+        matrix-vector product instead of transferring the whole index.
+        
+        Returns:
+            (members, matrix of L2-normalized float32 vectors, one row each)
+        """
+        try:
+            r = await self._get_raw_redis()
+            key = f"cache:{prefix}:emb"
+            version = await r.get(f"{key}:ver")
+            local = self._embedding_indexes.get(prefix)
+            if local is not None and local[0] == version:
+                return local[1], local[2]
+
+            # Read the version again with the index so both match
+            async with r.pipeline(transaction=True) as pipe:
+                pipe.get(f"{key}:ver")
+                pipe.hgetall(key)
+                version, entries = await pipe.execute()
+
+            members: List[str] = []
+            matrix = np.zeros((0, 0), dtype=np.float32)
+            if entries:
+                members = [m.decode() for m in entries]
+                matrix = np.stack([
+                    np.frombuffer(v, dtype=np.float16) for v in entries.values()
+                ]).astype(np.float32)
+            self._embedding_indexes[prefix] = (version, members, matrix)
+            return members, matrix
+        except Exception as e:
+            logger.warning(f"Cache get_embeddings failed: {e}")
+        return [], np.zeros((0, 0), dtype=np.float32)
+
 # Singleton instance
 _cache: Optional[RedisCache] = None
+_cache_lock = threading.Lock()
 
 def get_cache() -> RedisCache:
-    """Get the global cache instance."""
+    """Get the global cache instance (thread-safe)."""
     global _cache
     if _cache is None:
-        _cache = RedisCache()
+        with _cache_lock:
+            if _cache is None:
+                _cache = RedisCache()
     return _cache
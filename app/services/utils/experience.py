@@ -18,36 +18,56 @@ Example:
 """
 
 from datetime import date
+from operator import itemgetter
 from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
+import numpy as np
 
-@dataclass
+# From this many intervals merge_intervals switches to the NumPy path.
+# Converting dates in and out stays in Python either way, so the array
+# merge only pays off on long lists (break-even measured near 1000).
+_VECTORIZE_MIN_INTERVALS = 1000
+
+
+@dataclass(frozen=True, slots=True)
 class TimeInterval:
     """Represents a time interval with start and end dates."""
 
     start: date
     end: date
+    # Day ordinals and duration, computed once at construction so
+    # comparisons and durations are plain int arithmetic
+    start_day: int = field(init=False, repr=False, compare=False)
+    end_day: int = field(init=False, repr=False, compare=False)
+    days: int = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        start_day = self.start.toordinal()
+        end_day = self.end.toordinal()
+        object.__setattr__(self, "start_day", start_day)
+        object.__setattr__(self, "end_day", end_day)
+        object.__setattr__(self, "days", end_day - start_day)
 
     @property
     def duration_days(self) -> int:
         """Duration in days."""
-        return (self.end - self.start).days
+        return self.days
 
     @property
     def duration_years(self) -> float:
         """Duration in years (accounting for leap years)."""
-        return self.duration_days / 365.25
+        return self.days / 365.25
 
     def overlaps(self, other: "TimeInterval") -> bool:
         """Check if this interval overlaps with another."""
-        return self.start <= other.end and other.start <= self.end
+        return self.start_day <= other.end_day and other.start_day <= self.end_day
 
     def merge(self, other: "TimeInterval") -> "TimeInterval":
         """Merge this interval with another overlapping interval."""
         return TimeInterval(
-            start=min(self.start, other.start),
-            end=max(self.end, other.end),
+            start=self.start if self.start_day <= other.start_day else other.start,
+            end=self.end if self.end_day >= other.end_day else other.end,
         )
 
 
@@ -59,12 +79,15 @@ def merge_intervals(
     
     Algorithm:
     1. Replace None end dates with today (ongoing positions)
-    2. Sort intervals by start date
-    3. Iterate and merge overlapping intervals
+    2. Sort intervals by start date (skipped if already in order)
+    3. Sweep once, extending the current span until a gap opens
     
-    Time Complexity: O(n log n) for sorting
+    Time Complexity: O(n log n) for sorting, O(n) for sorted input
     Space Complexity: O(n) for the merged list
     
+    Long histories (_VECTORIZE_MIN_INTERVALS or more) are merged with
+    NumPy via merge_intervals_batch instead of the Python sweep.
+    
     Args:
         intervals: List of (start_date, end_date) tuples.
                    end_date can be None for ongoing positions.
@@ -85,41 +108,97 @@ def merge_intervals(
     if not intervals:
         return []
 
-    today = date.today()
+    if len(intervals) >= _VECTORIZE_MIN_INTERVALS:
+        return _merge_intervals_vectorized(intervals)
+
+    today = date.today().toordinal()
 
-    # Convert to TimeInterval objects, replacing None with today
-    time_intervals = []
+    # Single pass to ordinal days (int comparisons are much cheaper than
+    # date comparisons), replacing None with today and noting whether the
+    # input already comes in (reverse) chronological order, as parser
+    # output usually does
+    spans: List[Tuple[int, int]] = []
+    ascending = descending = True
+    prev_start = None
     for start, end in intervals:
         if start is None:
             continue  # Skip invalid intervals
-        effective_end = end if end is not None else today
-        if start <= effective_end:  # Validate date order
-            time_intervals.append(TimeInterval(start=start, end=effective_end))
-
-    if not time_intervals:
+        start_day = start.toordinal()
+        end_day = end.toordinal() if end is not None else today
+        if start_day <= end_day:  # Validate date order
+            if prev_start is not None:
+                ascending = ascending and start_day >= prev_start
+                descending = descending and start_day <= prev_start
+            prev_start = start_day
+            spans.append((start_day, end_day))
+
+    if not spans:
         return []
 
     # Sort by start date
-    time_intervals.sort(key=lambda x: x.start)
+    if descending and not ascending:
+        spans.reverse()
+    elif not ascending:
+        spans.sort(key=itemgetter(0))
+
+    # Sweep with the current span in two locals; TimeInterval objects are
+    # built only when a gap closes a span
+    merged: List[TimeInterval] = []
+    fromordinal = date.fromordinal
+    cur_start, cur_end = spans[0]
+
+    for start_day, end_day in spans:
+        if start_day <= cur_end:
+            # Overlapping - extend the current span
+            if end_day > cur_end:
+                cur_end = end_day
+        else:
+            # Gap - emit the current span and start a new one
+            merged.append(TimeInterval(start=fromordinal(cur_start), end=fromordinal(cur_end)))
+            cur_start, cur_end = start_day, end_day
 
-    # Merge overlapping intervals
-    merged = [time_intervals[0]]
+    merged.append(TimeInterval(start=fromordinal(cur_start), end=fromordinal(cur_end)))
+    return merged
 
-    for current in time_intervals[1:]:
-        last = merged[-1]
 
-        if current.start <= last.end:
-            # Overlapping - merge them
-            merged[-1] = last.merge(current)
-        else:
-            # No overlap - add as new interval
-            merged.append(current)
+def _merge_intervals_vectorized(
+    intervals: List[Tuple[date, Optional[date]]]
+) -> List[TimeInterval]:
+    """NumPy path of merge_intervals for long interval lists."""
+    today = date.today().toordinal()
+    valid_intervals = [iv for iv in intervals if iv[0] is not None]  # Skip invalid
+    if not valid_intervals:
+        return []
 
-    return merged
+    # toordinal() per date is far cheaper than NumPy's datetime64 parsing
+    # of date objects; sorting and merging then run vectorized
+    count = len(valid_intervals)
+    start_days = np.fromiter(
+        (start.toordinal() for start, _ in valid_intervals), dtype=np.int64, count=count
+    )
+    end_days = np.fromiter(
+        (end.toordinal() if end is not None else today for _, end in valid_intervals),
+        dtype=np.int64,
+        count=count,
+    )
+    valid = start_days <= end_days  # Validate date order
+
+    _, merged_starts, merged_ends = merge_intervals_batch(
+        start_days[valid],
+        end_days[valid],
+        np.zeros(np.count_nonzero(valid), dtype=np.int64),
+    )
+
+    fromordinal = date.fromordinal
+    return [
+        TimeInterval(start=fromordinal(s), end=fromordinal(e))
+        for s, e in zip(merged_starts.tolist(), merged_ends.tolist())
+    ]
 
 
 def calculate_total_experience(
-    intervals: List[Tuple[date, Optional[date]]]
+    intervals: List[Tuple[date, Optional[date]]],
+    merged: Optional[List[TimeInterval]] = None,
 ) -> float:
     """
     Calculate total years of work experience from job intervals.
@@ -131,6 +210,7 @@ def calculate_total_experience(
     Args:
         intervals: List of (start_date, end_date) tuples from work history.
                    end_date can be None for current positions.
+        merged: Result of merge_intervals(intervals), if already computed
     
     Returns:
         Total years of experience as a float (rounded to 2 decimals)
@@ -148,13 +228,14 @@ def calculate_total_experience(
         return 0.0
 
     # Merge overlapping intervals
-    merged = merge_intervals(intervals)
+    if merged is None:
+        merged = merge_intervals(intervals)
 
     if not merged:
         return 0.0
 
     # Sum durations of merged intervals
-    total_days = sum(interval.duration_days for interval in merged)
+    total_days = sum(interval.days for interval in merged)
 
     # Convert to years
     total_years = total_days / 365.25
@@ -162,6 +243,105 @@ def calculate_total_experience(
     return round(total_years, 2)
 
 
+def merge_intervals_batch(
+    starts: np.ndarray,
+    ends: np.ndarray,
+    owner_ids: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Merge overlapping intervals for many owners (e.g. candidates) at once.
+    
+    Same merge rule as merge_intervals, but over flat arrays of day
+    numbers (e.g. datetime64[D] viewed as int64), so a whole batch of work
+    histories is merged with one lexsort and a few vectorized passes
+    instead of a Python loop per interval. Intervals must already be valid
+    (start <= end).
+    
+    Args:
+        starts: Interval start days (int64)
+        ends: Interval end days (int64)
+        owner_ids: Integer owner of each interval
+    
+    Returns:
+        (owner_ids, starts, ends) of the merged intervals, grouped by owner
+        and sorted by start within each owner
+    """
+    starts = np.asarray(starts, dtype=np.int64)
+    ends = np.asarray(ends, dtype=np.int64)
+    owner_ids = np.asarray(owner_ids)
+    if len(starts) == 0:
+        return owner_ids[:0], starts[:0], ends[:0]
+
+    # Group by owner, then sort by start date within each owner
+    order = np.lexsort((starts, owner_ids))
+    starts, ends, owner_ids = starts[order], ends[order], owner_ids[order]
+
+    owner_change = np.empty(len(starts), dtype=bool)
+    owner_change[0] = True
+    owner_change[1:] = owner_ids[1:] != owner_ids[:-1]
+
+    # Running max of end dates within each owner group. Shifting each group
+    # into its own value band lets a single cumulative max stop at group
+    # boundaries.
+    base = min(starts.min(), ends.min())
+    width = ends.max() - base + 1
+    band = np.cumsum(owner_change) * width
+    running_end = np.maximum.accumulate(ends - base + band) - band + base
+
+    # An interval opens a new merged span when it starts after everything
+    # before it in its group has ended
+    new_span = owner_change.copy()
+    new_span[1:] |= starts[1:] > running_end[:-1]
+    first = np.flatnonzero(new_span)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+
+    return owner_ids[first], starts[first], running_end[last]
+
+
+def calculate_total_experience_batch(
+    histories: List[List[Tuple[date, Optional[date]]]],
+) -> List[float]:
+    """
+    Calculate total years of experience for many work histories at once.
+    
+    Equivalent to calling calculate_total_experience on each history, but
+    merges all of them in one merge_intervals_batch call.
+    
+    Args:
+        histories: One list of (start_date, end_date) tuples per candidate
+    
+    Returns:
+        Total years of experience per history, in input order
+    """
+    today = date.today()
+    owners, starts, ends = [], [], []
+    for owner, intervals in enumerate(histories):
+        for start, end in intervals:
+            if start is None:
+                continue  # Skip invalid intervals
+            owners.append(owner)
+            starts.append(start)
+            ends.append(end if end is not None else today)
+
+    # Date -> day number conversion and validation happen in NumPy rather
+    # than per interval in Python
+    start_days = np.array(starts, dtype="datetime64[D]").view(np.int64)
+    end_days = np.array(ends, dtype="datetime64[D]").view(np.int64)
+    valid = start_days <= end_days  # Validate date order
+
+    merged_owners, merged_starts, merged_ends = merge_intervals_batch(
+        start_days[valid],
+        end_days[valid],
+        np.array(owners, dtype=np.int64)[valid],
+    )
+    total_days = np.bincount(
+        merged_owners,
+        weights=merged_ends - merged_starts,
+        minlength=len(histories),
+    )
+    return [round(days / 365.25, 2) for days in total_days.tolist()]
+
+
 def calculate_experience_at_company(
     intervals: List[Tuple[date, Optional[date]]],
     company: str,
@@ -191,6 +371,7 @@ def calculate_experience_at_company(
 def get_experience_gaps(
     intervals: List[Tuple[date, Optional[date]]],
     min_gap_months: int = 3,
+    merged: Optional[List[TimeInterval]] = None,
 ) -> List[TimeInterval]:
     """
     Find significant gaps in employment history.
@@ -198,11 +379,13 @@ def get_experience_gaps(
     Args:
         intervals: Work history intervals
         min_gap_months: Minimum gap size to report (in months)
+        merged: Result of merge_intervals(intervals), if already computed
     
     Returns:
         List of TimeInterval objects representing gaps
     """
-    merged = merge_intervals(intervals)
+    if merged is None:
+        merged = merge_intervals(intervals)
 
     if len(merged) < 2:
         return []
@@ -210,14 +393,11 @@ def get_experience_gaps(
     gaps = []
     min_gap_days = min_gap_months * 30  # Approximate
 
-    for i in range(1, len(merged)):
-        prev_end = merged[i - 1].end
-        curr_start = merged[i].start
-
-        gap_days = (curr_start - prev_end).days
+    for prev, curr in zip(merged, merged[1:]):
+        gap_days = curr.start_day - prev.end_day
 
         if gap_days >= min_gap_days:
-            gaps.append(TimeInterval(start=prev_end, end=curr_start))
+            gaps.append(TimeInterval(start=prev.end, end=curr.start))
 
     return gaps
 
@@ -234,9 +414,10 @@ def format_experience_summary(
     Returns:
         Summary string like "5.5 years (3 positions, 1 gap of 6 months)"
     """
-    total_years = calculate_total_experience(intervals)
+    # Merge once and share the result
     merged = merge_intervals(intervals)
-    gaps = get_experience_gaps(intervals, min_gap_months=3)
+    total_years = calculate_total_experience(intervals, merged=merged)
+    gaps = get_experience_gaps(intervals, min_gap_months=3, merged=merged)
 
     parts = [f"{total_years} years"]
 
@@ -245,7 +426,7 @@ def format_experience_summary(
 
     if gaps:
         if len(gaps) == 1:
-            gap_months = round(gaps[0].duration_days / 30)
+            gap_months = round(gaps[0].days / 30)
             parts.append(f"1 gap of {gap_months} months")
         else:
             parts.append(f"{len(gaps)} employment gaps")
@@ -1,5 +1,5 @@
 """Celery workers module initialization."""
 
-from app.workers.tasks import process_cv_task, generate_embeddings_task
+from app.workers.tasks import process_cv_task, generate_embeddings_task, build_cv_pipeline
 
-__all__ = ["process_cv_task", "generate_embeddings_task"]
+__all__ = ["process_cv_task", "generate_embeddings_task", "build_cv_pipeline"]
@@ -5,13 +5,17 @@ Heavy operations like OCR, LLM parsing, and embedding generation
 run in background workers to avoid blocking API requests.
 """
 
+import asyncio
 import os
 import logging
 import uuid
+import zipfile
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
+from xml.etree import ElementTree
 
-from celery import Task
+from celery import Task, chain, chord, group
+from celery.signals import worker_process_init
 
 from app.core.celery_app import celery_app
 from app.core.database import SessionLocal
@@ -21,6 +25,37 @@ settings = get_settings()
 logger = logging.getLogger(__name__)
 
 
+@worker_process_init.connect
+def _preload_services(**kwargs) -> None:
+    """
+    Load models and clients once per worker process at boot.
+
+    Without this the first CV each process handles pays for loading
+    PaddleOCR and the embedding model. Failures are logged, not raised:
+    the services lazily retry on first use.
+    """
+    from app.services.embedding.embedder import get_embedding_service
+    from app.services.ingestion.ocr import get_ocr_service
+    from app.services.ingestion.preprocessor import get_preprocessor
+    from app.services.parsing.cv_evaluator import get_cv_evaluator
+    from app.services.parsing.enricher import get_enricher
+    from app.services.parsing.llm_parser import get_parser
+
+    preloads = {
+        "preprocessor": get_preprocessor,
+        "enricher": get_enricher,
+        "ocr": lambda: get_ocr_service()._lazy_init(),
+        "embedding model": lambda: get_embedding_service()._lazy_init(),
+        "llm parser": lambda: get_parser()._lazy_init(),
+        "cv evaluator": get_cv_evaluator,
+    }
+    for name, preload in preloads.items():
+        try:
+            preload()
+        except Exception as e:
+            logger.warning(f"Worker preload of {name} failed: {e}")
+
+
 class CVProcessingTask(Task):
     """Base task with error handling and progress updates."""
 
@@ -53,89 +88,331 @@ def process_cv_task(
     2. Layout Analysis (for two-column CVs)
     3. Vietnamese Preprocessing
     4. LLM Parsing
-    5. Chunking
+    5. Experience, Quality Evaluation and Chunking (concurrently)
     6. Embedding Generation
     7. Database Storage
     """
     logger.info(f"Starting CV processing: {original_filename}")
 
     try:
-        # Stage 1: OCR / Text Extraction
+        return asyncio.run(_process_cv_pipeline(self, file_path, original_filename))
+
+    except Exception as e:
+        logger.error(f"CV processing failed: {e}")
+        raise
+
+
+async def _process_cv_pipeline(
+    task: CVProcessingTask,
+    file_path: str,
+    original_filename: str,
+) -> Dict[str, Any]:
+    """
+    Run the CV pipeline stages on an event loop.
+
+    The stage helpers are blocking (OCR, sync LLM clients, DB session), so
+    each runs via asyncio.to_thread; independent stages are awaited together
+    with asyncio.gather so their network round-trips overlap.
+    """
+    # Stage 1: OCR / Text Extraction
+    task.update_progress("ocr_processing", 10, filename=original_filename)
+    text = await asyncio.to_thread(_extract_text, file_path)
+
+    if not text or len(text.strip()) < 50:
+        raise ValueError("Could not extract text from document")
+
+    # Stage 2: Vietnamese Preprocessing
+    task.update_progress("text_preprocessing", 25, filename=original_filename)
+    processed_text = await asyncio.to_thread(_preprocess_text, text)
+
+    # Stage 3: LLM Parsing
+    task.update_progress("llm_parsing", 40, filename=original_filename)
+    resume = await asyncio.to_thread(_parse_with_llm, processed_text, original_filename)
+
+    # Stages 4-5: Calculate Experience, Evaluate & Reformat CV Data
+    # Quality, and Chunking only depend on the parse result and the text,
+    # so gather them; local chunking and experience math overlap the
+    # evaluator's LLM round-trips
+    task.update_progress("evaluating", 55, filename=original_filename)
+    total_experience, (resume, eval_result), chunks = await asyncio.gather(
+        asyncio.to_thread(_calculate_experience, resume),
+        asyncio.to_thread(_evaluate_cv_data, resume),
+        asyncio.to_thread(_create_chunks, processed_text, resume),
+    )
+    logger.info(f"CV quality score: {eval_result.score:.1f}/10, issues: {len(eval_result.issues)}")
+
+    # Stage 6: Enrichment
+    task.update_progress("chunking", 70, filename=original_filename)
+    enriched_chunks = _enrich_chunks(chunks, resume)
+
+    # Stage 7: Embedding Generation
+    task.update_progress("embedding", 80, filename=original_filename)
+    chunks_with_embeddings = await asyncio.to_thread(
+        _generate_embeddings, enriched_chunks, resume
+    )
+
+    # Stage 8: Database Storage
+    task.update_progress("embedding", 90, filename=original_filename)
+    candidate_id = await asyncio.to_thread(
+        _save_to_database,
+        resume,
+        chunks_with_embeddings,
+        total_experience,
+        original_filename,
+        processed_text,
+    )
+
+    # Stage 9: Update BM25 Index
+    task.update_progress("indexing", 95, filename=original_filename)
+    _update_bm25_index(candidate_id, chunks_with_embeddings)
+
+    logger.info(f"CV processing complete: {original_filename} -> {candidate_id}")
+
+    return {
+        "candidate_id": candidate_id,
+        "filename": original_filename,
+        "validation_warnings": resume.validation_warnings,
+    }
+
+
+@celery_app.task(bind=True, base=CVProcessingTask, name="cv.ocr")
+def ocr_stage_task(
+    self,
+    file_path: str,
+    original_filename: str,
+    skip_errors: bool = False,
+) -> Dict[str, Any]:
+    """
+    Pipeline stage 1 (CPU-bound, ``ocr`` queue): OCR and preprocessing.
+
+    Args:
+        file_path: Path to the CV file
+        original_filename: Name shown in progress and results
+        skip_errors: Return the error in the payload instead of raising, so
+            one unreadable file does not fail a whole batch chord
+
+    Returns:
+        Payload with the filename and preprocessed text (or "error")
+    """
+    try:
         self.update_progress("ocr_processing", 10, filename=original_filename)
         text = _extract_text(file_path)
 
         if not text or len(text.strip()) < 50:
             raise ValueError("Could not extract text from document")
 
-        # Stage 2: Vietnamese Preprocessing
         self.update_progress("text_preprocessing", 25, filename=original_filename)
-        processed_text = _preprocess_text(text)
-
-        # Stage 3: LLM Parsing
-        self.update_progress("llm_parsing", 40, filename=original_filename)
-        resume = _parse_with_llm(processed_text, original_filename)
-
-        # Stage 4: Calculate Experience
-        self.update_progress("llm_parsing", 50, filename=original_filename)
-        total_experience = _calculate_experience(resume)
-
-        # Stage 4.5: Evaluate & Reformat CV Data Quality
-        self.update_progress("evaluating", 55, filename=original_filename)
-        resume, eval_result = _evaluate_cv_data(resume)
-        logger.info(f"CV quality score: {eval_result.score:.1f}/10, issues: {len(eval_result.issues)}")
-
-        # Stage 5: Chunking
-        self.update_progress("chunking", 60, filename=original_filename)
-        chunks = _create_chunks(processed_text, resume)
-
-        # Stage 6: Enrichment
-        self.update_progress("chunking", 70, filename=original_filename)
-        enriched_chunks = _enrich_chunks(chunks, resume)
-
-        # Stage 7: Embedding Generation
-        self.update_progress("embedding", 80, filename=original_filename)
-        chunks_with_embeddings = _generate_embeddings(enriched_chunks, resume)
-
-        # Stage 8: Database Storage
-        self.update_progress("embedding", 90, filename=original_filename)
-        candidate_id = _save_to_database(
-            resume,
-            chunks_with_embeddings,
-            total_experience,
-            original_filename,
-            processed_text,
-        )
-
-        # Stage 9: Update BM25 Index
-        self.update_progress("indexing", 95, filename=original_filename)
-        _update_bm25_index(candidate_id, chunks_with_embeddings)
-
-        logger.info(f"CV processing complete: {original_filename} -> {candidate_id}")
 
         return {
-            "candidate_id": candidate_id,
             "filename": original_filename,
-            "validation_warnings": resume.validation_warnings,
+            "processed_text": _preprocess_text(text),
         }
 
     except Exception as e:
-        logger.error(f"CV processing failed: {e}")
-        raise
+        if not skip_errors:
+            raise
+        logger.error(f"OCR failed for {original_filename}: {e}")
+        return {"filename": original_filename, "error": str(e)}
+
+
+@celery_app.task(bind=True, base=CVProcessingTask, name="cv.parse")
+def parse_stage_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pipeline stage 2 (network-bound, ``llm`` queue): LLM parsing,
+    experience calculation and quality evaluation.
+
+    Args:
+        payload: Output of ocr_stage_task
+
+    Returns:
+        Payload extended with the serialized resume and total experience
+    """
+    filename = payload["filename"]
+
+    self.update_progress("llm_parsing", 40, filename=filename)
+    resume = _parse_with_llm(payload["processed_text"], filename)
+    total_experience = _calculate_experience(resume)
+
+    self.update_progress("evaluating", 55, filename=filename)
+    resume, eval_result = _evaluate_cv_data(resume)
+    logger.info(f"CV quality score: {eval_result.score:.1f}/10, issues: {len(eval_result.issues)}")
+
+    return {
+        **payload,
+        "resume": _dump_resume(resume),
+        "total_experience": total_experience,
+    }
+
+
+@celery_app.task(bind=True, base=CVProcessingTask, name="cv.index")
+def index_stage_task(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pipeline stage 3 (embedding model, ``embeddings`` queue): chunking,
+    embedding, database storage and BM25 indexing.
+
+    Args:
+        payload: Output of parse_stage_task
+
+    Returns:
+        Same result dict as process_cv_task
+    """
+    filename = payload["filename"]
+    processed_text = payload["processed_text"]
+    resume = _load_resume(payload["resume"])
+
+    self.update_progress("chunking", 70, filename=filename)
+    enriched_chunks = _enrich_chunks(_create_chunks(processed_text, resume), resume)
+
+    self.update_progress("embedding", 80, filename=filename)
+    chunks_with_embeddings = _generate_embeddings(enriched_chunks, resume)
+
+    self.update_progress("embedding", 90, filename=filename)
+    candidate_id = _save_to_database(
+        resume,
+        chunks_with_embeddings,
+        payload["total_experience"],
+        filename,
+        processed_text,
+    )
+
+    self.update_progress("indexing", 95, filename=filename)
+    _update_bm25_index(candidate_id, chunks_with_embeddings)
+
+    logger.info(f"CV processing complete: {filename} -> {candidate_id}")
+
+    return {
+        "candidate_id": candidate_id,
+        "filename": filename,
+        "validation_warnings": resume.validation_warnings,
+    }
+
+
+@celery_app.task(bind=True, base=CVProcessingTask, name="cv.parse_batch")
+def parse_batch_stage_task(self, payloads: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pipeline stage 2 for a batch of CVs (``llm`` queue): parse them with one
+    LLM request, evaluate each, then queue their index stages.
+
+    Args:
+        payloads: Outputs of ocr_stage_task for each CV in the batch
+
+    Returns:
+        Parsed filenames and skipped files with their errors
+    """
+    from app.services.parsing.llm_parser import get_parser
+
+    skipped = {p["filename"]: p["error"] for p in payloads if "error" in p}
+    ready = [p for p in payloads if "error" not in p]
+
+    if ready:
+        self.update_progress("llm_parsing", 40, filename=ready[0]["filename"])
+        resumes = get_parser().parse_resume_batch(
+            [p["processed_text"] for p in ready],
+            [p["filename"] for p in ready],
+        )
+
+        for payload, resume in zip(ready, resumes):
+            if isinstance(resume, Exception):
+                skipped[payload["filename"]] = str(resume)
+                continue
+
+            total_experience = _calculate_experience(resume)
+            resume, eval_result = _evaluate_cv_data(resume)
+            logger.info(
+                f"CV quality score ({payload['filename']}): {eval_result.score:.1f}/10, "
+                f"issues: {len(eval_result.issues)}"
+            )
+
+            index_stage_task.delay({
+                **payload,
+                "resume": _dump_resume(resume),
+                "total_experience": total_experience,
+            })
+
+    return {
+        "parsed": [p["filename"] for p in ready if p["filename"] not in skipped],
+        "skipped": skipped,
+    }
+
+
+def build_cv_pipeline(file_path: str, original_filename: str) -> chain:
+    """
+    Build the staged pipeline for one CV.
+
+    Each stage runs on the queue of the resource it saturates, so when many
+    CVs are queued (directory scans) OCR, LLM calls and embedding overlap
+    across files instead of one worker running all stages per file.
+
+    Args:
+        file_path: Path to the CV file, readable by the OCR workers
+        original_filename: Name shown in progress and results
+
+    Returns:
+        Celery chain; call apply_async() to start it
+    """
+    return chain(
+        ocr_stage_task.s(file_path, original_filename),
+        parse_stage_task.s(),
+        index_stage_task.s(),
+    )
+
+
+def build_cv_batch_pipeline(files: List[Tuple[str, str]]) -> chord:
+    """
+    Build the staged pipeline for a batch of CVs sharing one parse request.
+
+    OCR runs per file in parallel; once all are done the texts are parsed
+    together (see LLMParser.parse_resume_batch) and each CV continues to its
+    own index stage.
+
+    Args:
+        files: (file_path, original_filename) pairs
+
+    Returns:
+        Celery chord; call apply_async() to start it
+    """
+    return chord(
+        group(ocr_stage_task.s(path, name, skip_errors=True) for path, name in files),
+        parse_batch_stage_task.s(),
+    )
+
+
+def _dump_resume(resume) -> Dict[str, Any]:
+    """Serialize a resume for passing between pipeline stages."""
+    return {
+        "data": resume.model_dump(mode="json", exclude={"validation_warnings"}),
+        "validation_warnings": list(resume.validation_warnings),
+    }
+
+
+def _load_resume(dumped: Dict[str, Any]):
+    """Rebuild a resume serialized by _dump_resume."""
+    from app.schemas.resume import ResumeSchema
+
+    resume = ResumeSchema.model_validate(dumped["data"])
+    # Re-validation recomputes warnings; keep the ones from parsing
+    resume.validation_warnings = dumped["validation_warnings"]
+    return resume
 
 
 def _extract_text(file_path: str) -> str:
     """Extract text from document (PDF/image)."""
-    from app.services.ingestion.ocr import OCRService
+    from app.services.ingestion.ocr import get_ocr_service
 
     ext = os.path.splitext(file_path)[1].lower()
 
-    ocr = OCRService()
+    ocr = get_ocr_service()
 
     if ext == ".pdf":
         return ocr.extract_text_hybrid(file_path)
     elif ext in {".png", ".jpg", ".jpeg"}:
         return ocr.extract_text_only(file_path)
     elif ext in {".docx", ".doc"}:
+        try:
+            return _extract_docx_text(file_path)
+        except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as e:
+            logger.warning(f"Streaming DOCX extraction failed, using python-docx: {e}")
+
         # Use python-docx for Word documents
         try:
             from docx import Document
@@ -148,6 +425,38 @@ def _extract_text(file_path: str) -> str:
         raise ValueError(f"Unsupported file type: {ext}")
 
 
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _extract_docx_text(file_path: str) -> str:
+    """
+    Extract paragraph text from a DOCX by streaming word/document.xml.
+
+    Only text runs, tabs and breaks are read and each paragraph element is
+    cleared once emitted, so no document object graph (styles, tables,
+    sections) is built. Paragraphs inside tables are included.
+    """
+    paragraphs = []
+    parts = []
+
+    with zipfile.ZipFile(file_path) as archive, archive.open("word/document.xml") as xml:
+        for _, element in ElementTree.iterparse(xml):
+            tag = element.tag
+            if tag == _W_NS + "t":
+                if element.text:
+                    parts.append(element.text)
+            elif tag == _W_NS + "tab":
+                parts.append("\t")
+            elif tag in (_W_NS + "br", _W_NS + "cr"):
+                parts.append("\n")
+            elif tag == _W_NS + "p":
+                paragraphs.append("".join(parts))
+                parts.clear()
+                element.clear()
+
+    return "\n".join(paragraphs)
+
+
 def _preprocess_text(text: str) -> str:
     """Apply Vietnamese preprocessing."""
     from app.services.ingestion.preprocessor import get_preprocessor
@@ -190,48 +499,56 @@ def _evaluate_cv_data(resume):
 
 def _create_chunks(text: str, resume):
     """Create section-aware chunks."""
-    from app.services.parsing.chunker import SectionAwareChunker
+    from app.services.parsing.chunker import get_chunker
 
-    chunker = SectionAwareChunker()
-    return chunker.chunk_document(text)
+    return get_chunker().chunk_document(text)
 
 
 def _enrich_chunks(chunks, resume):
     """Enrich chunks with contextual metadata."""
-    from app.services.parsing.enricher import ContextualEnricher
+    from app.services.parsing.enricher import get_enricher
 
-    enricher = ContextualEnricher()
+    enricher = get_enricher()
     return enricher.enrich_chunks(chunks, resume)
 
 
 def _generate_embeddings(chunks, resume) -> list:
     """Generate embeddings for chunks and summary."""
+    from app.services.embedding.cache import get_embedding_cache
     from app.services.embedding.embedder import get_embedding_service
-    from app.services.parsing.enricher import ContextualEnricher
+    from app.services.parsing.enricher import get_enricher
 
     embedding_service = get_embedding_service()
-    enricher = ContextualEnricher()
-
-    results = []
+    enricher = get_enricher()
 
-    for chunk in chunks:
-        # Get enriched content for embedding
-        enriched = chunk.metadata.get("enriched_content", chunk.content)
-        embedding = embedding_service.embed_document(enriched)
+    # Get enriched content for embedding
+    texts = [
+        chunk.metadata.get("enriched_content", chunk.content)
+        for chunk in chunks
+    ]
 
-        results.append({
+    # Embed all chunks and the summary in one batched call; text already
+    # embedded with this model (e.g. boilerplate shared across CVs) comes
+    # from the cache
+    summary_context = enricher.build_summary_context(resume)
+    vectors = get_embedding_cache().get_or_compute_many(
+        texts + [summary_context],
+        embedding_service.model_name,
+        embedding_service.embed_documents,
+    )
+
+    results = [
+        {
             "chunk": chunk,
             "embedding": embedding,
             "enriched_content": enriched,
-        })
-
-    # Generate summary embedding
-    summary_context = enricher.build_summary_context(resume)
-    summary_embedding = embedding_service.embed_document(summary_context)
+        }
+        for chunk, enriched, embedding in zip(chunks, texts, vectors)
+    ]
 
     return {
         "chunks": results,
-        "summary_embedding": summary_embedding,
+        "summary_embedding": vectors[-1],
     }
 
 
@@ -243,6 +560,8 @@ def _save_to_database(
     raw_text: str,
 ) -> str:
     """Save candidate and chunks to database."""
+    from sqlalchemy import insert
+
     from app.models.candidate import Candidate, Chunk
 
     db = SessionLocal()
@@ -261,32 +580,35 @@ def _save_to_database(
             raw_resume=resume.model_dump(mode='json'),
             summary_embedding=embeddings_data["summary_embedding"],
             total_experience_years=total_experience,
-            top_skills=resume.get_all_skills()[:20],
+            top_skills=resume.get_all_skills(limit=20),
             validation_warnings=resume.validation_warnings,
             source_filename=filename,
             raw_text=raw_text,
         )
 
         db.add(candidate)
-
-        # Create chunks
-        for item in embeddings_data["chunks"]:
-            chunk_obj = item["chunk"]
-
-            db_chunk = Chunk(
-                id=chunk_obj.id,
-                candidate_id=candidate_id,
-                parent_id=chunk_obj.parent_id,
-                section=chunk_obj.section.value,
-                subsection=chunk_obj.subsection,
-                content=chunk_obj.content,
-                enriched_content=item["enriched_content"],
-                embedding=item["embedding"],
-                chunk_metadata=chunk_obj.metadata,
-                order_index=chunk_obj.order_index,
-            )
-
-            db.add(db_chunk)
+        # Autoflush is off; the candidate row must exist before its chunks
+        db.flush()
+
+        # Create chunks in one executemany INSERT (batched into multi-row
+        # VALUES pages by SQLAlchemy) instead of one ORM object per row
+        chunk_rows = [
+            {
+                "id": item["chunk"].id,
+                "candidate_id": candidate_id,
+                "parent_id": item["chunk"].parent_id,
+                "section": item["chunk"].section.value,
+                "subsection": item["chunk"].subsection,
+                "content": item["chunk"].content,
+                "enriched_content": item["enriched_content"],
+                "embedding": item["embedding"],
+                "chunk_metadata": item["chunk"].metadata,
+                "order_index": item["chunk"].order_index,
+            }
+            for item in embeddings_data["chunks"]
+        ]
+        if chunk_rows:
+            db.execute(insert(Chunk), chunk_rows)
 
         db.commit()
         logger.info(f"Saved candidate {candidate_id} with {len(embeddings_data['chunks'])} chunks")
@@ -325,7 +647,8 @@ def _update_bm25_index(candidate_id: str, embeddings_data: dict) -> None:
         logger.info(f"Updated BM25 index with {len(chunk_ids)} chunks for candidate {candidate_id}")
         
     except Exception as e:
-        # Log error but don't fail the task - BM25 index can be rebuilt at startup
+        # Log error but don't fail the task - a snapshot that misses these
+        # chunks no longer matches the chunk count and is rebuilt at startup
         logger.error(f"Failed to update BM25 index for candidate {candidate_id}: {e}")
 
 
@@ -339,6 +662,8 @@ def generate_embeddings_task(
     
     Useful when switching embedding models.
     """
+    from sqlalchemy import update
+
     from app.models.candidate import Candidate, Chunk
     from app.services.embedding.embedder import get_embedding_service
 
@@ -357,15 +682,32 @@ def generate_embeddings_task(
         if candidate.summary:
             candidate.summary_embedding = embedding_service.embed_document(candidate.summary)
 
-        # Regenerate chunk embeddings
-        chunks = db.query(Chunk).filter(Chunk.candidate_id == candidate_id).all()
+        # Regenerate chunk embeddings in batches of 64 and write them back
+        # with one executemany UPDATE keyed by primary key
+        chunks = (
+            db.query(Chunk.id, Chunk.enriched_content, Chunk.content)
+            .filter(Chunk.candidate_id == candidate_id)
+            .all()
+        )
+
+        batch_size = 64
+        updates = []
+        for start in range(0, len(chunks), batch_size):
+            batch = chunks[start:start + batch_size]
+            embeddings = embedding_service.embed_documents(
+                [chunk.enriched_content or chunk.content for chunk in batch],
+                batch_size=batch_size,
+            )
+            updates.extend(
+                {"id": chunk.id, "embedding": embedding}
+                for chunk, embedding in zip(batch, embeddings)
+            )
 
-        for i, chunk in enumerate(chunks):
-            progress = 30 + int(70 * (i + 1) / len(chunks))
+            progress = 30 + int(70 * (start + len(batch)) / len(chunks))
             self.update_progress("embedding", progress)
 
-            text = chunk.enriched_content or chunk.content
-            chunk.embedding = embedding_service.embed_document(text)
+        if updates:
+            db.execute(update(Chunk), updates)
 
         db.commit()
 
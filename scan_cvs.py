@@ -1,10 +1,17 @@
 #!/usr/bin/env python3
 import requests
 import argparse
+import asyncio
+import glob
 import sys
 import json
 import os
 
+import httpx
+
+# Upload statuses worth retrying with backoff (rate limited / overloaded)
+RETRY_STATUSES = {429, 503}
+
 def scan_cvs(directory_path, api_url):
     """
     Trigger batch processing of CVs in a directory via API.
@@ -52,11 +59,79 @@ def scan_cvs(directory_path, api_url):
         print(f"\n❌ Unexpected Error: {e}")
         sys.exit(1)
 
+async def _upload_one(client, semaphore, url, pdf_path, max_retries=4):
+    """Upload one CV, retrying 429/503 responses with exponential backoff."""
+    filename = os.path.basename(pdf_path)
+    async with semaphore:
+        for attempt in range(max_retries):
+            try:
+                with open(pdf_path, "rb") as f:
+                    response = await client.post(
+                        url, files={"file": (filename, f, "application/pdf")}
+                    )
+                if response.status_code in RETRY_STATUSES and attempt < max_retries - 1:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                    continue
+                response.raise_for_status()
+                return filename, response.json().get("task_id"), None
+            except httpx.TransportError as e:
+                if attempt < max_retries - 1:
+                    await asyncio.sleep(0.5 * 2 ** attempt)
+                    continue
+                return filename, None, str(e)
+            except httpx.HTTPStatusError as e:
+                return filename, None, f"{e.response.status_code}: {e.response.text[:200]}"
+
+
+async def upload_cvs(directory_path, api_url, concurrency=8):
+    """
+    Upload the PDFs in a local directory concurrently.
+    
+    Use this when the API server cannot read the directory itself. All
+    uploads share one client, so connections are kept alive and reused
+    instead of reconnecting per file.
+    """
+    url = f"{api_url}/api/v1/cv/upload"
+    abs_path = os.path.abspath(directory_path)
+    pdf_files = sorted(glob.glob(os.path.join(abs_path, "*.pdf")))
+    print(f"Uploading {len(pdf_files)} PDFs from: {abs_path}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    try:
+        async with httpx.AsyncClient(timeout=120.0, limits=limits) as client:
+            results = await asyncio.gather(
+                *(_upload_one(client, semaphore, url, path) for path in pdf_files)
+            )
+    except Exception as e:
+        print(f"\n❌ Unexpected Error: {e}")
+        sys.exit(1)
+
+    errors = [(name, err) for name, _, err in results if err]
+    print("\n✅ Upload Finished!")
+    print(f"----------------------------------------")
+    print(f"PDFs Found: {len(pdf_files)}")
+    print(f"Tasks Triggered: {len(pdf_files) - len(errors)}")
+
+    if errors:
+        print(f"\n⚠️ Errors ({len(errors)}):")
+        for name, err in errors:
+            print(f"  - {name}: {err}")
+
+    print("\nMonitor logs using: celery -A app.core.celery_app worker -l info")
+
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Batch scan and process CVs from a directory")
     parser.add_argument("directory", help="Path to the directory containing PDF CVs")
     parser.add_argument("--url", default="http://localhost:8000", help="API Base URL (default: http://localhost:8000)")
+    parser.add_argument("--upload", action="store_true", help="Upload the files instead of asking the server to read the directory")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent uploads with --upload (default: 8)")
     
     args = parser.parse_args()
     
-    scan_cvs(args.directory, args.url)
+    if args.upload:
+        asyncio.run(upload_cvs(args.directory, args.url, args.concurrency))
+    else:
+        scan_cvs(args.directory, args.url)
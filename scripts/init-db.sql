@@ -1,6 +1,9 @@
 -- Enable pgvector extension
 CREATE EXTENSION IF NOT EXISTS vector;
 
+-- Trigram matching for candidate name lookups
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create candidates table
 CREATE TABLE IF NOT EXISTS candidates (
     id VARCHAR(36) PRIMARY KEY,
@@ -27,7 +30,9 @@ CREATE TABLE IF NOT EXISTS chunks (
     subsection VARCHAR(255),
     content TEXT,
     enriched_content TEXT,
-    embedding vector(1024),
+    -- Half precision (pgvector >= 0.7): half the storage and index size of
+    -- vector(1024); candidate-level summary_embedding stays full precision
+    embedding halfvec(1024),
     chunk_metadata JSONB DEFAULT '{}',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
@@ -35,6 +40,9 @@ CREATE TABLE IF NOT EXISTS chunks (
 -- Create indexes
 CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates(email);
 CREATE INDEX IF NOT EXISTS idx_candidates_name ON candidates(full_name);
+-- Serves substring (LIKE '%...%') and similarity (%) searches on names
+CREATE INDEX IF NOT EXISTS idx_candidates_name_trgm 
+    ON candidates USING gin (lower(full_name) gin_trgm_ops);
 CREATE INDEX IF NOT EXISTS idx_chunks_candidate ON chunks(candidate_id);
 CREATE INDEX IF NOT EXISTS idx_chunks_section ON chunks(section);
 
@@ -43,7 +51,7 @@ CREATE INDEX IF NOT EXISTS idx_candidates_summary_embedding
     ON candidates USING ivfflat (summary_embedding vector_cosine_ops) WITH (lists = 100);
 
 CREATE INDEX IF NOT EXISTS idx_chunks_embedding 
-    ON chunks USING ivfflat (embedding vector_cosine_ops) WITH (lists = 100);
+    ON chunks USING ivfflat (embedding halfvec_cosine_ops) WITH (lists = 100);
 
 -- Create function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_updated_at_column()
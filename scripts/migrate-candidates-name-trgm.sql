@@ -0,0 +1,8 @@
+-- Add a trigram index for candidate name lookups.
+-- For databases created before init-db.sql added idx_candidates_name_trgm.
+-- CONCURRENTLY keeps the table writable; it cannot run inside a transaction.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_candidates_name_trgm 
+    ON candidates USING gin (lower(full_name) gin_trgm_ops);
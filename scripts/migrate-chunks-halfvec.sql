@@ -0,0 +1,15 @@
+-- Convert chunk embeddings from vector(1024) to halfvec(1024).
+-- For databases created before init-db.sql switched to halfvec.
+-- Requires pgvector >= 0.7.
+
+BEGIN;
+
+DROP INDEX IF EXISTS idx_chunks_embedding;
+
+ALTER TABLE chunks
+    ALTER COLUMN embedding TYPE halfvec(1024) USING embedding::halfvec(1024);
+
+CREATE INDEX idx_chunks_embedding 
+    ON chunks USING ivfflat (embedding halfvec_cosine_ops) WITH (lists = 100);
+
+COMMIT;
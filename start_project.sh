@@ -37,7 +37,7 @@ sleep 5
 
 # 4. Start Celery Worker (REQUIRED for CV processing)
 echo -e "${GREEN}Starting Celery Worker...${NC}"
-celery -A app.core.celery_app worker -l info -c 1 &
+celery -A app.core.celery_app worker -l info -Q celery,cv_processing,ocr,llm,embeddings -c 1 &
 CELERY_PID=$!
 echo -e "${GREEN}✓ Celery worker started (PID: $CELERY_PID)${NC}"
 
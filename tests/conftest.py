@@ -0,0 +1,87 @@
+"""
+Shared test fixtures.
+
+Provides a lightweight fake Groq client so LLM-backed services can be
+tested without MagicMock scaffolding or network calls, and resets the
+pooled Groq clients between tests.
+"""
+
+import inspect
+from dataclasses import dataclass, field
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Union
+
+import pytest
+
+
+@dataclass
+class FakeCompletion:
+    """Chat completion response carrying a single message."""
+
+    content: str
+    choices: List[SimpleNamespace] = field(init=False)
+
+    def __post_init__(self):
+        self.choices = [SimpleNamespace(message=SimpleNamespace(content=self.content))]
+
+
+# A reply is the message content, an exception to raise, or a callable
+# taking the request kwargs and returning either (a coroutine function for
+# the async client)
+Reply = Union[str, BaseException, Callable[..., Any]]
+
+
+class FakeCompletions:
+    """chat.completions of the fake client; records every request."""
+
+    def __init__(self, reply: Reply):
+        self.reply = reply
+        self.calls: List[Dict[str, Any]] = []
+
+    def _answer(self, reply: Union[str, BaseException]) -> FakeCompletion:
+        if isinstance(reply, BaseException):
+            raise reply
+        return FakeCompletion(reply)
+
+    def create(self, **kwargs) -> FakeCompletion:
+        self.calls.append(kwargs)
+        reply = self.reply(**kwargs) if callable(self.reply) else self.reply
+        return self._answer(reply)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    """Awaitable chat.completions for the async client."""
+
+    async def create(self, **kwargs) -> FakeCompletion:
+        self.calls.append(kwargs)
+        reply = self.reply(**kwargs) if callable(self.reply) else self.reply
+        if inspect.isawaitable(reply):
+            reply = await reply
+        return self._answer(reply)
+
+
+class FakeGroqClient:
+    """Stand-in for groq.Groq / groq.AsyncGroq with canned completions."""
+
+    def __init__(self, reply: Reply, asynchronous: bool = False):
+        completions_cls = FakeAsyncCompletions if asynchronous else FakeCompletions
+        self.completions = completions_cls(reply)
+        self.chat = SimpleNamespace(completions=self.completions)
+
+
+@pytest.fixture
+def fake_groq():
+    """Factory for fake Groq clients: fake_groq(reply, asynchronous=False)."""
+    return FakeGroqClient
+
+
+@pytest.fixture(autouse=True)
+def reset_groq_client_pool():
+    """Drop pooled Groq clients so each test builds its own (patched) client."""
+    from app.services.chat import query_transformer
+
+    query_transformer._clients.clear()
+    query_transformer._async_clients.clear()
+    yield
+    query_transformer._clients.clear()
+    query_transformer._async_clients.clear()
@@ -0,0 +1,104 @@
+"""
+Tests for the Redis cache service.
+"""
+
+import numpy as np
+import pytest
+
+from app.services.utils.cache import RedisCache
+
+
+class FakeRedis:
+    """In-memory stand-in for the raw Redis client used by the vector index."""
+
+    def __init__(self):
+        self.strings = {}
+        self.hashes = {}
+        self.hgetall_calls = 0
+
+    async def get(self, key):
+        return self.strings.get(key)
+
+    async def hgetall(self, key):
+        self.hgetall_calls += 1
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        async def add_embedding(keys, args):
+            index_key, version_key = keys
+            member, vector, max_entries, _, token = args
+            index = self.hashes.setdefault(index_key, {})
+            if len(index) >= max_entries:
+                index.clear()
+            index[member.encode()] = vector
+            self.strings[version_key] = token.encode()
+            return 1
+
+        return add_embedding
+
+
+class FakePipeline:
+    """Queues commands and runs them against FakeRedis on execute()."""
+
+    def __init__(self, redis):
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def get(self, key):
+        self.commands.append(self.redis.get(key))
+
+    def hgetall(self, key):
+        self.commands.append(self.redis.hgetall(key))
+
+    async def execute(self):
+        return [await command for command in self.commands]
+
+
+class TestEmbeddingIndex:
+    """Tests for the per-prefix semantic vector index."""
+
+    @pytest.fixture
+    def redis(self):
+        return FakeRedis()
+
+    @pytest.fixture
+    def cache(self, redis):
+        cache = RedisCache(redis_url="redis://unused")
+        cache._raw_redis = redis
+        return cache
+
+    @pytest.mark.asyncio
+    async def test_matrix_reused_until_index_changes(self, cache, redis):
+        """Test the index is only re-read from Redis after a write."""
+        await cache.add_embedding("qexp", "python dev", np.array([3.0, 4.0]))
+
+        members, matrix = await cache.get_embeddings("qexp")
+        assert members == ["python dev"]
+        np.testing.assert_allclose(matrix, [[0.6, 0.8]], atol=1e-3)
+
+        await cache.get_embeddings("qexp")
+        assert redis.hgetall_calls == 1
+
+        await cache.add_embedding("qexp", "data engineer", np.array([1.0, 0.0]))
+        members, matrix = await cache.get_embeddings("qexp")
+        assert members == ["python dev", "data engineer"]
+        assert matrix.shape == (2, 2)
+        assert redis.hgetall_calls == 2
+
+    @pytest.mark.asyncio
+    async def test_full_index_is_reset_on_write(self, cache):
+        """Test the index starts over once it reaches max_entries."""
+        for i in range(3):
+            await cache.add_embedding("qexp", f"query {i}", np.ones(2), max_entries=2)
+
+        members, _ = await cache.get_embeddings("qexp")
+        assert members == ["query 2"]
@@ -4,6 +4,7 @@ Tests for Chat ConversationMemory.
 Tests the Redis-backed sliding window memory implementation.
 """
 
+import json
 import pytest
 import asyncio
 from datetime import datetime
@@ -18,44 +19,78 @@ class MockRedis:
     
     def __init__(self):
         self.data = {}
+        self.ttls = {}
     
-    async def rpush(self, key: str, value: str) -> int:
-        if key not in self.data:
-            self.data[key] = []
-        self.data[key].append(value)
-        return len(self.data[key])
-    
-    async def lrange(self, key: str, start: int, end: int) -> list:
-        if key not in self.data:
-            return []
-        if end == -1:
-            return self.data[key][start:]
-        return self.data[key][start:end + 1]
-    
-    async def ltrim(self, key: str, start: int, end: int) -> None:
-        if key in self.data:
-            if end == -1:
-                self.data[key] = self.data[key][start:]
-            else:
-                self.data[key] = self.data[key][start:end + 1]
-    
-    async def expire(self, key: str, seconds: int) -> None:
-        pass  # Mock implementation
-    
-    async def delete(self, key: str) -> int:
-        if key in self.data:
-            del self.data[key]
-            return 1
-        return 0
-    
-    async def llen(self, key: str) -> int:
-        return len(self.data.get(key, []))
+    async def get(self, key: str):
+        return self.data.get(key)
+    
+    async def set(self, key: str, value: bytes, ex: int = None) -> bool:
+        self.data[key] = value
+        if ex is not None:
+            self.ttls[key] = ex
+        return True
+    
+    async def delete(self, *keys: str) -> int:
+        deleted = 0
+        for key in keys:
+            self.ttls.pop(key, None)
+            if key in self.data:
+                del self.data[key]
+                deleted += 1
+        return deleted
     
     async def ttl(self, key: str) -> int:
-        return 3600 if key in self.data else -2
+        return self.ttls.get(key, -1) if key in self.data else -2
     
     async def close(self) -> None:
         pass
+    
+    def pipeline(self, transaction: bool = True) -> "MockPipeline":
+        return MockPipeline(self)
+
+
+class MockPipeline:
+    """
+    Mock Redis pipeline.
+    
+    Commands run immediately between watch() and multi(), and are buffered
+    until execute() otherwise, like redis-py.
+    """
+    
+    def __init__(self, redis: MockRedis):
+        self.redis = redis
+        self.commands = []
+        self.watching = False
+    
+    async def __aenter__(self) -> "MockPipeline":
+        return self
+    
+    async def __aexit__(self, *exc) -> None:
+        self.commands = []
+        self.watching = False
+    
+    async def watch(self, *keys: str) -> None:
+        self.watching = True
+    
+    def multi(self) -> None:
+        self.watching = False
+    
+    def __getattr__(self, name: str):
+        command = getattr(self.redis, name)
+        if self.watching:
+            return command
+        
+        def buffer(*args, **kwargs):
+            self.commands.append((command, args, kwargs))
+            return self
+        return buffer
+    
+    async def execute(self) -> list:
+        results = []
+        for command, args, kwargs in self.commands:
+            results.append(await command(*args, **kwargs))
+        self.commands = []
+        return results
 
 
 @pytest.fixture
@@ -115,6 +150,71 @@ class TestConversationMemory:
         assert len(message.candidates) == 1
         assert message.candidates[0].full_name == "Nguyen Van A"
     
+    @pytest.mark.asyncio
+    async def test_binary_payload_roundtrip(self, memory, mock_redis):
+        """Test messages are stored as bytes and Unicode names decode intact."""
+        session_id = "test-session-binary"
+        
+        candidates = [
+            CandidateCard(
+                candidate_id="cand-1",
+                full_name="Nguyễn Văn An",
+                headline="Kỹ sư phần mềm",
+                top_skills=["Python", "Xử lý ngôn ngữ tự nhiên"],
+                match_score=0.87,
+            )
+        ]
+        await memory.add_message(
+            session_id, MessageRole.ASSISTANT, "Tìm thấy ứng viên", candidates=candidates
+        )
+        
+        stored = mock_redis.data[memory._get_key(session_id)]
+        assert isinstance(stored, bytes)
+        assert mock_redis.ttls[memory._get_key(session_id)] == 3600
+        
+        history = await memory.get_history(session_id)
+        assert history[0].content == "Tìm thấy ứng viên"
+        assert history[0].candidates[0].full_name == "Nguyễn Văn An"
+        assert history[0].candidates[0].top_skills[1] == "Xử lý ngôn ngữ tự nhiên"
+        assert history[0].candidates[0].match_score == 0.87
+    
+    @pytest.mark.asyncio
+    async def test_stored_form_interns_roles_and_skills(self, memory, mock_redis):
+        """Test roles become ints and repeated skills are stored once."""
+        import msgpack
+        
+        session_id = "test-session-interned"
+        cards = [
+            CandidateCard(candidate_id="c1", full_name="A", top_skills=["Python", "SQL"]),
+            CandidateCard(candidate_id="c2", full_name="B", top_skills=["Python", "Go"]),
+        ]
+        await memory.add_message(session_id, MessageRole.USER, "Python devs?")
+        await memory.add_message(session_id, MessageRole.ASSISTANT, "Found 2", candidates=cards)
+        
+        skills, items = msgpack.unpackb(mock_redis.data[memory._get_key(session_id)])
+        assert skills == ["Python", "SQL", "Go"]
+        assert [item["role"] for item in items] == [1, 2]
+        assert all(isinstance(item["timestamp"], int) for item in items)
+        assert items[1]["candidates"][1]["top_skills"] == [0, 2]
+        
+        history = await memory.get_history(session_id)
+        assert history[1].role == MessageRole.ASSISTANT
+        assert history[1].candidates[1].top_skills == ["Python", "Go"]
+        assert history[0].timestamp.tzinfo is None
+        assert abs((history[0].timestamp - datetime.utcnow()).total_seconds()) < 5
+    
+    @pytest.mark.asyncio
+    async def test_reads_json_fallback_payloads(self, memory, mock_redis):
+        """Test windows written by the JSON fallback codec still load."""
+        session_id = "test-session-json"
+        mock_redis.data[memory._get_key(session_id)] = json.dumps([
+            [],
+            [{"role": 1, "content": "Xin chào", "timestamp": "2024-01-01T00:00:00", "candidates": []}],
+        ]).encode()
+        
+        history = await memory.get_history(session_id)
+        assert history[0].content == "Xin chào"
+    
     @pytest.mark.asyncio
     async def test_get_history(self, memory):
         """Test retrieving conversation history."""
@@ -132,6 +232,25 @@ class TestConversationMemory:
         assert history[1].content == "Response 1"
         assert history[2].content == "Message 2"
     
+    @pytest.mark.asyncio
+    async def test_iter_history_decodes_incrementally(self, memory, mock_redis):
+        """Test messages are decoded one at a time and the limit skips the rest."""
+        session_id = "test-session-iter"
+        for i in range(4):
+            await memory.add_message(session_id, MessageRole.USER, f"Message {i}")
+        
+        key = memory._get_key(session_id)
+        assert [m.content async for m in memory.iter_history(session_id, limit=2)] == [
+            "Message 2",
+            "Message 3",
+        ]
+        
+        # A window cut off mid-way still yields the messages before the cut
+        mock_redis.data[key] = mock_redis.data[key][:-5]
+        stream = memory.iter_history(session_id)
+        assert (await stream.__anext__()).content == "Message 0"
+        assert [m.content async for m in stream] == ["Message 1", "Message 2"]
+    
     @pytest.mark.asyncio
     async def test_sliding_window(self, memory):
         """Test that sliding window keeps only last N messages."""
@@ -148,6 +267,34 @@ class TestConversationMemory:
         assert history[0].content == "Message 3"
         assert history[-1].content == "Message 7"
     
+    @pytest.mark.asyncio
+    async def test_concurrent_write_retries(self, memory, mock_redis):
+        """Test a write that loses the WATCH race is retried, not dropped."""
+        from redis.exceptions import WatchError
+        
+        session_id = "test-session-race"
+        execute = MockPipeline.execute
+        attempts = []
+        
+        async def flaky_execute(pipe):
+            attempts.append(1)
+            if len(attempts) == 1:
+                # Another writer lands between GET and EXEC
+                await mock_redis.set(
+                    memory._get_key(session_id),
+                    memory._serialize([ChatMessage(role=MessageRole.USER, content="Other")]),
+                )
+                pipe.commands = []
+                raise WatchError()
+            return await execute(pipe)
+        
+        with patch.object(MockPipeline, "execute", flaky_execute):
+            await memory.add_message(session_id, MessageRole.USER, "Mine")
+        
+        history = await memory.get_history(session_id)
+        assert len(attempts) == 2
+        assert [m.content for m in history] == ["Other", "Mine"]
+    
     @pytest.mark.asyncio
     async def test_clear_session(self, memory):
         """Test clearing a session."""
@@ -183,6 +330,27 @@ class TestConversationMemory:
         assert "Assistant: Found 3 candidates" in formatted
         assert "User: Tell me more about the first one" in formatted
     
+    @pytest.mark.asyncio
+    async def test_format_history_cached_until_next_write(self, memory, mock_redis):
+        """Test the formatted history is reused until the window changes."""
+        session_id = "test-session-format-cache"
+        
+        await memory.add_message(session_id, MessageRole.USER, "Find Go devs")
+        first = await memory.format_history_for_prompt(session_id)
+        
+        with patch.object(memory, "iter_history", MagicMock()) as iter_history:
+            assert await memory.format_history_for_prompt(session_id) == first
+            iter_history.assert_not_called()
+        
+        await memory.add_message(session_id, MessageRole.ASSISTANT, "Found 2 candidates")
+        assert await memory.format_history_for_prompt(session_id) == (
+            "User: Find Go devs\nAssistant: Found 2 candidates"
+        )
+        
+        await memory.clear_session(session_id)
+        assert await memory.format_history_for_prompt(session_id) == ""
+        assert mock_redis.data == {}
+    
     @pytest.mark.asyncio
     async def test_get_session_info(self, memory):
         """Test getting session metadata."""
@@ -196,3 +364,48 @@ class TestConversationMemory:
         assert info["session_id"] == session_id
         assert info["message_count"] == 2
         assert info["exists"] is True
+    
+    @pytest.mark.asyncio
+    async def test_session_info_counts_without_decoding(self, memory, mock_redis):
+        """Test message counts come from the stored header, not validated messages."""
+        for _ in range(3):
+            await memory.add_message("test-session-count", MessageRole.USER, "Hello")
+        mock_redis.data[memory._get_key("test-session-json-count")] = json.dumps([
+            [],
+            [{"role": 1, "content": "Xin chào", "timestamp": "2024-01-01T00:00:00", "candidates": []}],
+        ]).encode()
+        
+        with patch.object(ChatMessage, "model_validate", side_effect=AssertionError):
+            infos = await memory.get_sessions_info(["test-session-count", "test-session-json-count"])
+        
+        assert infos["test-session-count"]["message_count"] == 3
+        assert infos["test-session-json-count"]["message_count"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_get_sessions_info_single_round_trip(self, memory, mock_redis):
+        """Test many sessions are looked up with one pipeline execute."""
+        session_ids = [f"test-session-bulk-{i}" for i in range(50)]
+        for i, session_id in enumerate(session_ids[:25]):
+            for j in range(i % 3 + 1):
+                await memory.add_message(session_id, MessageRole.USER, f"Message {j}")
+        
+        execute = MockPipeline.execute
+        calls = []
+        
+        async def counting_execute(pipe):
+            calls.append(1)
+            return await execute(pipe)
+        
+        with patch.object(MockPipeline, "execute", counting_execute):
+            infos = await memory.get_sessions_info(session_ids)
+        
+        assert len(calls) == 1
+        assert list(infos) == session_ids
+        assert infos["test-session-bulk-4"]["message_count"] == 2
+        assert infos["test-session-bulk-4"]["ttl_seconds"] == 3600
+        assert infos["test-session-bulk-30"] == {
+            "session_id": "test-session-bulk-30",
+            "message_count": 0,
+            "ttl_seconds": None,
+            "exists": False,
+        }
@@ -2,11 +2,14 @@
 Tests for the Section-Aware Chunking System.
 """
 
+import unicodedata
+
 import pytest
 from app.services.parsing.chunker import (
     SectionAwareChunker,
     Chunk,
     SectionType,
+    get_chunker,
 )
 
 
@@ -155,6 +158,14 @@ Python, JavaScript, React, Node.js, PostgreSQL, Docker
         chunks = chunker.chunk_document("Hello")
         assert chunks == []
 
+    def test_shared_chunker(self, sample_cv_text):
+        """The singleton is reused and chunks like a fresh instance."""
+        assert get_chunker() is get_chunker()
+
+        shared = [(c.content, c.section) for c in get_chunker().chunk_document(sample_cv_text)]
+        fresh = [(c.content, c.section) for c in SectionAwareChunker().chunk_document(sample_cv_text)]
+        assert shared == fresh
+
     def test_chunks_preserve_order(self, chunker, sample_cv_text):
         """Test that chunks maintain document order."""
         chunks = chunker.chunk_document(sample_cv_text)
@@ -195,8 +206,18 @@ class TestChunkDataclass:
         assert chunk.content == "Test content"
         assert chunk.section == SectionType.EXPERIENCE
         assert chunk.id is not None
+        assert len(chunk.id) <= 36  # chunks.id is VARCHAR(36)
+        assert chunk.id != Chunk(content="", section=SectionType.OTHER).id
         assert chunk.is_parent is True
 
+    def test_chunk_uses_slots(self):
+        """Chunks carry no per-instance __dict__."""
+        chunk = Chunk(content="Test content", section=SectionType.SKILLS)
+
+        assert not hasattr(chunk, "__dict__")
+        with pytest.raises(AttributeError):
+            chunk.embedding = [0.0]
+
     def test_chunk_with_parent(self):
         """Test child chunk creation."""
         parent = Chunk(
@@ -246,6 +267,8 @@ class TestSectionDetection:
         ("Học vấn", SectionType.EDUCATION),
         ("SKILLS", SectionType.SKILLS),
         ("Kỹ năng", SectionType.SKILLS),
+        (unicodedata.normalize("NFD", "KINH NGHIỆM"), SectionType.EXPERIENCE),
+        ("HỌC VẤN", SectionType.EDUCATION),
         ("PROJECTS", SectionType.PROJECTS),
         ("Dự án", SectionType.PROJECTS),
         ("CERTIFICATIONS", SectionType.CERTIFICATIONS),
@@ -255,3 +278,47 @@ class TestSectionDetection:
         """Test various section header patterns."""
         result = chunker._detect_section_header(header)
         assert result == expected
+
+    def test_detect_sections_single_pass(self, chunker):
+        """Test whole-document detection handles NFD text and long lines."""
+        text = unicodedata.normalize("NFD", "\n".join([
+            "Nguyễn Văn An",
+            "KINH NGHIỆM LÀM VIỆC",
+            "Backend developer tại FPT",
+            "Experience " + "x" * 120,
+            "  Kỹ năng  ",
+            "Python, Go",
+        ]))
+
+        sections = chunker._detect_sections(text)
+
+        assert [s[0] for s in sections] == [
+            SectionType.OTHER,
+            SectionType.EXPERIENCE,
+            SectionType.SKILLS,
+        ]
+        assert sections[1][1].endswith("x" * 120)
+        assert sections[2][1] == "Kỹ năng  \nPython, Go"
+
+    def test_uppercase_vietnamese_header_in_document(self, chunker):
+        """Non-ASCII headers are matched case-insensitively in the document scan."""
+        sections = chunker._detect_sections("Trần Thị Bình\nHỌC VẤN\nĐại học Bách Khoa")
+
+        assert sections[1] == (SectionType.EDUCATION, "HỌC VẤN\nĐại học Bách Khoa")
+
+    @pytest.mark.parametrize("text,expected", [
+        (
+            "Nguyễn Văn An\nEmployment\n   Education\nBSc Computer Science",
+            [SectionType.OTHER, SectionType.EXPERIENCE, SectionType.EDUCATION],
+        ),
+        (
+            "Nguyễn Văn An\nabout\n  Experience\nBackend developer",
+            [SectionType.OTHER, SectionType.SUMMARY, SectionType.EXPERIENCE],
+        ),
+        ("Nguyễn Văn An\nkinh\nnghiệm\nBackend developer", [SectionType.OTHER]),
+    ])
+    def test_header_match_stays_on_its_line(self, chunker, text, expected):
+        """A header never swallows the newline or indentation of the next line."""
+        sections = chunker._detect_sections(text)
+
+        assert [s[0] for s in sections] == expected
@@ -0,0 +1,41 @@
+"""
+Tests for database engine setup.
+"""
+
+import pytest
+from sqlalchemy import create_engine, event, text
+
+from app.core import database
+
+
+class TestVectorTypeRegistration:
+    """Tests for the pgvector connect hook."""
+
+    @pytest.fixture
+    def engine(self):
+        engine = create_engine("sqlite://")
+        event.listen(engine, "connect", database._register_vector_type)
+        yield engine
+        engine.dispose()
+
+    def test_engine_usable_after_registration_fails(self, engine, monkeypatch):
+        """A failed registration leaves no open transaction on the connection."""
+        def failing_register(dbapi_connection):
+            # psycopg2 opens a transaction implicitly before the type lookup
+            dbapi_connection.execute("BEGIN")
+            dbapi_connection.execute("SELECT NULL::vector")
+
+        monkeypatch.setattr(database, "register_vector", failing_register)
+
+        in_transaction = []
+        event.listen(
+            engine, "connect",
+            lambda dbapi_connection, record: in_transaction.append(
+                dbapi_connection.in_transaction
+            ),
+        )
+
+        with engine.connect() as conn:
+            assert conn.execute(text("SELECT 1")).scalar() == 1
+
+        assert in_transaction == [False]
@@ -2,12 +2,18 @@
 Tests for the Experience Calculation (Merge Intervals Algorithm).
 """
 
+import random
 import pytest
 from datetime import date
 
+import numpy as np
+
+from app.services.utils import experience
 from app.services.utils.experience import (
     calculate_total_experience,
+    calculate_total_experience_batch,
     merge_intervals,
+    merge_intervals_batch,
     TimeInterval,
     get_experience_gaps,
 )
@@ -113,6 +119,47 @@ class TestMergeIntervals:
         assert merged[0].start == date(2020, 1, 1)
 
 
+    def test_today_resolved_once(self, monkeypatch):
+        """Many ongoing positions resolve date.today() a single time."""
+        calls = []
+
+        class CountingDate(date):
+            @classmethod
+            def today(cls):
+                calls.append(1)
+                return date(2024, 6, 1)
+
+        monkeypatch.setattr(experience, "date", CountingDate)
+        intervals = [(date(2015 + i, 1, 1), None) for i in range(10)]
+
+        merged = merge_intervals(intervals)
+        assert len(calls) == 1
+        assert merged == [TimeInterval(start=date(2015, 1, 1), end=date(2024, 6, 1))]
+
+        calculate_total_experience(intervals)
+        assert len(calls) == 2
+
+    @pytest.mark.parametrize("n", [1000, 3000])
+    def test_vectorized_path_matches_scalar(self, n, monkeypatch):
+        """Long histories take the NumPy path and merge the same way."""
+        rng = random.Random(n)
+        intervals = []
+        for _ in range(n):
+            start = date.fromordinal(rng.randint(730000, 739000))
+            end = None if rng.random() < 0.05 else date.fromordinal(
+                start.toordinal() + rng.randint(-30, 400)  # Some invalid
+            )
+            intervals.append((start, end))
+        intervals.append((None, date(2020, 1, 1)))
+
+        fast = merge_intervals(intervals)
+        monkeypatch.setattr(experience, "_VECTORIZE_MIN_INTERVALS", n + 2)
+        slow = merge_intervals(intervals)
+
+        assert fast == slow
+        assert [iv.days for iv in fast] == [iv.days for iv in slow]
+
+
 class TestCalculateTotalExperience:
     """Tests for calculate_total_experience function."""
 
@@ -231,3 +278,49 @@ class TestTimeInterval:
 
         assert merged.start == date(2018, 1, 1)
         assert merged.end == date(2022, 12, 31)
+
+    def test_day_ordinals(self):
+        """Ordinals back durations and comparisons but not equality."""
+        interval = TimeInterval(date(2020, 1, 1), date(2020, 3, 1))
+
+        assert interval.start_day == date(2020, 1, 1).toordinal()
+        assert interval.end_day - interval.start_day == interval.days == 60
+        assert interval == TimeInterval(date(2020, 1, 1), date(2020, 3, 1))
+        assert "start_day" not in repr(interval)
+
+
+class TestBatchExperience:
+    """Tests for the batched merge over many work histories."""
+
+    def test_matches_single_calculation(self):
+        """Batch totals should equal per-history totals."""
+        histories = [
+            [
+                (date(2018, 1, 1), date(2020, 12, 31)),
+                (date(2019, 6, 1), date(2021, 6, 30)),
+                (date(2022, 1, 1), date(2023, 1, 1)),
+            ],
+            [],
+            [
+                (date(2015, 1, 1), date(2016, 1, 1)),
+                (date(2015, 3, 1), date(2015, 6, 1)),  # Fully contained
+                (date(2016, 1, 1), date(2017, 1, 1)),  # Adjacent
+            ],
+            [(date(2020, 1, 1), date(2019, 1, 1))],  # Invalid order
+        ]
+
+        assert calculate_total_experience_batch(histories) == [
+            calculate_total_experience(h) for h in histories
+        ]
+
+    def test_merged_spans(self):
+        """Overlaps merge within an owner but never across owners."""
+        owners, starts, ends = merge_intervals_batch(
+            np.array([10, 0, 5, 0]),
+            np.array([20, 6, 8, 3]),
+            np.array([1, 1, 1, 2]),
+        )
+
+        assert owners.tolist() == [1, 1, 2]
+        assert starts.tolist() == [0, 10, 0]
+        assert ends.tolist() == [8, 20, 3]
@@ -5,7 +5,9 @@ Tests the LLM-powered query transformation.
 """
 
 import pytest
-from unittest.mock import MagicMock, patch
+import asyncio
+import json
+from unittest.mock import patch
 
 from app.schemas.chat import TransformedQuery, ChatMessage, MessageRole
 from app.services.chat.query_transformer import QueryTransformer
@@ -14,22 +16,15 @@ from app.services.chat.query_transformer import QueryTransformer
 class TestQueryTransformer:
     """Tests for QueryTransformer class."""
     
-    def test_transform_search_query(self):
+    def test_transform_search_query(self, fake_groq):
         """Test transforming a search query."""
         with patch('app.services.chat.query_transformer.Groq') as MockGroq:
-            # Mock the Groq client response
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = '''{
+            MockGroq.return_value = fake_groq('''{
                 "search_query": "Python Developer Backend",
                 "filters": {"location": "Hanoi", "min_experience_years": 3},
                 "is_search_needed": true,
                 "intent": "search"
-            }'''
-            
-            mock_client = MagicMock()
-            mock_client.chat.completions.create.return_value = mock_response
-            MockGroq.return_value = mock_client
+            }''')
             
             transformer = QueryTransformer(api_key="test-key")
             result = transformer.transform("Tìm dev Python ở HN có 3 năm kinh nghiệm")
@@ -40,21 +35,15 @@ class TestQueryTransformer:
             assert result.is_search_needed is True
             assert result.intent == "search"
     
-    def test_transform_chat_query(self):
+    def test_transform_chat_query(self, fake_groq):
         """Test transforming a simple chat message (no search needed)."""
         with patch('app.services.chat.query_transformer.Groq') as MockGroq:
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = '''{
+            MockGroq.return_value = fake_groq('''{
                 "search_query": "",
                 "filters": {},
                 "is_search_needed": false,
                 "intent": "chat"
-            }'''
-            
-            mock_client = MagicMock()
-            mock_client.chat.completions.create.return_value = mock_response
-            MockGroq.return_value = mock_client
+            }''')
             
             transformer = QueryTransformer(api_key="test-key")
             result = transformer.transform("Xin chào")
@@ -63,21 +52,15 @@ class TestQueryTransformer:
             assert result.is_search_needed is False
             assert result.intent == "chat"
     
-    def test_transform_summarize_intent(self):
+    def test_transform_summarize_intent(self, fake_groq):
         """Test transforming a summarize request."""
         with patch('app.services.chat.query_transformer.Groq') as MockGroq:
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = '''{
+            MockGroq.return_value = fake_groq('''{
                 "search_query": "Nguyễn Văn A",
                 "filters": {},
                 "is_search_needed": true,
                 "intent": "summarize"
-            }'''
-            
-            mock_client = MagicMock()
-            mock_client.chat.completions.create.return_value = mock_response
-            MockGroq.return_value = mock_client
+            }''')
             
             transformer = QueryTransformer(api_key="test-key")
             result = transformer.transform("Tóm tắt hồ sơ của ứng viên Nguyễn Văn A")
@@ -86,21 +69,16 @@ class TestQueryTransformer:
             assert result.is_search_needed is True
             assert result.intent == "summarize"
     
-    def test_transform_with_history(self):
+    def test_transform_with_history(self, fake_groq):
         """Test query transformation with conversation history."""
         with patch('app.services.chat.query_transformer.Groq') as MockGroq:
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = '''{
+            client = fake_groq('''{
                 "search_query": "Java Developer Senior",
                 "filters": {"min_experience_years": 5},
                 "is_search_needed": true,
                 "intent": "search"
-            }'''
-            
-            mock_client = MagicMock()
-            mock_client.chat.completions.create.return_value = mock_response
-            MockGroq.return_value = mock_client
+            }''')
+            MockGroq.return_value = client
             
             history = [
                 ChatMessage(role=MessageRole.USER, content="Tìm dev Java"),
@@ -111,19 +89,13 @@ class TestQueryTransformer:
             result = transformer.transform("Lọc những người có 5 năm trở lên", history)
             
             # Check that the API was called
-            assert mock_client.chat.completions.create.called
+            assert client.completions.calls
             assert result.is_search_needed is True
     
-    def test_transform_fallback_on_json_error(self):
+    def test_transform_fallback_on_json_error(self, fake_groq):
         """Test fallback behavior when JSON parsing fails."""
         with patch('app.services.chat.query_transformer.Groq') as MockGroq:
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = "Invalid JSON response"
-            
-            mock_client = MagicMock()
-            mock_client.chat.completions.create.return_value = mock_response
-            MockGroq.return_value = mock_client
+            MockGroq.return_value = fake_groq("Invalid JSON response")
             
             transformer = QueryTransformer(api_key="test-key")
             result = transformer.transform("Find Python developers")
@@ -133,12 +105,10 @@ class TestQueryTransformer:
             assert result.is_search_needed is True
             assert result.intent == "search"
     
-    def test_transform_fallback_on_api_error(self):
+    def test_transform_fallback_on_api_error(self, fake_groq):
         """Test fallback behavior when API call fails."""
         with patch('app.services.chat.query_transformer.Groq') as MockGroq:
-            mock_client = MagicMock()
-            mock_client.chat.completions.create.side_effect = Exception("API Error")
-            MockGroq.return_value = mock_client
+            MockGroq.return_value = fake_groq(Exception("API Error"))
             
             transformer = QueryTransformer(api_key="test-key")
             result = transformer.transform("Find Java developers")
@@ -147,26 +117,172 @@ class TestQueryTransformer:
             assert result.search_query == "Find Java developers"
             assert result.is_search_needed is True
     
-    def test_transform_handles_markdown_code_blocks(self):
+    def test_transform_handles_markdown_code_blocks(self, fake_groq):
         """Test parsing JSON wrapped in markdown code blocks."""
         with patch('app.services.chat.query_transformer.Groq') as MockGroq:
-            mock_response = MagicMock()
-            mock_response.choices = [MagicMock()]
-            mock_response.choices[0].message.content = '''```json
+            MockGroq.return_value = fake_groq('''```json
 {
     "search_query": "React Developer",
     "filters": {},
     "is_search_needed": true,
     "intent": "search"
 }
-```'''
-            
-            mock_client = MagicMock()
-            mock_client.chat.completions.create.return_value = mock_response
-            MockGroq.return_value = mock_client
+```''')
             
             transformer = QueryTransformer(api_key="test-key")
             result = transformer.transform("Find React developers")
             
             assert result.search_query == "React Developer"
             assert result.is_search_needed is True
+    
+    @pytest.mark.asyncio
+    async def test_transform_async_uses_async_client(self, fake_groq):
+        """Test the async path awaits AsyncGroq and parses the response."""
+        with patch('app.services.chat.query_transformer.AsyncGroq') as MockAsyncGroq:
+            client = fake_groq('''{
+                "semantic_query": "Python backend developer in Hanoi",
+                "keyword_string": "Python Django FastAPI",
+                "filters": {
+                    "min_experience": {"value": 3, "required": true},
+                    "location": {"value": "Hanoi", "required": false},
+                    "skills": ["Python", {"name": "Django"}]
+                },
+                "is_search_needed": true,
+                "intent": "search"
+            }''', asynchronous=True)
+            MockAsyncGroq.return_value = client
+            
+            transformer = QueryTransformer(api_key="test-key")
+            result = await transformer.transform_async("Tìm dev Python ở HN có 3 năm kinh nghiệm")
+            
+            assert len(client.completions.calls) == 1
+            assert result.semantic_query == "Python backend developer in Hanoi"
+            assert result.keyword_string == "Python Django FastAPI"
+            assert result.filters == {
+                "location": "Hanoi",
+                "min_experience_years": 3.0,
+                "required_skills": ["Python", "Django"],
+            }
+    
+    @pytest.mark.asyncio
+    async def test_transform_batch_concurrent_and_ordered(self, fake_groq):
+        """Test batch transformation runs concurrently, bounded, in input order."""
+        in_flight = 0
+        peak = 0
+        
+        async def create(**kwargs):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            prompt = kwargs["messages"][1]["content"]
+            if "broken" in prompt:
+                raise Exception("API Error")
+            query = prompt.split('User Input: "')[1].split('"')[0]
+            return f'{{"semantic_query": "{query} expanded", "is_search_needed": true}}'
+        
+        with patch('app.services.chat.query_transformer.AsyncGroq') as MockAsyncGroq:
+            MockAsyncGroq.return_value = fake_groq(create, asynchronous=True)
+            
+            transformer = QueryTransformer(api_key="test-key", max_concurrency=2)
+            messages = ["Python dev", "Java dev", "broken", "Go dev", "Rust dev"]
+            results = await transformer.transform_batch(messages)
+            
+            assert [r.semantic_query for r in results] == [
+                "Python dev expanded", "Java dev expanded", "broken",
+                "Go dev expanded", "Rust dev expanded",
+            ]
+            assert peak == 2
+    
+    def test_transform_caches_parsed_results(self, fake_groq):
+        """Test repeated queries reuse the parsed result; fallbacks are not cached."""
+        with patch('app.services.chat.query_transformer.Groq') as MockGroq:
+            client = fake_groq('{"semantic_query": "Python developer"}')
+            MockGroq.return_value = client
+            
+            transformer = QueryTransformer(api_key="test-key")
+            history = [ChatMessage(role=MessageRole.USER, content="Tìm dev")]
+            
+            first = transformer.transform("Find Python developers", history)
+            assert transformer.transform("Find Python developers", list(history)) is first
+            assert len(client.completions.calls) == 1
+            
+            # Different history is a different prompt
+            transformer.transform("Find Python developers")
+            assert len(client.completions.calls) == 2
+            
+            transformer.clear_cache()
+            transformer.transform("Find Python developers", history)
+            assert len(client.completions.calls) == 3
+            
+            # Unparseable responses fall back and are retried next time
+            client.completions.reply = "Invalid JSON response"
+            transformer.transform("Find Java developers")
+            transformer.transform("Find Java developers")
+            assert len(client.completions.calls) == 5
+    
+    @pytest.mark.asyncio
+    async def test_batching_coalesces_identical_requests(self, fake_groq):
+        """Test batched requests in one window share calls and keep their own results."""
+        async def create(**kwargs):
+            await asyncio.sleep(0.01)
+            query = kwargs["messages"][1]["content"].split('User Input: "')[1].split('"')[0]
+            return f'{{"semantic_query": "{query} expanded"}}'
+        
+        with patch('app.services.chat.query_transformer.AsyncGroq') as MockAsyncGroq:
+            client = fake_groq(create, asynchronous=True)
+            MockAsyncGroq.return_value = client
+            
+            transformer = QueryTransformer(api_key="test-key", batching=True, batch_window_ms=5)
+            results = await asyncio.gather(
+                transformer.transform_async("Python dev"),
+                transformer.transform_async("Java dev"),
+                transformer.transform_async("Python dev"),
+            )
+            
+            assert [r.semantic_query for r in results] == [
+                "Python dev expanded", "Java dev expanded", "Python dev expanded",
+            ]
+            assert len(client.completions.calls) == 2
+            
+            # Later requests start a new window; cached ones skip the scheduler
+            result = await transformer.transform_async("Go dev")
+            assert result.semantic_query == "Go dev expanded"
+            assert await transformer.transform_async("Java dev") is results[1]
+            assert len(client.completions.calls) == 3
+    
+    def test_parse_response_extracts_fenced_json(self):
+        """Test the response parser pulls the JSON object out of fences and prose."""
+        transformer = QueryTransformer(api_key="test-key")
+        
+        result = transformer._parse_response(
+            "Tìm kỹ sư dữ liệu",
+            'Here is the result:\n```json\n{"semantic_query": "Kỹ sư dữ liệu", '
+            '"keyword_string": "data engineer", "intent": "search"}\n```',
+        )
+        assert result.semantic_query == "Kỹ sư dữ liệu"
+        assert result.keyword_string == "data engineer"
+        
+        with pytest.raises(json.JSONDecodeError):
+            transformer._parse_response("Xin chào", "Invalid JSON response")
+    
+    @pytest.mark.asyncio
+    async def test_clients_shared_per_api_key(self):
+        """Test transformers with the same API key share pooled Groq clients."""
+        with patch('app.services.chat.query_transformer.Groq') as MockGroq, \
+                patch('app.services.chat.query_transformer.AsyncGroq') as MockAsyncGroq:
+            MockGroq.side_effect = lambda **kwargs: object()
+            MockAsyncGroq.side_effect = lambda **kwargs: object()
+            
+            first = QueryTransformer(api_key="shared-key")
+            second = QueryTransformer(api_key="shared-key")
+            other = QueryTransformer(api_key="other-key")
+            
+            assert first._get_client() is second._get_client()
+            assert first._get_client() is not other._get_client()
+            assert MockGroq.call_count == 2
+            
+            assert first._get_async_client() is second._get_async_client()
+            assert first._get_async_client() is not other._get_async_client()
+            assert MockAsyncGroq.call_count == 2
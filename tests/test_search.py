@@ -2,49 +2,67 @@
 Tests for the Search Engine components.
 """
 
+import numpy as np
 import pytest
 from app.services.search.bm25 import BM25Search, BM25Document
 from app.services.search.rrf import RRFMerger, RRFResult
 
 
+_DOCUMENTS = [
+    BM25Document(
+        id="1",
+        candidate_id="c1",
+        content="Python developer with experience in Django and Flask frameworks",
+    ),
+    BM25Document(
+        id="2",
+        candidate_id="c2",
+        content="Java software engineer specializing in Spring Boot and microservices",
+    ),
+    BM25Document(
+        id="3",
+        candidate_id="c3",
+        content="Full stack developer with Python, JavaScript, and React experience",
+    ),
+    BM25Document(
+        id="4",
+        candidate_id="c4",
+        content="Machine learning engineer with Python and TensorFlow expertise",
+    ),
+    BM25Document(
+        id="5",
+        candidate_id="c5",
+        content="DevOps engineer with Docker, Kubernetes, and AWS experience",
+    ),
+]
+
+
+def _build_bm25() -> BM25Search:
+    """Create and index a BM25 search instance."""
+    search = BM25Search()
+    search.index_documents(_DOCUMENTS)
+    return search
+
+
 class TestBM25Search:
     """Tests for BM25 search implementation."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def bm25(self):
-        """Create and index a BM25 search instance."""
-        search = BM25Search()
-
-        documents = [
-            BM25Document(
-                id="1",
-                candidate_id="c1",
-                content="Python developer with experience in Django and Flask frameworks",
-            ),
-            BM25Document(
-                id="2",
-                candidate_id="c2",
-                content="Java software engineer specializing in Spring Boot and microservices",
-            ),
-            BM25Document(
-                id="3",
-                candidate_id="c3",
-                content="Full stack developer with Python, JavaScript, and React experience",
-            ),
-            BM25Document(
-                id="4",
-                candidate_id="c4",
-                content="Machine learning engineer with Python and TensorFlow expertise",
-            ),
-            BM25Document(
-                id="5",
-                candidate_id="c5",
-                content="DevOps engineer with Docker, Kubernetes, and AWS experience",
-            ),
-        ]
+        """Shared BM25 index for tests that only read it."""
+        return _build_bm25()
 
-        search.index_documents(documents)
-        return search
+    @pytest.fixture
+    def mutable_bm25(self):
+        """Private BM25 index for tests that add documents."""
+        return _build_bm25()
+
+    @pytest.fixture(autouse=True)
+    def shared_index_unchanged(self, bm25):
+        """Fail tests that modify the shared index instead of mutable_bm25."""
+        version = bm25._version
+        yield
+        assert bm25._version == version, "shared bm25 fixture was modified; use mutable_bm25"
 
     def test_search_python(self, bm25):
         """Test searching for Python."""
@@ -93,6 +111,121 @@ class TestBM25Search:
         assert stats["document_frequency"] == 3  # 3 docs mention Python
         assert stats["idf"] > 0
 
+    def test_scoring_arrays_are_compact_float32(self, bm25, tmp_path):
+        """Test the arrays scoring gathers from are contiguous float32, also after a reload."""
+        path = str(tmp_path / "bm25.npz")
+        bm25.save(path)
+        loaded = BM25Search()
+        assert loaded.load(path)
+
+        for index in (bm25, loaded):
+            for arr in (index.idf, index._term_weights, index.len_norm, index.k1_len_norm):
+                assert arr.dtype == np.float32
+                assert arr.flags.c_contiguous
+
+    def test_snapshot_roundtrip(self, bm25, tmp_path):
+        """Test saving and loading the index gives identical rankings."""
+        path = str(tmp_path / "bm25.npz")
+        bm25.save(path)
+
+        loaded = BM25Search()
+        assert loaded.load(path)
+        assert loaded.search("Python developer", top_k=5) == bm25.search("Python developer", top_k=5)
+        assert loaded.get_term_stats("python") == bm25.get_term_stats("python")
+
+        # Loaded indexes keep accepting incremental additions
+        loaded.add_documents_incremental([
+            BM25Document(id="6", candidate_id="c6", content="Rust systems engineer"),
+        ])
+        assert loaded.search("Rust", top_k=5)[0][0] == "6"
+        assert not BM25Search().load(str(tmp_path / "missing.npz"))
+
+    def test_snapshot_postings_are_memory_mapped(self, bm25, tmp_path):
+        """Test loaded postings are read-only views over the snapshot file."""
+        path = str(tmp_path / "bm25.npz")
+        bm25.save(path)
+
+        loaded = BM25Search()
+        assert loaded.load(path)
+        rows, freqs = loaded._posting(loaded.vocab["python"])
+        assert not rows.flags.writeable and not rows.flags.owndata
+        assert not freqs.flags.writeable
+
+        # Rewriting the snapshot replaces the file; the mapped index keeps working
+        loaded.add_documents_incremental([
+            BM25Document(id="6", candidate_id="c6", content="Python data engineer"),
+        ])
+        loaded.save(path)
+        reloaded = BM25Search()
+        assert reloaded.load(path)
+        assert reloaded.search("Python", top_k=6) == loaded.search("Python", top_k=6)
+
+    def test_term_scores_reused_until_index_changes(self, mutable_bm25, monkeypatch):
+        """Test eager per-term scores are cached and refreshed on additions."""
+        from app.services.search import bm25 as bm25_module
+
+        bm25 = mutable_bm25
+
+        # The numba kernel scores postings directly; the cache serves the NumPy path
+        monkeypatch.setattr(bm25_module, "USE_NUMBA", False)
+        before = bm25.search("Python developer", top_k=5)
+        python_id = bm25.vocab["python"]
+        cached = bm25._term_scores[python_id]
+        assert bm25.search("python", top_k=5) and bm25._term_scores[python_id] is cached
+
+        bm25.add_documents_incremental([
+            BM25Document(id="6", candidate_id="c6", content="Python data engineer"),
+        ])
+        assert bm25._term_scores == {}
+
+        fresh = BM25Search()
+        fresh.index_documents([
+            BM25Document(id=doc_id, candidate_id=cand, content=bm25.get_document_by_id(doc_id).content)
+            for doc_id, cand in zip(bm25.doc_ids.tolist(), bm25.candidate_ids.tolist())
+        ])
+        assert bm25.search("Python developer", top_k=6) == fresh.search("Python developer", top_k=6)
+        assert before != bm25.search("Python developer", top_k=5)
+
+    def test_incremental_postings_match_full_build(self, mutable_bm25):
+        """Test appending to the CSR postings gives the same arrays as a rebuild."""
+        bm25 = mutable_bm25
+        new_docs = [
+            BM25Document(id="6", candidate_id="c6", content="Python Rust engineer"),
+            BM25Document(id="7", candidate_id="c7", content="Go developer, Go and Rust"),
+        ]
+        bm25.add_documents_incremental(new_docs)
+
+        fresh = BM25Search()
+        fresh.index_documents([
+            BM25Document(id=doc_id, candidate_id=cand, content=bm25.get_document_by_id(doc_id).content)
+            for doc_id, cand in zip(bm25.doc_ids.tolist(), bm25.candidate_ids.tolist())
+        ])
+        assert bm25.vocab.keys() == fresh.vocab.keys()
+        for term, term_id in bm25.vocab.items():
+            rows, freqs = bm25._posting(term_id)
+            fresh_rows, fresh_freqs = fresh._posting(fresh.vocab[term])
+            assert rows.tolist() == fresh_rows.tolist()
+            assert freqs.tolist() == fresh_freqs.tolist()
+
+    def test_single_query_scoring_matches_batch(self, bm25):
+        """Test the single-query path scores exactly like batch_score, repeats included."""
+        for query in ("Python developer", "python python engineer", "Docker AWS Python"):
+            term_ids = bm25._term_ids(bm25._tokenize(query))
+            assert bm25._score_query(term_ids).tolist() == bm25.batch_score([term_ids])[0].tolist()
+
+    def test_numba_kernel_matches_numpy(self, bm25, monkeypatch):
+        """Test the JIT scoring kernel gives bit-identical scores to the NumPy path."""
+        from app.services.search import bm25 as bm25_module
+
+        if bm25_module.njit is None:
+            pytest.skip("numba not installed")
+
+        term_ids = bm25._term_ids(bm25._tokenize("python python developer engineer"))
+        monkeypatch.setattr(bm25_module, "USE_NUMBA", True)
+        jit_scores = bm25._score_query(term_ids)
+        monkeypatch.setattr(bm25_module, "USE_NUMBA", False)
+        assert jit_scores.tolist() == bm25._score_query(term_ids).tolist()
+
     def test_get_document_by_id(self, bm25):
         """Test retrieving document by ID."""
         doc = bm25.get_document_by_id("1")
@@ -105,7 +238,7 @@ class TestBM25Search:
 class TestRRFMerger:
     """Tests for Reciprocal Rank Fusion."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="class")
     def merger(self):
         return RRFMerger(k=60)
 
@@ -208,6 +341,29 @@ class TestRRFMerger:
         assert doc1_result.keyword_rank == 1
         assert doc1_result.semantic_rank == 2
 
+    def test_top_results(self, merger):
+        """Test slicing the best results without materializing the rest."""
+        bm25_results = [("doc1", "c1", 10.0), ("doc2", "c2", 8.0)]
+        vector_results = [("doc1", "c1", 0.95), ("doc3", "c3", 0.90)]
+
+        results = merger.merge(bm25_results, vector_results)
+        top = results.top(1)
+
+        assert len(top) == 1
+        assert top[0].doc_id == "doc1"
+        assert results[1].semantic_rank is None or results[1].keyword_rank is None
+        assert results[2].keyword_score is None or results[2].semantic_score is None
+
+    def test_top_k_matches_full_sort(self, merger):
+        """Test partial top-k selection equals truncating the full ranking, ties included."""
+        bm25_results = [(f"doc{i}", f"c{i}", 10.0 - i) for i in range(8)]
+        vector_results = [(f"doc{i}", f"c{i}", 1.0 - i / 10) for i in range(4, 12)]
+
+        full = [r.doc_id for r in merger.merge(bm25_results, vector_results)]
+        for top_k in (0, 1, 3, 5, 12, 20):
+            partial = merger.merge(bm25_results, vector_results, top_k=top_k)
+            assert [r.doc_id for r in partial] == full[:top_k]
+
     def test_candidate_level_merge(self, merger):
         """Test merging at candidate level."""
         bm25_results = [
@@ -229,6 +385,21 @@ class TestRRFMerger:
         # c1 should have higher total score (appeared more times)
         assert results[0][0] == "c1"
 
+        # Limiting to the best candidate keeps the same ordering
+        assert merger.merge_candidate_level(bm25_results, vector_results, top_n=1) == results[:1]
+
+    def test_candidate_level_ties_keep_first_appearance(self, merger):
+        """Test tied candidates keep first-appearance order, with or without top_n."""
+        bm25_results = [("a1", "ca", 1.0), ("b1", "cb", 0.9), ("c1", "cc", 0.8)]
+        vector_results = [("b2", "cb", 0.9), ("a2", "ca", 0.8), ("d1", "cd", 0.7)]
+
+        results = merger.merge_candidate_level(bm25_results, vector_results)
+
+        # ca and cb both hold ranks 1 and 2; cc and cd both hold rank 3
+        assert [c for c, _ in results] == ["ca", "cb", "cc", "cd"]
+        assert results[0][1] == results[1][1] == 1 / 61 + 1 / 62
+        assert merger.merge_candidate_level(bm25_results, vector_results, top_n=3) == results[:3]
+
     def test_explain_ranking(self, merger):
         """Test ranking explanation."""
         result = RRFResult(
@@ -276,6 +447,103 @@ class TestQueryExpansion:
         # Should include related skills
         assert any(s.lower() in ["python3", "django", "flask", "fastapi"] for s in expanded)
 
+    def test_static_expansions_are_cached_and_copied(self):
+        """Test rule-based expansions come from import-time tables and caches."""
+        from app.services.search.query_expansion import QueryExpander
+
+        expander = QueryExpander(api_key=None)
+
+        assert expander.expand_for_skills("Django") == ["Django", "python3", "flask", "fastapi"]
+        assert expander.expand_for_skills("k8s") == ["k8s", "container", "kubernetes"]
+        assert expander.expand_for_skills("Rust") == ["Rust"]
+
+        # Callers get fresh lists, so mutating one cannot corrupt the cache
+        first = expander._fallback_expansion("Senior Developer")
+        first.clear()
+        assert expander._fallback_expansion("senior developer") == [
+            "Senior Engineer", "Senior Programmer", "Senior Lập Trình Viên",
+            "Sr. Developer", "Experienced Developer", "Senior Lập Trình Viên",
+        ]
+
+    @pytest.mark.asyncio
+    async def test_async_batch_expansion(self):
+        """Test concurrent expansion keeps input order and the original query."""
+        from app.services.search.query_expansion import QueryExpander
+
+        expander = QueryExpander(api_key=None)
+        expander._initialized = True
+
+        results = await expander.aexpand_batch(["Python developer", "Data engineer"])
+
+        assert [r[0] for r in results] == ["Python developer", "Data engineer"]
+        assert results[0] == expander.expand_query("Python developer")
+
+    @pytest.mark.asyncio
+    async def test_batch_expansion_writes_misses_with_one_mset(self, fake_groq, monkeypatch):
+        """Test batch misses are stored together instead of one set per query."""
+        from types import SimpleNamespace
+        from app.services.search import query_expansion
+        from app.services.search.query_expansion import QueryExpander
+
+        class FakeCache:
+            def __init__(self):
+                self.calls = []
+
+            async def mget(self, prefix, key_datas):
+                return [["Python engineer"] if k == "python dev" else None for k in key_datas]
+
+            async def mset(self, prefix, items, expire_seconds=300):
+                self.calls.append(("mset", items))
+                return True
+
+            async def set(self, *args, **kwargs):
+                self.calls.append(("set", args))
+                return True
+
+            async def get_embeddings(self, prefix):
+                return [], np.empty((0, 3), dtype=np.float32)
+
+            async def add_embedding(self, *args, **kwargs):
+                return True
+
+        cache = FakeCache()
+        monkeypatch.setattr(query_expansion, "get_cache", lambda: cache)
+
+        expander = QueryExpander(
+            api_key=None,
+            embedding_service=SimpleNamespace(embed_query=lambda text: [1.0, 0.0, 0.0]),
+        )
+        expander._initialized = True
+        expander._aclient = fake_groq('{"expansions": ["Kỹ sư dữ liệu"]}', asynchronous=True)
+
+        results = await expander.aexpand_batch(["Python dev", "Data engineer", "Go dev"])
+
+        assert results[0] == ["Python dev", "Python engineer"]
+        assert results[1] == ["Data engineer", "Kỹ sư dữ liệu"]
+        [(op, items)] = cache.calls
+        assert op == "mset"
+        assert dict(items) == {
+            "data engineer": ["Kỹ sư dữ liệu"],
+            "go dev": ["Kỹ sư dữ liệu"],
+        }
+
+    def test_parse_repairs_malformed_json(self):
+        """Test LLM output repair: fences, single quotes, trailing commas, truncation."""
+        from app.services.search.query_expansion import QueryExpander
+
+        expander = QueryExpander(api_key=None)
+
+        assert expander._parse_expansions(
+            '```json\n{"expansions": ["ML Engineer", "Kỹ sư AI",]}\n```'
+        ) == ["ML Engineer", "Kỹ sư AI"]
+        assert expander._parse_expansions(
+            "Here you go: {'expansions': ['Data Scientist', 'Python \"dev\"']}"
+        ) == ["Data Scientist", 'Python "dev"']
+        assert expander._parse_expansions(
+            '{"expansions": ["Backend developer", "Lập trình viên'
+        ) == ["Backend developer", "Lập trình viên"]
+        assert expander._parse_expansions('["PM", "Scrum master"]') == ["PM", "Scrum master"]
+
 
 class TestHybridSearchConfig:
     """Tests for hybrid search configuration."""
@@ -291,3 +559,45 @@ class TestHybridSearchConfig:
         assert config.vector_fetch_k == 50
         assert config.bm25_weight == 1.0
         assert config.vector_weight == 1.0
+
+
+class TestHybridSearchEngine:
+    """Tests for BM25 snapshot handling in the hybrid engine."""
+
+    def test_search_picks_up_snapshot_written_elsewhere(self, tmp_path, monkeypatch):
+        """Test a search reloads the BM25 snapshot after another process rewrites it."""
+        import os
+        from app.services.search import hybrid
+        from app.services.search.hybrid import HybridSearchEngine
+
+        path = str(tmp_path / "bm25.npz")
+        monkeypatch.setattr(hybrid.settings, "bm25_index_path", path)
+
+        engine = HybridSearchEngine(
+            bm25_search=BM25Search(store_content=False),
+            vector_search=object(),
+            query_expander=object(),
+        )
+        engine.bm25.index_documents(_DOCUMENTS)
+        engine.bm25.save(path)
+        engine._bm25_snapshot_mtime = os.stat(path).st_mtime_ns
+        assert engine._search_bm25(["Rust"], 5) == []
+
+        # A worker appends a CV to the shared snapshot
+        worker = BM25Search(store_content=False)
+        worker.load(path)
+        worker.add_documents_incremental([
+            BM25Document(id="6", candidate_id="c6", content="Rust systems engineer"),
+        ])
+        worker.save(path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, engine._bm25_snapshot_mtime + 1))
+
+        assert engine._search_bm25(["Rust"], 5)[0][:2] == ("6", "c6")
+
+    def test_ids_fingerprint_detects_replaced_chunks(self):
+        """Test equal-size id sets with different members fingerprint differently."""
+        from app.services.search.hybrid import _ids_fingerprint
+
+        assert _ids_fingerprint(["a", "b", "c"]) == _ids_fingerprint(["c", "a", "b"])
+        assert _ids_fingerprint(["a", "b", "c"]) != _ids_fingerprint(["a", "b", "d"])